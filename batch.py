@@ -0,0 +1,284 @@
+###########################################################################
+#
+# Copyright 2015-2018 Robert B. Lowrie (http://github.com/lowrie)
+#
+# This file is part of pyRouterJig.
+#
+# pyRouterJig is free software: you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# pyRouterJig is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR
+# A PARTICULAR PURPOSE.  See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along with
+# pyRouterJig; see the file LICENSE. If not, see <http://www.gnu.org/licenses/>.
+#
+###########################################################################
+
+'''
+Contains the batch renderer, which writes the template image, router pass
+table, and optionally the 3DS file of each joint in a file of joint specs,
+using a pool of worker processes.
+
+Usage: pyRouterJig.py batch [options] SPECS
+
+SPECS is a JSON file containing a list of joints.  Each joint is an object
+whose keys are the arguments of engine.Joint_Spec, plus
+
+  name: Prefix of the output filenames, of letters, digits, and the
+        characters "-_. ", not starting with ".".  Default: joint<index>
+  woods: List of the wood (or pattern) names of each board
+
+For example:
+
+  [{"name": "drawer", "board_width": "7 1/2", "bit_width": "1/2",
+    "spacing": "Variable", "params": {"Fingers": 5}},
+   {"name": "case", "metric": true, "board_width": 450, "bit_width": 12,
+    "bit_angle": 14, "double_thicknesses": [4]}]
+
+The workers render with Qt on the "offscreen" platform, unless
+QT_QPA_PLATFORM is set.
+'''
+
+from __future__ import print_function
+
+import argparse
+import json
+import os
+import re
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from decimal import setcontext
+
+import engine
+import router
+import spacing
+import utils
+
+# The Qt application of each worker process, created by _init_worker()
+_app = None
+
+# The default wood of the boards (the default of the driver's wood menus)
+DEFAULT_WOODS = ['DiagCrossPattern'] * 4
+
+# The joint names allowed, which are filenames within the output directory
+NAME_PATTERN = re.compile(r'[A-Za-z0-9_\- ][A-Za-z0-9_\-. ]*\Z')
+
+
+class Batch_Exception(Exception):
+    '''
+    Exception for errors in the batch specs.
+    '''
+    def __init__(self, msg):
+        Exception.__init__(self, msg)
+        self.msg = msg
+
+    def __str__(self):
+        return self.msg
+
+
+def check_name(name):
+    '''
+    Raises Batch_Exception unless name matches NAME_PATTERN, so that the
+    files of the joint stay within the output directory.
+    '''
+    if not isinstance(name, str) or not NAME_PATTERN.match(name):
+        raise Batch_Exception('Invalid joint name %r: use only letters, digits,'
+                              ' and "-_. ", not starting with "."' % (name,))
+
+
+def read_specs(filename):
+    '''
+    Reads the joints in the JSON file filename.  Returns a list of
+    (name, spec, woods).
+    '''
+    with open(filename) as f:
+        entries = json.load(f)
+    if not isinstance(entries, list):
+        raise Batch_Exception('%s: expected a list of joints' % filename)
+    jobs = []
+    names = set()
+    for (i, entry) in enumerate(entries):
+        entry = dict(entry)
+        name = entry.pop('name', 'joint%d' % i)
+        try:
+            check_name(name)
+        except Batch_Exception as e:
+            raise Batch_Exception('%s: %s' % (filename, e))
+        if name in names:
+            raise Batch_Exception('%s: duplicate joint name %s' % (filename, name))
+        names.add(name)
+        woods = entry.pop('woods', None)
+        try:
+            spec = engine.Joint_Spec(**entry)
+        except TypeError as e:
+            raise Batch_Exception('%s: joint %s: %s' % (filename, name, e))
+        jobs.append((name, spec, woods))
+    return jobs
+
+
+def _init_worker():
+    '''
+    Initializes a worker process: the Decimal context and the offscreen Qt
+    application.
+    '''
+    global _app
+    setcontext(utils.decimal_context())
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    from PyQt5 import QtWidgets
+    if _app is None:
+        _app = QtWidgets.QApplication.instance()
+        if _app is None:
+            _app = QtWidgets.QApplication(['pyRouterJig'])
+
+
+def render_joint(name, spec, woods, outdir, options):
+    '''
+    Computes the joint for spec, and writes its files to outdir.  Runs in a
+    worker process.
+
+    Returns a dictionary with the name, the list of files written, the
+    elapsed time of each step in seconds, the list of steps skipped because
+    the joint does not support them, and the error message, if any.
+    '''
+    import qt_fig
+    import qt_utils
+    import serialize
+    import threeDS
+
+    result = {'name': name, 'files': [], 'times': {}, 'skipped': [], 'error': None}
+    t0 = time.perf_counter()
+
+    def lap(step):
+        t = time.perf_counter()
+        result['times'][step] = t - lap.t
+        lap.t = t
+    lap.t = t0
+
+    try:
+        check_name(name)
+        prefix = os.path.join(outdir, name)
+        r = engine.compute(spec)
+        lap('compute')
+        if options['table']:
+            filename = prefix + '.txt'
+            r.write_table(filename)
+            result['files'].append(filename)
+            lap('table')
+        if options['png']:
+            (wood_images, patterns) = qt_utils.create_wood_dict(r.config.wood_images,
+                                                                  r.bit.units.transl)
+            wood_images.update(patterns)
+            if woods is None:
+                woods = DEFAULT_WOODS
+            for (b, wood) in zip(r.boards, woods):
+                if b.active and wood not in wood_images:
+                    raise Batch_Exception('Unknown wood: %s' % wood)
+                b.set_wood(wood)
+            template = router.Incra_Template(r.bit.units, r.boards)
+            fig = qt_fig.Qt_Fig(template, r.boards, r.config)
+            image = fig.image(template, r.boards, r.bit, r.spacing, wood_images, name)
+            s = serialize.serialize(r.bit, r.boards, r.spacing, r.config)
+            filename = prefix + '.png'
+            if not qt_utils.save_png(image, filename, s):
+                raise Batch_Exception('Unable to save to file %s' % filename)
+            result['files'].append(filename)
+            lap('png')
+        if options['threeDS'] and not threeDS.is_supported(r.bit, r.boards):
+            result['skipped'].append('3ds')
+        elif options['threeDS']:
+            filename = prefix + '.3ds'
+            threeDS.joint_to_3ds(filename, r.boards, r.bit, r.spacing)
+            result['files'].append(filename)
+            lap('3ds')
+    except (router.Router_Exception, spacing.Spacing_Exception, Batch_Exception) as e:
+        result['error'] = e.msg
+    except Exception:
+        result['error'] = traceback.format_exc()
+    result['times']['total'] = time.perf_counter() - t0
+    return result
+
+
+def _report(result, out):
+    '''
+    Prints the timings of the result of render_joint()
+    '''
+    times = result['times']
+    steps = ' '.join('%s %7.1f ms' % (k, v * 1e3) for (k, v) in times.items()
+                     if k != 'total')
+    line = '%-24s %8.1f ms  %s' % (result['name'], times['total'] * 1e3, steps)
+    for step in result['skipped']:
+        line += '  (%s not supported)' % step
+    if result['error'] is not None:
+        line += '  FAILED: ' + result['error'].strip().replace('\n', '\n    ')
+    print(line, file=out)
+
+
+def run(jobs, outdir, options, nworkers, out=sys.stdout):
+    '''
+    Renders the jobs from read_specs() into outdir, using nworkers worker
+    processes (or this process, if nworkers is 1).  Prints the timings of
+    each joint as it finishes, and then the totals.
+
+    Returns the list of results of render_joint(), in the order of jobs.
+    '''
+    if not os.path.isdir(outdir):
+        os.makedirs(outdir)
+    t0 = time.perf_counter()
+    results = []
+    if nworkers == 1:
+        _init_worker()
+        for (name, spec, woods) in jobs:
+            results.append(render_joint(name, spec, woods, outdir, options))
+            _report(results[-1], out)
+    else:
+        with ProcessPoolExecutor(max_workers=nworkers, initializer=_init_worker) as pool:
+            futures = [pool.submit(render_joint, name, spec, woods, outdir, options)
+                       for (name, spec, woods) in jobs]
+            for f in futures:
+                results.append(f.result())
+                _report(results[-1], out)
+    elapsed = time.perf_counter() - t0
+    nfailed = len([r for r in results if r['error'] is not None])
+    busy = sum(r['times']['total'] for r in results)
+    print('%d joints (%d failed) in %.2f s with %d workers: %.1f joints/s, '
+          '%.1f ms/joint of worker time' %
+          (len(results), nfailed, elapsed, nworkers, len(results) / max(elapsed, 1e-9),
+           1e3 * busy / max(len(results), 1)), file=out)
+    return results
+
+
+def main(argv):
+    '''
+    Runs the batch renderer with the command-line arguments argv.  Returns
+    the exit status.
+    '''
+    parser = argparse.ArgumentParser(prog='pyRouterJig.py batch',
+                                     description='Renders the joints in a file of joint '
+                                     'specs.')
+    parser.add_argument('specs', help='JSON file of joint specs')
+    parser.add_argument('-o', '--outdir', default='.', help='output directory')
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count() or 1,
+                        help='number of worker processes (default: number of CPUs)')
+    parser.add_argument('--3ds', dest='threeDS', action='store_true',
+                        help='also export each joint to a 3DS file')
+    parser.add_argument('--no-png', dest='png', action='store_false',
+                        help='do not write the template images')
+    parser.add_argument('--no-table', dest='table', action='store_false',
+                        help='do not write the router pass tables')
+    args = parser.parse_args(argv)
+    try:
+        jobs = read_specs(args.specs)
+    except (IOError, ValueError, Batch_Exception) as e:
+        print('pyRouterJig batch: %s' % e, file=sys.stderr)
+        return 2
+    options = {'png': args.png, 'table': args.table, 'threeDS': args.threeDS}
+    results = run(jobs, args.outdir, options, max(1, args.jobs))
+    if any(r['error'] is not None for r in results):
+        return 1
+    return 0
@@ -0,0 +1,108 @@
+###########################################################################
+#
+# Copyright 2015-2018 Robert B. Lowrie (http://github.com/lowrie)
+#
+# This file is part of pyRouterJig.
+#
+# pyRouterJig is free software: you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# pyRouterJig is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR
+# A PARTICULAR PURPOSE.  See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along with
+# pyRouterJig; see the file LICENSE. If not, see <http://www.gnu.org/licenses/>.
+#
+###########################################################################
+
+'''
+Tests for the batch renderer.
+'''
+
+import io
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+import batch
+import config_file
+import serialize
+
+SPECS = [{'name': 'drawer', 'board_width': '7 1/2', 'spacing': 'Variable',
+          'params': {'Fingers': 5}},
+         {'name': 'case', 'metric': True, 'board_width': 450, 'bit_width': 12,
+          'bit_angle': 14, 'double_thicknesses': [4]},
+         {'name': 'edit', 'spacing': 'Edit', 'cuts': [[0, 20], [40, 80]]},
+         {'name': 'bad', 'bit_width': 'abc'}]
+
+
+class Batch_Test(unittest.TestCase):
+    '''
+    Tests batch rendering of a file of joint specs.
+    '''
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.specs = os.path.join(self.tmpdir, 'specs.json')
+        with open(self.specs, 'w') as f:
+            json.dump(SPECS, f)
+        self.outdir = os.path.join(self.tmpdir, 'out')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_read_specs(self):
+        jobs = batch.read_specs(self.specs)
+        self.assertEqual([name for (name, _, _) in jobs], ['drawer', 'case', 'edit', 'bad'])
+        self.assertEqual(jobs[1][1].double_thicknesses, [4])
+        with open(self.specs, 'w') as f:
+            json.dump([{'name': 'a'}, {'name': 'a'}], f)
+        self.assertRaises(batch.Batch_Exception, batch.read_specs, self.specs)
+        with open(self.specs, 'w') as f:
+            json.dump([{'board': 1}], f)
+        self.assertRaises(batch.Batch_Exception, batch.read_specs, self.specs)
+        # names that would write outside of the output directory
+        for name in ['../up', '/tmp/abs', '..', 'a/b', 'a\\b', '.hidden', '', 3]:
+            with open(self.specs, 'w') as f:
+                json.dump([{'name': name}], f)
+            self.assertRaises(batch.Batch_Exception, batch.read_specs, self.specs)
+
+    def test_run(self):
+        jobs = batch.read_specs(self.specs)
+        options = {'png': True, 'table': True, 'threeDS': True}
+        out = io.StringIO()
+        results = batch.run(jobs, self.outdir, options, 2, out)
+        self.assertEqual([r['name'] for r in results], ['drawer', 'case', 'edit', 'bad'])
+        self.assertTrue(results[3]['error'].startswith('Unable to set Bit Width'))
+        r = batch.render_joint('../up', jobs[0][1], None, self.outdir, options)
+        self.assertTrue(r['error'].startswith('Invalid joint name'))
+        self.assertEqual(r['files'], [])
+        self.assertEqual(results[1]['skipped'], ['3ds'])
+        for r in results[:3]:
+            self.assertTrue(os.path.exists(os.path.join(self.outdir, r['name'] + '.txt')))
+        self.assertTrue('4 joints (' in out.getvalue())
+
+        # the image metadata recreates the joint
+        text = serialize.read_png_text(os.path.join(self.outdir, 'case.png'))
+        self.assertEqual(sorted(text.keys()), sorted(serialize.PNG_KEYS))
+        config = config_file.default_config(True)
+        (bit, boards, _, sp_type) = serialize.unserialize(text['pyRouterJig'], config, True)
+        self.assertEqual(bit.angle, 14)
+        self.assertTrue(boards[2].active)
+        self.assertFalse(boards[3].active)
+        self.assertEqual(sp_type, 'Equa')
+
+    def test_main(self):
+        self.assertEqual(batch.main([os.path.join(self.tmpdir, 'missing.json')]), 2)
+        with open(self.specs, 'w') as f:
+            json.dump(SPECS[:1], f)
+        self.assertEqual(batch.main([self.specs, '-o', self.outdir, '-j', '1', '--no-png']), 0)
+        self.assertEqual(os.listdir(self.outdir), ['drawer.txt'])
+
+
+if __name__ == '__main__':
+    unittest.main()
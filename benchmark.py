@@ -0,0 +1,482 @@
+#!/usr/bin/env python
+###########################################################################
+#
+# Copyright 2015-2018 Robert B. Lowrie (http://github.com/lowrie)
+#
+# This file is part of pyRouterJig.
+#
+# pyRouterJig is free software: you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# pyRouterJig is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR
+# A PARTICULAR PURPOSE.  See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along with
+# pyRouterJig; see the file LICENSE. If not, see <http://www.gnu.org/licenses/>.
+#
+###########################################################################
+
+'''
+Benchmarks of the joint geometry computations, which do not require Qt.
+
+Usage: python benchmark.py [repeat]
+'''
+from __future__ import print_function
+
+import copy
+import os
+import shutil
+import sys
+import tempfile
+import timeit
+from decimal import setcontext
+
+import engine
+import fixed_point
+import joint_index
+import pass_planner
+import router
+import router_test
+import serialize
+import threeDS
+import utils
+
+
+def joints():
+    '''
+    Returns the list of (bit, boards, spacing, config) in the regression
+    corpus of router_test.  Each spacing is copied, since the generator
+    reuses its spacing objects.
+    '''
+    result = []
+    for case in router_test.cases:
+        (bit, boards, config) = router_test.make_joint(case)
+        config.show_caul = True
+        for sp in router_test.spacings(bit, boards, config):
+            result.append((bit, boards, sp.cuts[:], config))
+    return result
+
+
+def clear_caches(boards):
+    '''
+    Clears the caches of the boards, so that all passes, adjoining cuts and
+    perimeters are recomputed.
+    '''
+    for b in boards:
+        for c in list(b.pass_caches.values()) + list(b.span_caches.values()):
+            c.clear()
+
+
+def bench_geometry(kernel, corpus, repeat):
+    '''
+    Times the computation of the Joint_Geometry of every joint in corpus,
+    using the given geometry kernel.  Returns the best time, in seconds.
+    '''
+    class Spacing(object):
+        '''The part of a spacing used by Joint_Geometry.'''
+        def __init__(self, cuts):
+            self.cuts = cuts
+
+    def run():
+        for (bit, boards, cuts, config) in corpus:
+            clear_caches(boards)
+            router_test.compute(bit, boards, Spacing(cuts), config, kernel)
+
+    return min(timeit.repeat(run, number=1, repeat=repeat))
+
+
+def bench_planner(ncuts, repeat):
+    '''
+    Times planning the passes of an edge with ncuts fingers, one cut at a
+    time and with the vectorized planner.  Returns the two best times, in
+    seconds.
+    '''
+    (bit, _, _) = router_test.make_joint(router_test.cases[0])
+    bt = fixed_point.bit_ticks(bit)
+    pitch = 3 * bt.width // fixed_point.SCALE
+    width = (ncuts * pitch + 1) * fixed_point.SCALE
+    xmin = [(i * pitch + 1) * fixed_point.SCALE for i in range(ncuts)]
+    xmax = [x + 2 * bt.width for x in xmin]
+
+    def one_at_a_time():
+        for (a, b) in zip(xmin, xmax):
+            fixed_point.router_passes(a, b, width, bt)
+
+    def vectorized():
+        pass_planner.plan_passes(xmin, xmax, width, bt)
+
+    number = max(1, 2000 // ncuts)
+    t0 = min(timeit.repeat(one_at_a_time, number=number, repeat=repeat)) / number
+    t1 = min(timeit.repeat(vectorized, number=number, repeat=repeat)) / number
+    return (t0, t1)
+
+
+def bench_edit(board_width, nedits, repeat, incremental):
+    '''
+    Times recomputing the joint geometry after each of nedits moves of one
+    cut in Edit spacing, on a board of the given width (inches) with a 1/4"
+    bit.  If incremental is False, the caches are cleared before each
+    recomputation.  Returns (number of cuts, best time per edit in seconds).
+    '''
+    spec = engine.Joint_Spec(board_width=board_width, bit_width='1/4', spacing='Edit',
+                             config={'show_caul': True})
+    (config, bit, boards, sp) = engine.make_joint(spec)
+    template = router.Incra_Template(bit.units, boards)
+    margins = utils.Margins(8)
+    sp.active_cuts = [len(sp.cuts) // 2]
+    router.Joint_Geometry(template, boards, bit, sp, margins, config).compute()
+
+    def run():
+        for i in range(nedits):
+            if i % 2:
+                sp.cut_move_left()
+            else:
+                sp.cut_move_right()
+            if not incremental:
+                clear_caches(boards)
+            router.Joint_Geometry(template, boards, bit, sp, margins, config).compute()
+
+    return (len(sp.cuts), min(timeit.repeat(run, number=1, repeat=repeat)) / nedits)
+
+
+def bench_bits(nbits, repeat):
+    '''
+    Times creating nbits dovetail bits of a few distinct sizes, as in a
+    sweep, with and without the shared bit geometry.  Returns the two best
+    times per bit, in seconds, and the bit_geometry() cache counters.
+    '''
+    units = utils.Units('-', False, 32)
+
+    def run():
+        for i in range(nbits):
+            router.Router_Bit(units, 16 + 2 * (i % 4), 24, 7.5)
+
+    def uncached():
+        router.clear_bit_geometry_cache()
+        for i in range(nbits):
+            router.Router_Bit(units, 16 + 2 * (i % 4), 24, 7.5)
+            router.clear_bit_geometry_cache()
+
+    t0 = min(timeit.repeat(uncached, number=1, repeat=repeat)) / nbits
+    router.clear_bit_geometry_cache()
+    t1 = min(timeit.repeat(run, number=1, repeat=repeat)) / nbits
+    return (t0, t1, router.bit_geometry_cache_info())
+
+
+def bench_cut_copy(board_width, repeat):
+    '''
+    Times copying the cuts of Board-A, with its passes, of a joint on a board
+    of the given width (inches) with a 1/4" bit, by deep-copying the list of
+    Cuts and as a router.Cut_Set.  Returns (number of cuts, the two best
+    times in seconds, the two sizes in bytes).
+    '''
+    spec = engine.Joint_Spec(board_width=board_width, bit_width='1/4', spacing='Edit')
+    cuts = engine.compute(spec).boards[0].bottom_cuts
+    t0 = min(timeit.repeat(lambda: copy.deepcopy(cuts), number=10, repeat=repeat)) / 10
+    t1 = min(timeit.repeat(lambda: router.Cut_Set(cuts), number=10, repeat=repeat)) / 10
+    n0 = sys.getsizeof(cuts)
+    for c in cuts:
+        n0 += sys.getsizeof(c) + sys.getsizeof(c.xmin) + sys.getsizeof(c.xmax) + \
+              sys.getsizeof(c.passes) + sum(sys.getsizeof(p) for p in c.passes)
+    return (len(cuts), t0, t1, n0, router.Cut_Set(cuts).nbytes())
+
+
+def bench_cut_index(board_width, repeat):
+    '''
+    Times finding the cut that contains each increment, and the first place
+    to add a cut, on a joint on a board of the given width (inches) with a
+    1/4" bit, by scanning the cuts and by spacing.Cut_Index.  Returns
+    (number of cuts, the two best times per lookup in seconds).
+    '''
+    spec = engine.Joint_Spec(board_width=board_width, bit_width='1/4', spacing='Edit')
+    (_, _, boards, sp) = engine.make_joint(spec)
+    cuts = sp.cuts
+    xs = range(0, int(boards[0].width), 3)
+    # a space larger than any, so that the search visits every cut
+    space = boards[0].width
+
+    def scan():
+        for x in xs:
+            for (i, c) in enumerate(cuts):
+                if c.xmin <= x <= c.xmax:
+                    break
+        for i in range(1, len(cuts)):
+            if cuts[i].xmin - cuts[i - 1].xmax >= space or \
+               cuts[i].xmax - cuts[i].xmin >= space:
+                break
+
+    def index():
+        for x in xs:
+            sp.cut_at(x)
+        sp.index.first_space(space, space)
+
+    n = len(xs) + 1
+    t0 = min(timeit.repeat(scan, number=1, repeat=repeat)) / n
+    t1 = min(timeit.repeat(index, number=1, repeat=repeat)) / n
+    return (len(cuts), t0, t1)
+
+
+def bench_serialize(spacing_type, board_width, repeat):
+    '''
+    Times serializing and unserializing a joint with the given spacing type
+    on a board of the given width (inches) with a 1/4" bit, in the pickle
+    format and in the JSON format.  Returns (number of cuts, the two best
+    encode times and the two best decode times in seconds, the two sizes in
+    bytes).
+    '''
+    spec = engine.Joint_Spec(board_width=board_width, bit_width='1/4', spacing=spacing_type)
+    (config, bit, boards, sp) = engine.make_joint(spec)
+    s0 = serialize.serialize_pickle(bit, boards, sp, config)
+    s1 = serialize.serialize(bit, boards, sp, config)
+    e0 = min(timeit.repeat(lambda: serialize.serialize_pickle(bit, boards, sp, config),
+                           number=10, repeat=repeat)) / 10
+    e1 = min(timeit.repeat(lambda: serialize.serialize(bit, boards, sp, config),
+                           number=10, repeat=repeat)) / 10
+    d0 = min(timeit.repeat(lambda: serialize.unserialize(s0, config, True),
+                           number=10, repeat=repeat)) / 10
+    d1 = min(timeit.repeat(lambda: serialize.unserialize(s1, config),
+                           number=10, repeat=repeat)) / 10
+    return (len(sp.cuts), e0, e1, d0, d1, len(s0.encode()), len(s1.encode()))
+
+
+def bench_png_text(width, height, repeat):
+    '''
+    Times reading the joint from a saved PNG image of the given size, by
+    opening it with PIL and by serialize.read_png_text().  Returns the two
+    best times in seconds, and the size of the file in bytes.
+    '''
+    from PIL import Image
+    from PIL import PngImagePlugin
+    spec = engine.Joint_Spec(board_width=12, bit_width='1/4', spacing='Edit')
+    (config, bit, boards, sp) = engine.make_joint(spec)
+    info = PngImagePlugin.PngInfo()
+    info.add_text(serialize.PNG_KEYS[0], serialize.serialize(bit, boards, sp, config))
+    info.add_text(serialize.PNG_KEYS[1], utils.VERSION)
+    tmpdir = tempfile.mkdtemp()
+    try:
+        filename = os.path.join(tmpdir, 'joint.png')
+        Image.frombytes('RGB', (width, height), os.urandom(width * height * 3)).save(
+            filename, 'png', pnginfo=info)
+
+        def pil():
+            image = Image.open(filename)
+            image.info[serialize.PNG_KEYS[0]]
+            image.close()
+
+        t0 = min(timeit.repeat(pil, number=10, repeat=repeat)) / 10
+        t1 = min(timeit.repeat(lambda: serialize.read_png_text(filename),
+                               number=10, repeat=repeat)) / 10
+        return (t0, t1, os.path.getsize(filename))
+    finally:
+        shutil.rmtree(tmpdir)
+
+
+def bench_joint_index(nfiles, repeat):
+    '''
+    Times indexing a directory of nfiles saved joints with
+    joint_index.Joint_Index, from scratch and when no file has changed.
+    Returns the two best times in seconds.
+    '''
+    tmpdir = tempfile.mkdtemp()
+    try:
+        specs = [engine.Joint_Spec(board_width=w, bit_width='1/4', spacing=sp)
+                 for w in range(6, 16) for sp in engine.SPACINGS]
+        for i in range(nfiles):
+            (config, bit, boards, sp) = engine.make_joint(specs[i % len(specs)])
+            router_test.write_png(os.path.join(tmpdir, 'pyrouterjig%d.png' % i),
+                                  {serialize.PNG_KEYS[0]: serialize.serialize(bit, boards, sp,
+                                                                              config),
+                                   serialize.PNG_KEYS[1]: utils.VERSION})
+
+        def full():
+            index = joint_index.Joint_Index(':memory:')
+            index.update(tmpdir, config)
+            return index
+
+        t0 = min(timeit.repeat(full, number=1, repeat=repeat))
+        index = full()
+        t1 = min(timeit.repeat(lambda: index.update(tmpdir, config), number=1, repeat=repeat))
+        index.close()
+        return (t0, t1)
+    finally:
+        shutil.rmtree(tmpdir)
+
+
+def save_png_pil(image, filename, s):
+    '''
+    The qt_utils.save_png() of earlier versions, which decodes the PNG
+    encoded by Qt with PIL, converts it from the display profile to sRGB and
+    encodes it again to add the text chunks.
+    '''
+    from io import BytesIO
+    from PIL import Image
+    from PIL import ImageCms
+    from PIL import PngImagePlugin
+    from PyQt5 import QtCore
+
+    buffer = QtCore.QBuffer()
+    buffer.open(QtCore.QIODevice.ReadWrite)
+    image.save(buffer, "PNG")
+    pio = BytesIO()
+    pio.write(buffer.data())
+    pio.seek(0)
+    buffer.close()
+    pilimg = Image.open(pio)
+    monitor_profile = ImageCms.get_display_profile()
+    if monitor_profile is None:
+        monitor_profile = ImageCms.createProfile('sRGB')
+    srgb = ImageCms.createProfile('sRGB')
+    pilimg = ImageCms.profileToProfile(pilimg, monitor_profile, srgb)
+    info = PngImagePlugin.PngInfo()
+    info.add_text('pyRouterJig', s)
+    info.add_text('pyRouterJig_v', utils.VERSION)
+    pilimg.save(filename, 'png', pnginfo=info)
+
+
+def bench_save_png(width, height, repeat):
+    '''
+    Times saving a rendered joint as a PNG image of the given size, by the
+    earlier PIL round trip and by qt_utils.save_png().  Returns the two best
+    times in seconds.  Requires a QApplication.
+    '''
+    import qt_fig
+    import qt_utils
+    spec = engine.Joint_Spec(board_width=12, bit_width='1/4', double_thicknesses=['1/8'])
+    r = engine.compute(spec)
+    template = router.Incra_Template(r.bit.units, r.boards)
+    fig = qt_fig.Qt_Fig(template, r.boards, r.config)
+    r.config.min_image_width = width
+    r.config.max_image_width = width
+    image = fig.image(template, r.boards, r.bit, r.spacing, {None: None}, '')
+    image = image.scaled(width, height)
+    s = serialize.serialize(r.bit, r.boards, r.spacing, r.config)
+    tmpdir = tempfile.mkdtemp()
+    try:
+        filename = os.path.join(tmpdir, 'joint.png')
+        t0 = min(timeit.repeat(lambda: save_png_pil(image, filename, s), number=1,
+                               repeat=repeat))
+        t1 = min(timeit.repeat(lambda: qt_utils.save_png(image, filename, s), number=1,
+                               repeat=repeat))
+        return (t0, t1)
+    finally:
+        shutil.rmtree(tmpdir)
+
+
+def bench_triangulate(board_width, repeat):
+    '''
+    Times triangulating and extruding the boards of a double joint on a board
+    of the given width (inches) with a 1/4" bit.  Returns (number of cuts,
+    best time in seconds).
+    '''
+    spec = engine.Joint_Spec(board_width=board_width, bit_width='1/4',
+                             double_thicknesses=['1/8'])
+    r = engine.compute(spec)
+    boards = [b for b in r.boards if b.active]
+
+    def run():
+        for b in boards:
+            (v2d, tri2d) = b.triangulate(r.bit)
+            threeDS.extrude(v2d, tri2d, (0, 1, 2), 0, r.bit.depth, r.bit.units)
+
+    return (len(r.spacing.cuts), min(timeit.repeat(run, number=1, repeat=repeat)))
+
+
+def bench_var_params(board_width, num_increments, repeat):
+    '''
+    Times finding the range of the Spacing of Variable_Spaced for every
+    number of fingers, on a board of the given width (inches) with a 1/4"
+    bit, by the original linear search and by calc_var_params.  Returns the
+    two best times per call, in seconds.
+    '''
+    spec = engine.Joint_Spec(board_width=board_width, bit_width='1/4', spacing='Variable',
+                             config={'num_increments': num_increments})
+    (_, _, _, sp) = engine.make_joint(spec)
+    p = sp.params['Fingers']
+    fingers = range(p.vMin, p.vMax + 1)
+
+    def linear():
+        for n in fingers:
+            p.v = n
+            router_test.linear_var_spacing(sp)
+
+    def bisection():
+        for n in fingers:
+            p.v = n
+            sp.calc_var_params()
+
+    t0 = min(timeit.repeat(linear, number=1, repeat=repeat)) / len(fingers)
+    t1 = min(timeit.repeat(bisection, number=1, repeat=repeat)) / len(fingers)
+    return (t0, t1)
+
+
+def main(argv):
+    setcontext(utils.decimal_context())
+    repeat = 5
+    if len(argv) > 1:
+        repeat = int(argv[1])
+    corpus = joints()
+    print('Joints in corpus: %d' % len(corpus))
+    base = None
+    for kernel in router.GEOMETRY_KERNELS:
+        t = bench_geometry(kernel, corpus, repeat)
+        if base is None:
+            base = t
+        print('geometry %-8s %8.3f s  (x%.2f)' % (kernel, t, base / t))
+    for kernel in router.GEOMETRY_KERNELS:
+        router.set_geometry_kernel(kernel)
+        for board_width in [24, 48]:
+            (ncuts, t0) = bench_edit(board_width, 20, repeat, False)
+            (ncuts, t1) = bench_edit(board_width, 20, repeat, True)
+            print('edit %-8s %3d cuts: full %7.2f ms, incremental %7.2f ms  (x%.2f)' %
+                  (kernel, ncuts, t0 * 1e3, t1 * 1e3, t0 / t1))
+    router.set_geometry_kernel('decimal')
+    (t0, t1, info) = bench_bits(1000, repeat)
+    print('bits: uncached %6.2f us, shared %6.2f us  (x%.2f, %d hits, %d misses)' %
+          (t0 * 1e6, t1 * 1e6, t0 / t1, info.hits, info.misses))
+    for board_width in [24, 48]:
+        (ncuts, t0, t1, n0, n1) = bench_cut_copy(board_width, repeat)
+        print('cut copy %3d cuts: deepcopy %7.1f us %6d bytes, Cut_Set %7.1f us %6d bytes' %
+              (ncuts, t0 * 1e6, n0, t1 * 1e6, n1))
+    for board_width in [12, 24, 48]:
+        (ncuts, t0, t1) = bench_cut_index(board_width, repeat)
+        print('cut lookup %3d cuts: scan %7.2f us, index %6.2f us  (x%.2f)' %
+              (ncuts, t0 * 1e6, t1 * 1e6, t0 / t1))
+    for (spacing_type, board_width) in [('Equal', 12), ('Variable', 12), ('Edit', 12),
+                                        ('Edit', 48)]:
+        (ncuts, e0, e1, d0, d1, n0, n1) = bench_serialize(spacing_type, board_width, repeat)
+        print('serialize %-8s %3d cuts: encode pickle %6.1f us, json %6.1f us; '
+              'decode pickle %8.1f us, json %6.1f us; %5d bytes, %5d bytes' %
+              (spacing_type, ncuts, e0 * 1e6, e1 * 1e6, d0 * 1e6, d1 * 1e6, n0, n1))
+    for (width, height) in [(800, 600), (3000, 2000)]:
+        (t0, t1, size) = bench_png_text(width, height, repeat)
+        print('png text %4dx%4d %8d bytes: PIL %7.1f us, chunk scan %6.1f us  (x%.2f)' %
+              (width, height, size, t0 * 1e6, t1 * 1e6, t0 / t1))
+    for nfiles in [100, 1000]:
+        (t0, t1) = bench_joint_index(nfiles, repeat)
+        print('joint index %5d files: full %7.1f ms, unchanged %6.1f ms' %
+              (nfiles, t0 * 1e3, t1 * 1e3))
+    from PyQt5 import QtWidgets
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication(argv)
+    for (width, height) in [(1200, 800), (4000, 2700)]:
+        (t0, t1) = bench_save_png(width, height, repeat)
+        print('save png %4dx%4d: PIL round trip %7.1f ms, single encode %7.1f ms  (x%.2f)' %
+              (width, height, t0 * 1e3, t1 * 1e3, t0 / t1))
+    for board_width in [12, 24, 48]:
+        (ncuts, t) = bench_triangulate(board_width, repeat)
+        print('triangulate %3d cuts: %7.2f ms' % (ncuts, t * 1e3))
+    for (board_width, num_increments) in [(6, 16), (6, 128), (12, 16), (12, 32),
+                                          (12, 64), (12, 128), (24, 64)]:
+        (t0, t1) = bench_var_params(board_width, num_increments, repeat)
+        print('var params %2d" %3d/in: linear %8.1f us, bisection %6.1f us  (x%.2f)' %
+              (board_width, num_increments, t0 * 1e6, t1 * 1e6, t0 / t1))
+    if pass_planner.AVAILABLE:
+        for ncuts in [8, 64, 512, 4096]:
+            (t0, t1) = bench_planner(ncuts, repeat)
+            print('planner %5d cuts: per-cut %9.1f us, vectorized %9.1f us  (x%.2f)' %
+                  (ncuts, t0 * 1e6, t1 * 1e6, t0 / t1))
+
+if __name__ == '__main__':
+    main(sys.argv)
@@ -24,6 +24,7 @@ user configuration file.
 '''
 
 import os
+import types
 
 from importlib.util import spec_from_loader, module_from_spec
 from importlib.machinery import SourceFileLoader
@@ -90,6 +91,12 @@ show_router_pass_identifiers = {show_router_pass_identifiers}
 # "Router Passes", and selecting "Locations"
 show_router_pass_locations = {show_router_pass_locations}
 
+# If true, then order the router passes of all of the boards to minimize the
+# travel of the router carriage, instead of right to left on each board.  This
+# option may also be turned on and off under the menu "View", selecting
+# "Router Passes", and selecting "Minimize Travel"
+optimize_pass_order = {optimize_pass_order}
+
 # If true, then show the caul template.  This option may also be turned on and
 # off under the menu "View" and selecting "Caul Template"
 show_caul = {show_caul}
@@ -129,6 +136,10 @@ warn_overlap = {warn_overlap}
 # Cutting part of the bit %
 bit_gentle = {bit_gentle}
 
+# Maximum memory used by the undo history of the Editor, in megabytes.  The
+# oldest changes are forgotten once the history exceeds this size.
+max_undo_memory = {max_undo_memory}
+
 # On save image, minimum width of image in pixels. Used if the figure width is
 # less than this size.  Does not apply to screenshots, which are done at the
 # resolution of the window.
@@ -224,9 +235,11 @@ COMMON_VALS = {'version': 'NONE',
                'show_finger_widths': False,
                'show_router_pass_identifiers': True,
                'show_router_pass_locations': False,
+               'optimize_pass_order': False,
                'show_caul': False,
                'show_fit': False,
                'bit_gentle': 33.0,
+               'max_undo_memory': 8.0,
                'bit_angle': 0,
                'min_image_width': 1440,
                'max_image_width': 'min_image_width',
@@ -287,6 +300,7 @@ MIGRATE = ['english_separator',  # COMMON_VALS
            'language',
            'show_finger_widths',
            'show_router_passes',
+           'optimize_pass_order',
            'show_caul',
            'show_fit',
            'bit_angle',
@@ -296,6 +310,7 @@ MIGRATE = ['english_separator',  # COMMON_VALS
            'default_wood',
            'debug',
            'bit_gentle',
+           'max_undo_memory',
            'left_margin',
            'right_margin',
            'separation',
@@ -347,6 +362,25 @@ def set_default_dimensions(d):
         d[v] = COMMON_VALS[v]
 
 
+def default_config(metric):
+    '''
+    Returns the default configuration, as an object with the same
+    attributes as a configuration read from the configuration file, but
+    without reading or writing any file.
+    '''
+    vals = COMMON_VALS.copy()
+    vals['version'] = str(utils.VERSION)
+    vals['wood_images'] = os.path.join(os.path.expanduser('~'), 'wood_images')
+    # as evaluated when the configuration file is read
+    vals['max_image_width'] = vals['min_image_width']
+    vals['default_wood'] = int(vals['default_wood'])
+    if metric:
+        vals.update(METRIC_VALS)
+    else:
+        vals.update(ENGLISH_VALS)
+    return types.SimpleNamespace(**vals)
+
+
 class Configuration(object):
     '''
     Defines interface to reading and creating the configuration file
@@ -386,6 +420,11 @@ class Configuration(object):
         except ValueError:
             pass
 
+        # options added since the file was created take their default values
+        for (k, v) in COMMON_VALS.items():
+            if k not in self.config.__dict__:
+                setattr(self.config, k, v)
+
         vnum = version_number(self.config.version)
         if vnum < self.create_version_number:
             return 2
@@ -0,0 +1,235 @@
+###########################################################################
+#
+# Copyright 2015-2018 Robert B. Lowrie (http://github.com/lowrie)
+#
+# This file is part of pyRouterJig.
+#
+# pyRouterJig is free software: you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# pyRouterJig is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR
+# A PARTICULAR PURPOSE.  See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along with
+# pyRouterJig; see the file LICENSE. If not, see <http://www.gnu.org/licenses/>.
+#
+###########################################################################
+
+'''
+Contains the headless joint engine, which computes a joint from its
+specification without Qt.  For example:
+
+    spec = engine.Joint_Spec(board_width='7 1/2', bit_width='1/2',
+                             spacing='Variable', params={'Fingers': 5})
+    result = engine.compute(spec)
+
+Messages of the exceptions raised are not translated; the UI layer may
+translate them.
+'''
+
+from decimal import localcontext
+
+import config_file
+import router
+import spacing
+import utils
+
+# The spacing types, as in the first four characters of the spacing
+# descriptions stored by serialize
+SPACINGS = ['Equal', 'Variable', 'Edit']
+
+
+class Joint_Spec(object):
+    '''
+    Specifies a joint.
+
+    The dimensions are in the units of the spec (inches, or mm if metric),
+    given as numbers or strings, such as 0.75 or '3/4'.  Any dimension left
+    as None takes its value from the configuration.
+
+    metric: If True, dimensions are in mm.  Otherwise, in inches.
+    bit_width, bit_depth: Router bit width and depth
+    bit_angle: Router bit angle, in degrees (0 for a straight bit)
+    bit_gentle: Percentage of the bit width for each router pass
+    board_width: Width of the boards
+    double_thicknesses: Thicknesses of the double and double-double boards,
+                        as a list of length 0, 1, or 2
+    spacing: One of SPACINGS
+    params: Dictionary of spacing parameter values, keyed by the keys of the
+            spacing class.  Parameters not given keep their defaults.
+    cuts: For 'Edit' spacing, the list of (xmin, xmax) of each cut on
+          Board-A, in increments.  If None, the default equal spacing.
+    config: Dictionary of configuration values that override the defaults
+    '''
+    def __init__(self, metric=False, bit_width=None, bit_depth=None, bit_angle=None,
+                 bit_gentle=None, board_width=None, double_thicknesses=(),
+                 spacing='Equal', params=None, cuts=None, config=None):
+        self.metric = metric
+        self.bit_width = bit_width
+        self.bit_depth = bit_depth
+        self.bit_angle = bit_angle
+        self.bit_gentle = bit_gentle
+        self.board_width = board_width
+        self.double_thicknesses = list(double_thicknesses)
+        self.spacing = spacing
+        self.params = params
+        self.cuts = cuts
+        self.config = config
+
+    def make_config(self):
+        '''
+        Returns the configuration for the spec.
+        '''
+        config = config_file.default_config(self.metric)
+        if self.config is not None:
+            for (k, v) in self.config.items():
+                setattr(config, k, v)
+        return config
+
+
+class Joint_Result(object):
+    '''
+    A computed joint.
+
+    Attributes:
+
+    spec: The Joint_Spec
+    config: The configuration used
+    bit: The Router_Bit
+    boards: The list of 4 Boards
+    spacing: The spacing object
+    geom: The router.Joint_Geometry, whose cauls and fit are computed on
+          first access
+    title: The description of the joint, as on the pass table
+    edges: A list of (label, cuts) for each cut edge, in the order of the
+           pass table, where each cut is a tuple (xmin, xmax, passes)
+    perimeters: The (x, y) perimeter coordinates of each active board
+    max_gap, max_overlap: The fit of the joint, in increments
+    '''
+    def __init__(self, spec, config, bit, boards, sp, geom):
+        self.spec = spec
+        self.config = config
+        self.bit = bit
+        self.boards = boards
+        self.spacing = sp
+        self.geom = geom
+        self.title = router.create_title(boards, bit, sp)
+        geom.compute('board_cuts', 'layout')
+        (all_cuts, labels) = utils.cut_edges(boards)
+        self.edges = []
+        for (label, cuts) in zip(labels, all_cuts):
+            self.edges.append((label, [(c.xmin, c.xmax, list(c.passes)) for c in cuts]))
+        self.perimeters = [b.perimeter(bit) for b in boards if b.active]
+        self.max_gap = geom.max_gap
+        self.max_overlap = geom.max_overlap
+
+    def write_table(self, filename):
+        '''
+        Writes the table of router passes to filename, in the pass order of
+        the geometry.
+        '''
+        utils.print_table(filename, self.boards, self.title, self.geom.pass_order)
+
+
+def _dimension(v, default):
+    '''
+    Returns the string for the dimension v, or default if v is None.
+    '''
+    if v is None:
+        v = default
+    return str(v)
+
+
+def make_joint(spec):
+    '''
+    Forms the joint for spec, without computing its geometry.  Returns the
+    tuple (config, bit, boards, spacing).
+
+    Raises router.Router_Exception or spacing.Spacing_Exception if the spec
+    is invalid.
+    '''
+    config = spec.make_config()
+    units = utils.Units(config.english_separator, spec.metric, config.num_increments)
+
+    bit = router.Router_Bit(units, 2, 2)
+    bit.set_angle_from_string(_dimension(spec.bit_angle, config.bit_angle))
+    bit.set_width_from_string(_dimension(spec.bit_width, config.bit_width))
+    bit.set_depth_from_string(_dimension(spec.bit_depth, config.bit_depth))
+    bit.set_gentle_from_string(_dimension(spec.bit_gentle, config.bit_gentle))
+
+    boards = [router.Board(bit, 10) for _ in range(4)]
+    boards[0].set_width_from_string(_dimension(spec.board_width, config.board_width))
+    for b in boards[1:]:
+        b.width = boards[0].width
+    if len(spec.double_thicknesses) > 2:
+        raise router.Router_Exception(units.transl.tr(
+            'At most two double board thicknesses may be specified'))
+    dbt = units.abstract_to_increments(config.double_board_thickness)
+    for (i, b) in enumerate(boards[2:]):
+        b.set_height(bit, dbt)
+        if i < len(spec.double_thicknesses):
+            b.set_active(True)
+            b.set_height_from_string(bit, str(spec.double_thicknesses[i]))
+        else:
+            b.set_active(False)
+
+    params = spec.params
+    if params is None:
+        params = {}
+    if spec.spacing == 'Equal':
+        sp = spacing.Equally_Spaced(bit, boards, config)
+        for (k, v) in params.items():
+            sp.params[k].v = v
+        sp.set_cuts()
+    elif spec.spacing == 'Variable':
+        sp = spacing.Variable_Spaced(bit, boards, config)
+        # The fingers and inversion determine the range of the spacing
+        for k in ['Fingers', 'Inverted']:
+            if k in params:
+                sp.params[k].v = params[k]
+        sp.calc_var_params()
+        if 'Spacing' in params:
+            sp.params['Spacing'].v = min(params['Spacing'], sp.params['Spacing'].vMax)
+        sp.set_cuts()
+    elif spec.spacing == 'Edit':
+        sp = spacing.Edit_Spaced(bit, boards, config)
+        if spec.cuts is None:
+            equal = spacing.Equally_Spaced(bit, boards, config)
+            equal.set_cuts()
+            cuts = equal.cuts
+        else:
+            cuts = [router.Cut(xmin, xmax) for (xmin, xmax) in spec.cuts]
+        sp.set_cuts(cuts)
+    else:
+        raise spacing.Spacing_Exception(units.transl.tr('Unknown spacing: %s') % spec.spacing)
+    return (config, bit, boards, sp)
+
+
+def make_margins(units, config):
+    '''
+    Returns the figure Margins from the configuration.
+    '''
+    top = units.abstract_to_increments(config.top_margin)
+    bottom = units.abstract_to_increments(config.bottom_margin)
+    left = units.abstract_to_increments(config.left_margin)
+    right = units.abstract_to_increments(config.right_margin)
+    separation = units.abstract_to_increments(config.separation)
+    return utils.Margins(separation, separation, left, right, bottom, top)
+
+
+def compute(spec):
+    '''
+    Computes the joint for spec, and returns its Joint_Result.
+
+    Raises router.Router_Exception or spacing.Spacing_Exception if the spec
+    is invalid.
+    '''
+    with localcontext(utils.decimal_context()):
+        (config, bit, boards, sp) = make_joint(spec)
+        template = router.Incra_Template(bit.units, boards)
+        margins = make_margins(bit.units, config)
+        geom = router.Joint_Geometry(template, boards, bit, sp, margins, config)
+        return Joint_Result(spec, config, bit, boards, sp, geom)
@@ -0,0 +1,98 @@
+###########################################################################
+#
+# Copyright 2015-2018 Robert B. Lowrie (http://github.com/lowrie)
+#
+# This file is part of pyRouterJig.
+#
+# pyRouterJig is free software: you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# pyRouterJig is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR
+# A PARTICULAR PURPOSE.  See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along with
+# pyRouterJig; see the file LICENSE. If not, see <http://www.gnu.org/licenses/>.
+#
+###########################################################################
+
+'''
+Tests for the headless joint engine.
+'''
+
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+import engine
+import router
+import spacing
+
+
+class Engine_Test(unittest.TestCase):
+    '''
+    Tests computing joints with engine.compute()
+    '''
+    def test_default(self):
+        r = engine.compute(engine.Joint_Spec())
+        self.assertEqual(len(r.edges), 2)
+        self.assertEqual([label for (label, _) in r.edges], ['A', 'B'])
+        self.assertEqual(len(r.perimeters), 2)
+        # default 1/2" bit on a 7 1/2" board, equally spaced
+        self.assertEqual(r.edges[0][1][0][2], [24])
+        self.assertEqual(r.max_gap, 0)
+        self.assertEqual(r.max_overlap, 0)
+        self.assertTrue(r.title.startswith('Equally spaced'))
+
+    def test_spacings(self):
+        spec = engine.Joint_Spec(metric=True, bit_width=12, bit_angle=14,
+                                 double_thicknesses=[4, 3], spacing='Variable',
+                                 params={'Fingers': 4, 'Spacing': 100})
+        r = engine.compute(spec)
+        self.assertEqual([label for (label, _) in r.edges], ['A', 'B', 'C', 'D', 'E', 'F'])
+        self.assertEqual(r.spacing.params['Spacing'].v, r.spacing.params['Spacing'].vMax)
+        self.assertTrue(r.max_gap > 0)
+        spec = engine.Joint_Spec(spacing='Edit', cuts=[(0, 20), (40, 80)],
+                                 config={'show_caul': True})
+        r = engine.compute(spec)
+        self.assertEqual([c[:2] for c in r.edges[0][1]], [(0, 20), (40, 80)])
+        self.assertEqual(len(r.geom.caul_top), 2)
+        spec = engine.Joint_Spec(spacing='Equal', params={'Spacing': 3, 'Centered': False})
+        r = engine.compute(spec)
+        self.assertTrue('Spacing: 3/32' in r.title)
+
+    def test_errors(self):
+        self.assertRaises(router.Router_Exception, engine.compute,
+                          engine.Joint_Spec(bit_width='abc'))
+        self.assertRaises(router.Router_Exception, engine.compute,
+                          engine.Joint_Spec(double_thicknesses=[1, 1, 1]))
+        self.assertRaises(spacing.Spacing_Exception, engine.compute,
+                          engine.Joint_Spec(spacing='Dovetail'))
+
+    def test_write_table(self):
+        r = engine.compute(engine.Joint_Spec(double_thicknesses=['1/8']))
+        (fd, filename) = tempfile.mkstemp(suffix='.txt')
+        os.close(fd)
+        try:
+            r.write_table(filename)
+            with open(filename) as f:
+                lines = f.readlines()
+        finally:
+            os.remove(filename)
+        self.assertTrue('1A' in lines[5])
+        self.assertTrue('1D' in lines[5])
+
+    def test_no_qt(self):
+        # computing a joint must not import Qt
+        code = 'import sys, engine; engine.compute(engine.Joint_Spec()); ' \
+               'sys.exit(any(m.startswith("PyQt") for m in sys.modules))'
+        cwd = os.path.dirname(os.path.abspath(__file__))
+        self.assertEqual(subprocess.call([sys.executable, '-c', code], cwd=cwd), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
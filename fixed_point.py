@@ -0,0 +1,337 @@
+###########################################################################
+#
+# Copyright 2015-2018 Robert B. Lowrie (http://github.com/lowrie)
+#
+# This file is part of pyRouterJig.
+#
+# pyRouterJig is free software: you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# pyRouterJig is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR
+# A PARTICULAR PURPOSE.  See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along with
+# pyRouterJig; see the file LICENSE. If not, see <http://www.gnu.org/licenses/>.
+#
+###########################################################################
+
+'''
+Contains the integer fixed-point geometry kernel.
+
+All lengths are represented as integer "ticks", where one increment is SCALE
+ticks.  The functions here mirror the Decimal computations in router.py
+(Cut.make_router_passes, adjoining_cuts and Board._do_cuts), including their
+rounding rules, but use only integer arithmetic.  Any value that cannot be
+represented exactly in ticks raises Fixed_Point_Exception, in which case the
+caller must fall back to the Decimal computation.
+'''
+
+from decimal import Decimal as D
+from decimal import getcontext
+
+# Number of decimal digits in a tick, and the number of ticks per increment.
+# Four digits matches the quantization used in router.adjoining_cuts.
+SCALE_DIGITS = 4
+SCALE = 10 ** SCALE_DIGITS
+HALF = SCALE // 2
+
+# router.Cut.precision (0.01 increments), in ticks
+PRECISION = SCALE // 100
+
+
+class Fixed_Point_Exception(Exception):
+    '''
+    Raised when a value cannot be represented exactly in ticks.
+    '''
+    def __init__(self, msg):
+        Exception.__init__(self, msg)
+        self.msg = msg
+
+    def __str__(self):
+        return self.msg
+
+
+def to_ticks(v):
+    '''
+    Converts v (int, float, or Decimal, in increments) exactly to ticks.
+    '''
+    if isinstance(v, int):
+        return v * SCALE
+    if isinstance(v, float):
+        v = D(v)
+    (sign, digits, exp) = v.as_tuple()
+    if not isinstance(exp, int):
+        raise Fixed_Point_Exception('Not a finite value: %s' % v)
+    n = 0
+    for d in digits:
+        n = n * 10 + d
+    e = exp + SCALE_DIGITS
+    if e >= 0:
+        t = n * 10 ** e
+    else:
+        (t, r) = divmod(n, 10 ** -e)
+        if r:
+            raise Fixed_Point_Exception('%s is not a multiple of 1/%d' % (v, SCALE))
+    if sign:
+        return -t
+    return t
+
+
+def from_ticks(t):
+    '''
+    Converts ticks t to a Decimal, in increments.
+    '''
+    (q, r) = divmod(t, SCALE)
+    if r == 0:
+        return D(q)
+    return D(t) / SCALE
+
+
+def check_magnitude(t):
+    '''
+    Raises Fixed_Point_Exception if t has more digits than the current
+    Decimal context precision, in which case the Decimal computation would
+    round and the two kernels would no longer agree.
+    '''
+    if abs(t) >= 10 ** getcontext().prec:
+        raise Fixed_Point_Exception('%d ticks exceeds the Decimal precision' % t)
+
+
+def math_round(t):
+    '''
+    Ticks to integer increments, matching utils.math_round() for Decimals
+    (half rounds away from zero).
+    '''
+    if t < 0:
+        return -((HALF - t) // SCALE)
+    return (t + HALF) // SCALE
+
+
+def trunc_increments(t):
+    '''
+    Ticks to integer increments, truncating toward zero like int(Decimal).
+    '''
+    if t < 0:
+        return -(-t // SCALE)
+    return t // SCALE
+
+
+def half_increments(t, decimal_division):
+    '''
+    Returns (t // 2) in whole increments, as ticks.  If decimal_division is
+    True, the quotient truncates toward zero like Decimal; otherwise it is
+    floored like int.
+    '''
+    if decimal_division and t < 0:
+        return -((-t // (2 * SCALE)) * SCALE)
+    return (t // (2 * SCALE)) * SCALE
+
+
+class Bit_Ticks(object):
+    '''
+    The attributes of a Router_Bit needed by the kernel, in ticks.
+
+    width: bit.width_f
+    halfwidth: bit.width_f / 2
+    cutpass: int(bit.width_f * bit.bit_gentle / 100)
+    two_thirds: (bit.width_f * 2) // 3
+    four_fifths: (bit.width_f * 4) // 5
+    offset: bit.width_f - bit.midline
+    overhang2: 2 * bit.overhang
+    halfgap: bit.gap / 2, or None if not representable in ticks
+    '''
+    def __init__(self, bit):
+        self.key = (bit.width_f, bit.midline, bit.gap, bit.bit_gentle)
+        self.width = to_ticks(bit.width_f)
+        check_magnitude(2 * self.width)
+        self.halfwidth = self.width // 2
+        self.cutpass = int((bit.width_f * bit.bit_gentle) / 100) * SCALE
+        self.two_thirds = (2 * self.width) // (3 * SCALE) * SCALE
+        self.four_fifths = (4 * self.width) // (5 * SCALE) * SCALE
+        self.offset = to_ticks(bit.width_f - bit.midline)
+        self.overhang2 = to_ticks(2 * bit.overhang)
+        try:
+            self.halfgap = to_ticks(bit.gap / 2)
+        except Fixed_Point_Exception:
+            self.halfgap = None
+
+
+def bit_ticks(bit):
+    '''
+    Returns the Bit_Ticks for bit, reusing the one stored on the bit if its
+    attributes have not changed.
+    '''
+    bt = getattr(bit, '_bit_ticks', None)
+    if bt is None or bt.key != (bit.width_f, bit.midline, bit.gap, bit.bit_gentle):
+        bt = Bit_Ticks(bit)
+        bit._bit_ticks = bt
+    return bt
+
+
+def router_passes(xmin, xmax, board_width, bt):
+    '''
+    Computes the router passes for the cut [xmin, xmax], following
+    router.Cut.make_router_passes().
+
+    xmin, xmax, board_width: in ticks
+    bt: Bit_Ticks
+
+    Returns the sorted list of passes, in integer increments, or None if
+    the cut is invalid.  In that case, the caller should use the Decimal
+    computation to raise the appropriate Router_Exception.
+    '''
+    # validate
+    if xmin >= xmax or xmin < 0 or xmax > board_width:
+        return None
+    if bt.width - (xmax - xmin) > PRECISION and xmin > 0 and xmax < board_width:
+        return None
+
+    halfwidth = bt.halfwidth
+    cutpass = bt.cutpass
+    remainder = xmax - xmin
+    # In the Decimal computation, p0 is a Decimal only in this first branch,
+    # which changes how "remainder // 2" rounds below.
+    decimal_division = (xmax == board_width and remainder > halfwidth)
+    if decimal_division:
+        p0 = xmax + halfwidth - cutpass
+    else:
+        p0 = math_round(xmax - halfwidth) * SCALE
+    p1 = math_round(xmin + halfwidth) * SCALE
+
+    passes = []
+    if xmax <= board_width and (xmin - (p0 - halfwidth) < PRECISION or xmin == 0):
+        passes.append(trunc_increments(p0))
+
+    while remainder > 0:
+        remainder = p0 - p1
+
+        if p0 != p1 and ((p1 + halfwidth) - xmax < PRECISION or xmax == board_width):
+            p1 = trunc_increments(p1) * SCALE
+            passes.append(p1 // SCALE)
+
+        if remainder <= bt.two_thirds:
+            p1 = p0 - half_increments(remainder, decimal_division)
+        else:
+            p1 += cutpass
+
+        if remainder < bt.four_fifths:
+            remainder = 0
+
+    passes.sort()
+    for p in passes:
+        p = p * SCALE
+        if (xmin > 0 and (xmin - (p - halfwidth)) > PRECISION) or \
+           (xmax < board_width and ((p + halfwidth) - xmax) > PRECISION):
+            return None
+    return passes
+
+
+def adjoining_slot(prev, cut, bt, board_width, dheight):
+    '''
+    Returns the list of the (xmin, xmax), in ticks, of the adjoining cut
+    between the cuts prev and cut, which are (xmin, xmax) in ticks, following
+    router.adjoining_slot().  prev is None left of the first cut, and cut is
+    None right of the last cut.  The list is empty if there is no adjoining
+    cut.
+    '''
+    offset = bt.offset
+    if prev is None:
+        if cut[0] > 0:
+            right = cut[0] + offset - dheight
+            if right >= dheight:
+                return [(0, right)]
+        return []
+    left = prev[1] - offset + dheight
+    if cut is None:
+        if prev[1] < board_width and board_width - left >= dheight:
+            return [(max(0, left), board_width)]
+        return []
+    right = cut[0] + offset - dheight
+    return [(max(0, left), min(board_width, right))]
+
+
+def adjoining_cuts(cuts, bt, board_width, dheight):
+    '''
+    Given the cuts on an edge, as a list of (xmin, xmax) in ticks, computes
+    the cuts on the adjoining edge, following router.adjoining_cuts().
+
+    Returns a list of (xmin, xmax) in ticks.
+    '''
+    adj = []
+    for i in range(len(cuts) + 1):
+        prev = cuts[i - 1] if i > 0 else None
+        cut = cuts[i] if i < len(cuts) else None
+        adj.extend(adjoining_slot(prev, cut, bt, board_width, dheight))
+    return adj
+
+
+def cut_points(cut, bt, x0, xL, width):
+    '''
+    Creates the x-coordinates of the perimeter along the cut, as (xmin,
+    xmax) in ticks, following router.Board._cut_points().  x0 is the first
+    point of the perimeter of the edge.
+
+    Returns (x, on_surface), as do_cuts().
+    '''
+    halfgap = bt.halfgap
+    if halfgap is None:
+        raise Fixed_Point_Exception('Bit gap is not representable')
+    overhang = bt.overhang2
+    (xmin, xmax) = cut
+    x = []
+    s = []
+    if xmin > 0:
+        x.append(xmin + x0 + overhang - halfgap)
+        s.append(True)
+    x.append(xmin + xL - halfgap)
+    s.append(False)
+    x.append(xmax + xL + halfgap)
+    s.append(False)
+    if xmax < width:
+        x.append(xmax + xL - overhang + halfgap)
+        s.append(True)
+    return (x, s)
+
+
+def first_point(cuts, bt, xL):
+    '''
+    Returns the first x-coordinate of the perimeter of the cuts, in ticks,
+    which is the start of the first cut if it includes the left edge.
+    '''
+    if cuts[0][0] > 0:
+        return xL
+    if bt.halfgap is None:
+        raise Fixed_Point_Exception('Bit gap is not representable')
+    return cuts[0][0] + xL - bt.halfgap
+
+
+def do_cuts(cuts, bt, xL, width):
+    '''
+    Creates the x-coordinates of the perimeter for the given cuts, in ticks,
+    following router.Board._do_cuts().
+
+    cuts: list of (xmin, xmax) in ticks
+    xL, width: left edge and width of the board, in ticks
+
+    Returns (x, on_surface), where on_surface[i] is True if point i is on the
+    uncut surface of the board, and False if it is at the cut depth.
+    '''
+    x = []
+    s = []
+    if cuts[0][0] > 0:
+        x.append(xL)
+        s.append(True)
+    # x0 follows router.Board._do_cuts(), which uses the first point in the
+    # list, whichever it is.
+    x0 = first_point(cuts, bt, xL)
+    for c in cuts:
+        (xc, sc) = cut_points(c, bt, x0, xL, width)
+        x.extend(xc)
+        s.extend(sc)
+    if cuts[-1][1] < width:
+        x.append(xL + width)
+        s.append(True)
+    return (x, s)
@@ -0,0 +1,223 @@
+###########################################################################
+#
+# Copyright 2015-2018 Robert B. Lowrie (http://github.com/lowrie)
+#
+# This file is part of pyRouterJig.
+#
+# pyRouterJig is free software: you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# pyRouterJig is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR
+# A PARTICULAR PURPOSE.  See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along with
+# pyRouterJig; see the file LICENSE. If not, see <http://www.gnu.org/licenses/>.
+#
+###########################################################################
+
+'''
+Contains the index of the joints saved as PNG files, which is kept in a
+local SQLite database.  For example:
+
+    index = joint_index.Joint_Index()
+    index.update(working_dir, config)
+    for e in index.query(bit_width=0.5, board_width=7.5, spacing='Equa'):
+        print(e.path)
+
+Lengths in the index are in inches, so that joints saved in English and
+metric units can be compared.  The index is updated incrementally: a file
+is read again only if its modification time or size has changed.
+'''
+
+import hashlib
+import json
+import os
+import sqlite3
+
+import serialize
+
+# the default location of the index
+DEFAULT_PATH = os.path.join(os.path.expanduser('~'), '.pyrouterjig_index.sqlite')
+
+# the version of the database schema.  An index with another version is
+# rebuilt.
+SCHEMA_VERSION = 2
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS joints (
+    path TEXT PRIMARY KEY,
+    mtime REAL NOT NULL,
+    size INTEGER NOT NULL,
+    hash TEXT,
+    version TEXT,
+    metric INTEGER,
+    bit_width REAL,
+    bit_depth REAL,
+    bit_angle REAL,
+    board_width REAL,
+    spacing TEXT,
+    params TEXT,
+    num_cuts INTEGER
+);
+CREATE INDEX IF NOT EXISTS joints_bit ON joints (bit_width, bit_angle);
+CREATE INDEX IF NOT EXISTS joints_board ON joints (board_width);
+CREATE INDEX IF NOT EXISTS joints_hash ON joints (hash);
+'''
+
+# the columns of the joints table, in the order of Index_Entry's attributes
+COLUMNS = ['path', 'mtime', 'size', 'hash', 'version', 'metric', 'bit_width', 'bit_depth',
+           'bit_angle', 'board_width', 'spacing', 'params', 'num_cuts']
+
+
+class Index_Entry(object):
+    '''
+    A joint in the index.
+
+    path: The absolute path of the PNG file
+    mtime, size: The modification time and size of the file when indexed
+    hash: The SHA-256 of the serialized joint, which is the same for all
+          files that hold the same joint
+    version: The version of pyRouterJig that saved the joint
+    metric: True if the joint was designed in metric units
+    bit_width, bit_depth, board_width: In inches
+    bit_angle: In degrees
+    spacing: The spacing type, one of the values of serialize.SPACING_TYPES
+    params: Dictionary of the values of the spacing parameters
+    num_cuts: The number of cuts on Board-A
+    '''
+    def __init__(self, row):
+        for (k, v) in zip(COLUMNS, row):
+            setattr(self, k, v)
+        self.metric = bool(self.metric)
+        self.params = json.loads(self.params)
+
+
+def joint_row(text, config):
+    '''
+    Returns the values of the columns hash through num_cuts for the
+    dictionary text of the tEXt chunks of a PNG file, from
+    serialize.read_png_text().
+    '''
+    s = text[serialize.PNG_KEYS[0]]
+    version = text.get(serialize.PNG_KEYS[1])
+    (bit, boards, sp, sp_type) = serialize.unserialize(s, config, version is not None)
+    # hash the joint written again, so that files saved in older formats hash
+    # the same as the joint saved now
+    s = serialize.serialize(bit, boards, sp, config)
+    units = bit.units
+    if isinstance(sp.params, dict):
+        params = dict((k, serialize.encode_value(p.v)) for (k, p) in sp.params.items())
+    else:
+        params = {}
+    return (hashlib.sha256(s.encode('utf-8')).hexdigest(), version, units.metric,
+            units.increments_to_inches(bit.width), units.increments_to_inches(bit.depth),
+            float(bit.angle), units.increments_to_inches(boards[0].width), sp_type,
+            json.dumps(params, sort_keys=True), len(sp.cuts))
+
+
+class Joint_Index(object):
+    '''
+    The index of the joints saved as PNG files under one or more
+    directories.
+
+    path: The SQLite database file, or ':memory:'
+    '''
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = path
+        self.db = sqlite3.connect(path)
+        version = self.db.execute('PRAGMA user_version').fetchone()[0]
+        if version != SCHEMA_VERSION:
+            self.db.execute('DROP TABLE IF EXISTS joints')
+            self.db.execute('PRAGMA user_version = %d' % SCHEMA_VERSION)
+        self.db.executescript(SCHEMA)
+        self.db.commit()
+
+    def close(self):
+        '''Closes the database.'''
+        self.db.close()
+
+    def update(self, top, config):
+        '''
+        Indexes the PNG files in the directory tree top.  Only files that
+        are new, or whose modification time or size has changed, are read.
+        Files that no longer exist are removed from the index.  Returns the
+        tuple (number of files read, number of files removed).
+        '''
+        top = os.path.abspath(top)
+        known = {}
+        prefix = os.path.join(top, '')
+        for (path, mtime, size) in self.db.execute(
+                'SELECT path, mtime, size FROM joints WHERE substr(path, 1, ?) = ?',
+                (len(prefix), prefix)):
+            known[path] = (mtime, size)
+        nread = 0
+        for (dirpath, _, filenames) in os.walk(top):
+            for f in filenames:
+                if not f.lower().endswith('.png'):
+                    continue
+                path = os.path.join(dirpath, f)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                if known.pop(path, None) == (st.st_mtime, st.st_size):
+                    continue
+                self.db.execute('INSERT OR REPLACE INTO joints VALUES (%s)' %
+                                ','.join('?' * len(COLUMNS)),
+                                (path, st.st_mtime, st.st_size) + self.read(path, config))
+                nread += 1
+        self.db.executemany('DELETE FROM joints WHERE path = ?', [(p,) for p in known])
+        self.db.commit()
+        return (nread, len(known))
+
+    @staticmethod
+    def read(path, config):
+        '''
+        Returns the values of the columns hash through num_cuts for the PNG
+        file path.  If the file does not hold a joint, all of the values are
+        None, so that the file is not read again until it changes.
+        '''
+        try:
+            text = serialize.read_png_text(path)
+            if text.get(serialize.PNG_KEYS[0]):
+                return joint_row(text, config)
+        except Exception:  # any file that cannot be read is not a joint
+            pass
+        return (None,) * (len(COLUMNS) - 3)
+
+    def query(self, bit_width=None, bit_angle=None, board_width=None, spacing=None,
+              metric=None, tolerance=1e-4):
+        '''
+        Returns the list of Index_Entry of the joints that match all of the
+        arguments that are not None, sorted by path.  bit_width and
+        board_width are in inches, and match within tolerance inches.
+        bit_angle is in degrees, and also matches within tolerance.
+        '''
+        where = ['hash IS NOT NULL']
+        args = []
+        for (column, v) in [('bit_width', bit_width), ('bit_angle', bit_angle),
+                            ('board_width', board_width)]:
+            if v is not None:
+                where.append('%s BETWEEN ? AND ?' % column)
+                args.extend([float(v) - tolerance, float(v) + tolerance])
+        if spacing is not None:
+            where.append('spacing = ?')
+            args.append(spacing)
+        if metric is not None:
+            where.append('metric = ?')
+            args.append(int(metric))
+        rows = self.db.execute('SELECT %s FROM joints WHERE %s ORDER BY path' %
+                               (','.join(COLUMNS), ' AND '.join(where)), args)
+        return [Index_Entry(r) for r in rows]
+
+    def duplicates(self, entry):
+        '''
+        Returns the paths of the other files that hold the same joint as the
+        Index_Entry entry.
+        '''
+        rows = self.db.execute('SELECT path FROM joints WHERE hash = ? AND path != ? '
+                               'ORDER BY path', (entry.hash, entry.path))
+        return [r[0] for r in rows]
@@ -0,0 +1,243 @@
+###########################################################################
+#
+# Copyright 2015-2018 Robert B. Lowrie (http://github.com/lowrie)
+#
+# This file is part of pyRouterJig.
+#
+# pyRouterJig is free software: you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# pyRouterJig is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR
+# A PARTICULAR PURPOSE.  See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along with
+# pyRouterJig; see the file LICENSE. If not, see <http://www.gnu.org/licenses/>.
+#
+###########################################################################
+
+'''
+Contains the router pass sequencing, which orders the passes of all of the
+cut edges of a joint (A, B, C, ...) made on one setup of the template, so
+that the router carriage travels as little as possible.
+
+Each cut is always made with its passes in the order of the pass table,
+from right to left, as computed by router.Cut.make_router_passes().  The
+free choices are the order in which the edges are routed, and whether the
+cuts of each edge are visited from right to left (the table order) or from
+left to right.  A change in the direction of the carriage costs
+REVERSAL_INCHES of travel, to account for backlash.
+'''
+
+# The cost of a reversal of the carriage direction, as inches of travel
+REVERSAL_INCHES = 0.5
+
+
+def _sign(x):
+    '''Returns the sign of x, as -1, 0, or 1'''
+    return (x > 0) - (x < 0)
+
+
+def edge_sequence(cuts, left_to_right):
+    '''
+    Returns the list of (cut index, pass index) of the passes of cuts in the
+    order routed, visiting the cuts from right to left, or left to right if
+    left_to_right is True.  The passes of each cut are always from right to
+    left.
+    '''
+    icuts = range(len(cuts))
+    if not left_to_right:
+        icuts = reversed(icuts)
+    return [(ic, ip) for ic in icuts for ip in range(len(cuts[ic].passes) - 1, -1, -1)]
+
+
+def measure(positions):
+    '''
+    Returns (travel, reversals) of the carriage moving through positions.
+    '''
+    travel = 0
+    reversals = 0
+    last = 0
+    for (p0, p1) in zip(positions[:-1], positions[1:]):
+        s = _sign(p1 - p0)
+        travel += abs(p1 - p0)
+        if s != 0:
+            if last != 0 and s != last:
+                reversals += 1
+            last = s
+    return (travel, reversals)
+
+
+class Edge_Run(object):
+    '''
+    The passes of one edge, routed in one direction.
+
+    positions: The pass locations, in the order routed
+    travel, reversals: From measure(positions)
+    first_sign, last_sign: The directions of the first and last moves within
+                           the edge, or 0 if it has no moves
+    '''
+    def __init__(self, cuts, left_to_right):
+        self.left_to_right = left_to_right
+        self.sequence = edge_sequence(cuts, left_to_right)
+        self.positions = [cuts[ic].passes[ip] for (ic, ip) in self.sequence]
+        (self.travel, self.reversals) = measure(self.positions)
+        moves = [_sign(p1 - p0) for (p0, p1) in zip(self.positions[:-1], self.positions[1:])]
+        moves = [s for s in moves if s != 0]
+        self.first_sign = moves[0] if moves else 0
+        self.last_sign = moves[-1] if moves else 0
+
+
+class Pass_Order(object):
+    '''
+    The order of the router passes of the cut edges of a joint.
+
+    Attributes:
+
+    labels: The label of each edge, as from utils.cut_edges()
+    edges: The list of (edge index, left_to_right) in the order routed
+    sequences: For each edge, the list of (cut index, pass index) in the
+               order routed
+    offsets: For each edge, the number of passes routed before it, if
+             optimized, and otherwise 0, so that the passes of each edge
+             are numbered from 1 as in the pass table
+    travel, reversals: The total carriage travel (increments) and number of
+                       direction reversals
+    table_travel, table_reversals: The same, for the pass table order
+    optimized: True if from optimize()
+    '''
+    def __init__(self, all_cuts, labels, edges, optimized=False):
+        self.all_cuts = all_cuts
+        self.optimized = optimized
+        self.labels = labels
+        self.edges = edges
+        self.sequences = [None] * len(all_cuts)
+        self.offsets = [0] * len(all_cuts)
+        count = 0
+        for (ie, left_to_right) in edges:
+            self.sequences[ie] = edge_sequence(all_cuts[ie], left_to_right)
+            if optimized:
+                self.offsets[ie] = count
+            count += len(self.sequences[ie])
+        (self.travel, self.reversals) = measure(self.positions())
+        table = [p for cuts in all_cuts for (ic, ip) in edge_sequence(cuts, False)
+                 for p in [cuts[ic].passes[ip]]]
+        (self.table_travel, self.table_reversals) = measure(table)
+
+    def positions(self):
+        '''
+        Returns the pass locations of all of the edges, in the order routed.
+        '''
+        result = []
+        for (ie, _) in self.edges:
+            cuts = self.all_cuts[ie]
+            result.extend(cuts[ic].passes[ip] for (ic, ip) in self.sequences[ie])
+        return result
+
+    def pass_numbers(self, label, cuts):
+        '''
+        Returns the dictionary of the 1-based pass number of each (cut index,
+        pass index) of the edge with label, or None if cuts are not the cuts
+        of that edge (such as the caul cuts).  If optimized, the passes of
+        all of the edges are numbered in the order routed.
+        '''
+        if label not in self.labels:
+            return None
+        ie = self.labels.index(label)
+        if self.all_cuts[ie] is not cuts:
+            return None
+        offset = self.offsets[ie] + 1
+        return dict((s, i + offset) for (i, s) in enumerate(self.sequences[ie]))
+
+    def describe(self, units):
+        '''
+        Returns a description of the carriage travel, compared to the pass
+        table order.
+        '''
+        return units.transl.tr('Carriage travel: {} (reversals: {});'
+                               ' in table order: {} (reversals: {})').format(
+                                   units.increments_to_string(self.travel, True),
+                                   self.reversals,
+                                   units.increments_to_string(self.table_travel, True),
+                                   self.table_reversals)
+
+
+def table_order(all_cuts, labels):
+    '''
+    Returns the Pass_Order of the pass table: the edges in order, each from
+    right to left.
+    '''
+    return Pass_Order(all_cuts, labels, [(ie, False) for ie in range(len(all_cuts))])
+
+
+def optimize(all_cuts, labels, reversal_cost):
+    '''
+    Returns the Pass_Order that minimizes the carriage travel plus
+    reversal_cost (increments) for each reversal, over the order of the
+    edges and the direction of each.  Ties go to the pass table order.
+
+    Uses dynamic programming over the subsets of the edges, where the state
+    is the set of edges routed, the last edge and its direction, and the
+    direction of the last move.  There are at most 6 edges.  Edges without
+    passes are routed last.
+    '''
+    routed = [ie for (ie, cuts) in enumerate(all_cuts) if any(c.passes for c in cuts)]
+    n = len(routed)
+    runs = [[Edge_Run(all_cuts[ie], False), Edge_Run(all_cuts[ie], True)] for ie in routed]
+
+    def enter(sign, position, run):
+        '''Returns the (cost, sign) of moving from position to start run.'''
+        cost = 0
+        for (s, travel) in [(_sign(run.positions[0] - position),
+                             abs(run.positions[0] - position)),
+                            (run.first_sign, 0)]:
+            cost += travel
+            if s != 0:
+                if sign != 0 and s != sign:
+                    cost += reversal_cost
+                sign = s
+        cost += run.travel + reversal_cost * run.reversals
+        if run.last_sign != 0:
+            sign = run.last_sign
+        return (cost, sign)
+
+    # best[(mask, edge, direction, sign)] = (cost, previous state)
+    best = {}
+    for ie in range(n):
+        for d in [0, 1]:
+            run = runs[ie][d]
+            (cost, sign) = enter(0, run.positions[0], run)
+            best[(1 << ie, ie, d, sign)] = (cost, None)
+    for mask in range(1, 1 << n):
+        states = [k for k in best if k[0] == mask]
+        for state in sorted(states, key=lambda k: (k[1], k[2], k[3])):
+            (cost, _) = best[state]
+            (_, ie, d, sign) = state
+            position = runs[ie][d].positions[-1]
+            for je in range(n):
+                if mask & (1 << je):
+                    continue
+                for dj in [0, 1]:
+                    (c, s) = enter(sign, position, runs[je][dj])
+                    key = (mask | (1 << je), je, dj, s)
+                    if key not in best or cost + c < best[key][0]:
+                        best[key] = (cost + c, state)
+    full = (1 << n) - 1
+    state = None
+    for k in sorted((k for k in best if k[0] == full), key=lambda k: (k[1], k[2], k[3])):
+        if state is None or best[k][0] < best[state][0]:
+            state = k
+    edges = []
+    while state is not None:
+        edges.append((routed[state[1]], state[2] == 1))
+        state = best[state][1]
+    edges.reverse()
+    edges.extend((ie, False) for ie in range(len(all_cuts)) if ie not in routed)
+    order = Pass_Order(all_cuts, labels, edges, True)
+    table = Pass_Order(all_cuts, labels, [(ie, False) for ie in range(len(all_cuts))], True)
+    if order.travel + reversal_cost * order.reversals >= \
+       table.travel + reversal_cost * table.reversals:
+        return table
+    return order
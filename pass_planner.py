@@ -0,0 +1,149 @@
+###########################################################################
+#
+# Copyright 2015-2018 Robert B. Lowrie (http://github.com/lowrie)
+#
+# This file is part of pyRouterJig.
+#
+# pyRouterJig is free software: you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# pyRouterJig is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR
+# A PARTICULAR PURPOSE.  See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along with
+# pyRouterJig; see the file LICENSE. If not, see <http://www.gnu.org/licenses/>.
+#
+###########################################################################
+
+'''
+Contains the vectorized router pass planner.
+
+The planner computes the passes of many cuts at once, following
+fixed_point.router_passes() (and so router.Cut.make_router_passes()), with
+each step of the pass loop applied to all unfinished cuts together.  The
+lengths are integer ticks, as in fixed_point.
+
+The passes are returned as a ragged array: the passes of cut i are
+values[offsets[i]:offsets[i+1]], sorted.
+
+Requires numpy.  If numpy is not available, AVAILABLE is False.  numpy is
+imported on the first call to plan_passes(), so that importing this module
+(and router) stays fast.
+'''
+
+from importlib.util import find_spec
+
+from fixed_point import SCALE, HALF, PRECISION
+
+AVAILABLE = find_spec('numpy') is not None
+np = None
+
+
+def _import_numpy():
+    '''Imports numpy as the module global np'''
+    global np
+    if np is None:
+        import numpy as np
+
+
+def _math_round(t):
+    '''Vectorized fixed_point.math_round()'''
+    return np.where(t < 0, -((HALF - t) // SCALE), (t + HALF) // SCALE)
+
+
+def _trunc_increments(t):
+    '''Vectorized fixed_point.trunc_increments()'''
+    return np.where(t < 0, -(-t // SCALE), t // SCALE)
+
+
+def _half_increments(t, decimal_division):
+    '''Vectorized fixed_point.half_increments()'''
+    floored = (t // (2 * SCALE)) * SCALE
+    truncated = -((-t // (2 * SCALE)) * SCALE)
+    return np.where(decimal_division & (t < 0), truncated, floored)
+
+
+def plan_passes(xmin, xmax, board_width, bt):
+    '''
+    Computes the router passes of the cuts [xmin[i], xmax[i]].
+
+    xmin, xmax: integer arrays of the cut edges, in ticks
+    board_width: the board width in ticks, either a scalar or an array with
+                 one entry per cut, so that cuts on boards of different widths
+                 may be planned together
+    bt: fixed_point.Bit_Ticks
+
+    Returns (offsets, values, valid), where values holds the passes in integer
+    increments, as described in the module docstring, and valid[i] is False if
+    cut i is invalid.  The passes of an invalid cut are meaningless, and the
+    caller should use the Decimal computation to raise the appropriate
+    Router_Exception.
+    '''
+    _import_numpy()
+    xmin = np.asarray(xmin, dtype=np.int64)
+    xmax = np.asarray(xmax, dtype=np.int64)
+    width = np.broadcast_to(np.asarray(board_width, dtype=np.int64), xmin.shape)
+    n = xmin.shape[0]
+    halfwidth = bt.halfwidth
+    cutpass = bt.cutpass
+
+    # validate
+    valid = (xmin < xmax) & (xmin >= 0) & (xmax <= width)
+    valid &= ~((bt.width - (xmax - xmin) > PRECISION) & (xmin > 0) & (xmax < width))
+
+    remainder = xmax - xmin
+    at_right = (xmax == width)
+    decimal_division = at_right & (remainder > halfwidth)
+    p0 = np.where(decimal_division, xmax + halfwidth - cutpass,
+                  _math_round(xmax - halfwidth) * SCALE)
+    p1 = _math_round(xmin + halfwidth) * SCALE
+
+    # the first pass, at p0
+    first = valid & ((xmin - (p0 - halfwidth) < PRECISION) | (xmin == 0))
+    index = [np.nonzero(first)[0]]
+    values = [_trunc_increments(p0[first])]
+
+    # The pass loop, which each unfinished cut steps through together.  Only
+    # the unfinished cuts are carried, as the subset "k" of the cuts.
+    k = np.nonzero(valid & (remainder > 0))[0]
+    p0 = p0[k]
+    p1 = p1[k]
+    xmax_k = xmax[k]
+    at_right_k = at_right[k]
+    dd_k = decimal_division[k]
+    while k.shape[0] > 0:
+        remainder = p0 - p1
+        emit = (p0 != p1) & ((p1 + halfwidth - xmax_k < PRECISION) | at_right_k)
+        p1 = np.where(emit, _trunc_increments(p1) * SCALE, p1)
+        index.append(k[emit])
+        values.append(p1[emit] // SCALE)
+        p1 = np.where(remainder <= bt.two_thirds,
+                      p0 - _half_increments(remainder, dd_k), p1 + cutpass)
+        more = (remainder >= bt.four_fifths) & (remainder > 0)
+        k = k[more]
+        p0 = p0[more]
+        p1 = p1[more]
+        xmax_k = xmax_k[more]
+        at_right_k = at_right_k[more]
+        dd_k = dd_k[more]
+
+    # gather into the ragged array, with the passes of each cut sorted
+    index = np.concatenate(index)
+    values = np.concatenate(values)
+    order = np.lexsort((values, index))
+    index = index[order]
+    values = values[order]
+    offsets = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(index, minlength=n), out=offsets[1:])
+
+    # error check the passes
+    p = values * SCALE
+    cmin = xmin[index]
+    cmax = xmax[index]
+    bad = ((cmin > 0) & (cmin - (p - halfwidth) > PRECISION)) | \
+          ((cmax < width[index]) & (p + halfwidth - cmax > PRECISION))
+    valid[index[bad]] = False
+    return (offsets, values, valid)
@@ -19,5 +19,11 @@
 #
 ###########################################################################
 
-import qt_driver
-qt_driver.run()
+import sys
+
+if len(sys.argv) > 1 and sys.argv[1] == 'batch':
+    import batch
+    sys.exit(batch.main(sys.argv[2:]))
+else:
+    import qt_driver
+    qt_driver.run()
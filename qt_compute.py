@@ -0,0 +1,483 @@
+###########################################################################
+#
+# Copyright 2015-2018 Robert B. Lowrie (http://github.com/lowrie)
+#
+# This file is part of pyRouterJig.
+#
+# pyRouterJig is free software: you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# pyRouterJig is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR
+# A PARTICULAR PURPOSE.  See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along with
+# pyRouterJig; see the file LICENSE. If not, see <http://www.gnu.org/licenses/>.
+#
+###########################################################################
+
+
+'''
+Contains the scheduler of the joint geometry computations for the interactive
+controls, such as the spacing sliders and the Editor keys.
+
+Each change submits a snapshot of the joint, whose geometry is computed in a
+background thread, so that the controls never wait on the geometry.  A burst
+of changes is coalesced: while a computation runs, only the newest snapshot is
+kept to run next, and the running computation, now stale, is cancelled
+between the products of its geometry.  Only the geometry of the newest
+snapshot is delivered, after its cuts are copied back to the joint.
+
+Also contains the cache of the slider frames: the cuts of the joint for each
+value of each spacing slider, with the other parameters held at their current
+values.  The frames are computed in the background once the joint has not
+changed for FRAME_DELAY_MS, for at most FRAME_BUILD_SECONDS, nearest the
+current values first, so that scrubbing a slider looks up its cuts.
+'''
+
+import copy
+import time
+from collections import OrderedDict
+from decimal import localcontext
+
+from PyQt5 import QtCore
+
+import router
+import spacing
+import utils
+
+# The idle time after a change of the joint before the slider frames are
+# computed, in milliseconds
+FRAME_DELAY_MS = 250
+
+# The maximum time to compute the slider frames of a joint, in seconds
+FRAME_BUILD_SECONDS = 1.0
+
+# The maximum number of slider frames kept
+MAX_FRAMES = 4096
+
+
+def snapshot(boards, bit, spacing):
+    '''
+    Returns copies of (boards, bit, spacing), whose geometry may be computed
+    apart from the originals.  Only the cuts of the spacing are used by the
+    geometry, so the other attributes of its copy are shared.
+    '''
+    sp = copy.copy(spacing)
+    sp.cuts = [router.Cut(c.xmin, c.xmax) for c in spacing.cuts]
+    return ([b.snapshot() for b in boards], copy.copy(bit), sp)
+
+
+class Compute_Job(object):
+    '''
+    A computation of the geometry of a snapshot of the joint.
+
+    generation: The number of the submission
+    joint: The (boards, bit, spacing) of the joint submitted
+    geom: The router.Joint_Geometry of the snapshot
+    cancelled: If True, the computation stops before its next product
+    '''
+    def __init__(self, generation, template, boards, bit, spacing, margins, config):
+        self.generation = generation
+        self.joint = (boards, bit, spacing)
+        (boards, bit, spacing) = snapshot(boards, bit, spacing)
+        self.geom = router.Joint_Geometry(template, boards, bit, spacing, margins, config)
+        self.cancelled = False
+
+    def adopt(self):
+        '''
+        Copies the cuts of the snapshot back to the joint, and points the
+        geometry at the joint.  Returns the geometry.
+        '''
+        (boards, bit, spacing) = self.joint
+        for (b, s) in zip(boards, self.geom.boards):
+            b.adopt_cuts(s)
+        spacing.cuts = self.geom.spacing.cuts
+        self.geom.boards = boards
+        self.geom.bit = bit
+        self.geom.spacing = spacing
+        return self.geom
+
+
+class Compute_Signals(QtCore.QObject):
+    '''
+    The signals of a Compute_Runner, which is not itself a QObject.
+    '''
+    done = QtCore.pyqtSignal(object, object)
+
+
+class Compute_Runner(QtCore.QRunnable):
+    '''
+    Computes the geometry of a Compute_Job in a thread of the QThreadPool,
+    and emits signals.done with the job and the exception raised, if any.
+    '''
+    def __init__(self, job, signals):
+        QtCore.QRunnable.__init__(self)
+        self.job = job
+        self.signals = signals
+
+    def run(self):
+        error = None
+        try:
+            with localcontext(utils.decimal_context()):
+                for p in self.job.geom.PRODUCTS:
+                    if self.job.cancelled:
+                        break
+                    self.job.geom.get(p)
+        except Exception as e:
+            error = e
+        self.signals.done.emit(self.job, error)
+
+
+class Compute_Scheduler(QtCore.QObject):
+    '''
+    Computes the geometry of the newest joint submitted, one job at a time.
+
+    geometry_ready is emitted with the router.Joint_Geometry of the newest
+    submission, and geometry_failed with the exception that its computation
+    raised.
+    '''
+    geometry_ready = QtCore.pyqtSignal(object)
+    geometry_failed = QtCore.pyqtSignal(object)
+
+    def __init__(self, parent=None):
+        QtCore.QObject.__init__(self, parent)
+        self.generation = 0
+        self.running = None
+        self.next_job = None
+        self.pool = QtCore.QThreadPool(self)
+        self.pool.setMaxThreadCount(1)
+        self.signals = Compute_Signals()
+        self.signals.done.connect(self._on_done)
+
+    def submit(self, template, boards, bit, spacing, margins, config):
+        '''
+        Submits the joint for its geometry, cancelling any older submission.
+        The joint is copied, so it may change as soon as this returns.
+        '''
+        self.generation += 1
+        job = Compute_Job(self.generation, template, boards, bit, spacing, margins, config)
+        if self.running is None:
+            self._start(job)
+        else:
+            self.running.cancelled = True
+            self.next_job = job
+
+    def cancel(self):
+        '''
+        Cancels all of the submissions, such as when the geometry is
+        computed directly.
+        '''
+        self.generation += 1
+        if self.running is not None:
+            self.running.cancelled = True
+        self.next_job = None
+
+    def pending(self):
+        '''
+        Returns True if the geometry of the newest submission is not yet
+        delivered.
+        '''
+        return self.next_job is not None or \
+            (self.running is not None and not self.running.cancelled)
+
+    def wait(self):
+        '''
+        Waits until the background computation is done.  The geometry is
+        delivered when the event loop next runs.
+        '''
+        self.pool.waitForDone()
+
+    def _start(self, job):
+        '''
+        Starts computing job in the background.
+        '''
+        self.running = job
+        self.pool.start(Compute_Runner(job, self.signals))
+
+    @QtCore.pyqtSlot(object, object)
+    def _on_done(self, job, error):
+        '''
+        Delivers the geometry of job if it is the newest, and starts the next
+        job.
+        '''
+        self.running = None
+        if self.next_job is not None:
+            self._start(self.next_job)
+            self.next_job = None
+        if job.cancelled or job.generation != self.generation:
+            return
+        if error is not None:
+            self.geometry_failed.emit(error)
+        else:
+            self.geometry_ready.emit(job.adopt())
+
+
+def frame_key(sp):
+    '''
+    Returns the key of the slider frame of the spacing sp, from its type and
+    parameter values.
+    '''
+    return (type(sp).__name__,) + tuple(sp.params[k].v for k in sp.keys)
+
+
+def slider_settings(sp):
+    '''
+    Returns the list of (key, value) of every value of each slider of the
+    spacing sp, nearest the current values first.
+    '''
+    result = []
+    for (i, k) in enumerate(sp.sliders):
+        p = sp.params[k]
+        for v in range(int(p.vMin), int(p.vMax) + 1):
+            result.append((abs(v - p.v), i, k, v))
+    result.sort()
+    return [(k, v) for (_, _, k, v) in result]
+
+
+class Slider_Frame(object):
+    '''
+    The cuts of the boards and the labels of a spacing, for one set of its
+    parameter values.  The cuts, with their router passes, are stored as
+    router.Cut_Sets.
+    '''
+    def __init__(self, boards, sp):
+        self.labels = sp.labels[:]
+        self.description = sp.description
+        self.cuts = []
+        for b in boards:
+            self.cuts.append(tuple(None if c is None else router.Cut_Set(c)
+                                   for c in (b.bottom_cuts, b.top_cuts)))
+
+    def apply(self, boards, sp):
+        '''
+        Sets the cuts of the boards and spacing sp, as if from sp.set_cuts()
+        and router.cut_boards().
+        '''
+        sp.labels = self.labels[:]
+        sp.description = self.description
+        for (b, (bottom, top)) in zip(boards, self.cuts):
+            if bottom is not None:
+                b.bottom_cuts = bottom.cuts()
+            if top is not None:
+                b.top_cuts = top.cuts()
+        sp.cuts = boards[0].bottom_cuts
+
+
+class Frame_Job(object):
+    '''
+    A computation of the slider frames of a snapshot of the joint.
+
+    settings: The list of (key, value) of the slider settings to compute
+    seconds: The maximum time of the computation
+    cancelled: If True, the computation stops before its next frame
+    '''
+    def __init__(self, boards, bit, sp, settings, seconds):
+        (self.boards, self.bit, self.spacing) = snapshot(boards, bit, sp)
+        self.spacing.boards = self.boards
+        self.spacing.bit = self.bit
+        self.params = copy.deepcopy(sp.params)
+        self.settings = settings
+        self.seconds = seconds
+        self.cancelled = False
+
+    def frame(self, key, value):
+        '''
+        Returns the (frame key, Slider_Frame) with the slider key at value,
+        or None if the joint cannot be cut.
+        '''
+        sp = self.spacing
+        sp.params = copy.deepcopy(self.params)
+        try:
+            sp.set_slider(key, value)
+            sp.set_cuts()
+            router.cut_boards(self.boards, self.bit, sp)
+        except (spacing.Spacing_Exception, router.Router_Exception):
+            return None
+        return (frame_key(sp), Slider_Frame(self.boards, sp))
+
+
+class Frame_Signals(QtCore.QObject):
+    '''
+    The signals of a Frame_Builder, which is not itself a QObject.
+    '''
+    frames = QtCore.pyqtSignal(object, object)
+    done = QtCore.pyqtSignal(object, int, float, bool)
+
+
+class Frame_Builder(QtCore.QRunnable):
+    '''
+    Computes the slider frames of a Frame_Job in a thread of the QThreadPool.
+    Emits signals.frames with the job and lists of (frame key, Slider_Frame)
+    as they are computed, and signals.done with the job, the number of
+    frames, the time taken, and whether all of the settings were computed.
+    '''
+    # The time between the emits of the frames, in seconds
+    emit_seconds = 0.1
+
+    def __init__(self, job, signals):
+        QtCore.QRunnable.__init__(self)
+        self.job = job
+        self.signals = signals
+
+    def run(self):
+        job = self.job
+        start = time.perf_counter()
+        last = start
+        frames = []
+        count = 0
+        complete = True
+        with localcontext(utils.decimal_context()):
+            for (key, value) in job.settings:
+                now = time.perf_counter()
+                if job.cancelled or now - start > job.seconds:
+                    complete = False
+                    break
+                if now - last > self.emit_seconds and frames:
+                    self.signals.frames.emit(job, frames)
+                    frames = []
+                    last = now
+                f = job.frame(key, value)
+                if f is not None:
+                    frames.append(f)
+                    count += 1
+        if frames:
+            self.signals.frames.emit(job, frames)
+        self.signals.done.emit(job, count, time.perf_counter() - start, complete)
+
+
+class Frame_Cache(QtCore.QObject):
+    '''
+    Least-recently-used cache of the slider frames of one spacing, computed in
+    the background.
+
+    built is emitted when a computation of the frames is done, with the
+    number of frames computed, the time taken in seconds, and whether every
+    slider value was computed within FRAME_BUILD_SECONDS.
+
+    Attributes:
+
+    frames: The Slider_Frames, keyed by frame_key()
+    spacing: The spacing of the frames
+    hits, misses: Counts of the lookups
+    '''
+    built = QtCore.pyqtSignal(int, float, bool)
+
+    def __init__(self, parent=None, seconds=FRAME_BUILD_SECONDS, delay_ms=FRAME_DELAY_MS):
+        QtCore.QObject.__init__(self, parent)
+        self.seconds = seconds
+        self.frames = OrderedDict()
+        self.spacing = None
+        self.joint = None
+        self.axes = set()
+        self.running = None
+        self.hits = 0
+        self.misses = 0
+        self.pool = QtCore.QThreadPool(self)
+        self.pool.setMaxThreadCount(1)
+        self.signals = Frame_Signals()
+        self.signals.frames.connect(self._on_frames)
+        self.signals.done.connect(self._on_done)
+        self.timer = QtCore.QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(delay_ms)
+        self.timer.timeout.connect(self._on_timer)
+
+    def clear(self):
+        '''
+        Removes all of the frames, and cancels their computation.  This must
+        be called when the router bit or boards change.
+        '''
+        self.timer.stop()
+        if self.running is not None:
+            self.running.cancelled = True
+            self.running = None
+        self.frames.clear()
+        self.axes = set()
+        self.spacing = None
+        self.joint = None
+
+    def lookup(self, sp):
+        '''
+        Returns the Slider_Frame of the current parameter values of the
+        spacing sp, or None if it is not cached.
+        '''
+        frame = None
+        if sp is self.spacing:
+            frame = self.frames.get(frame_key(sp))
+        if frame is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self.frames.move_to_end(frame_key(sp))
+        return frame
+
+    def prepare(self, boards, bit, sp):
+        '''
+        Computes the frames of the spacing sp, for the current values of its
+        parameters, after the joint has not changed for the delay.
+        '''
+        if not sp.sliders:
+            return
+        if sp is not self.spacing:
+            self.clear()
+            self.spacing = sp
+        self.joint = (boards, bit)
+        self.timer.start()
+
+    def wait(self):
+        '''
+        Waits until the background computation is done.  The frames are
+        stored when the event loop next runs.
+        '''
+        self.pool.waitForDone()
+
+    @QtCore.pyqtSlot()
+    def _on_timer(self):
+        '''
+        Starts computing the frames of the sliders whose values, with the
+        other parameters at their current values, are not yet computed.
+        '''
+        if self.joint is None:
+            return
+        if self.running is not None:
+            # try again once the running computation is done
+            self.timer.start()
+            return
+        sp = self.spacing
+        settings = []
+        for (key, value) in slider_settings(sp):
+            axis = (key,) + tuple(sp.params[k].v for k in sp.keys if k != key)
+            if axis not in self.axes:
+                settings.append((key, value))
+        for key in sp.sliders:
+            self.axes.add((key,) + tuple(sp.params[k].v for k in sp.keys if k != key))
+        if settings:
+            (boards, bit) = self.joint
+            self.running = Frame_Job(boards, bit, sp, settings, self.seconds)
+            self.pool.start(Frame_Builder(self.running, self.signals))
+
+    @QtCore.pyqtSlot(object, object)
+    def _on_frames(self, job, frames):
+        '''
+        Stores frames computed in the background.
+        '''
+        if job.cancelled:
+            return
+        for (key, frame) in frames:
+            self.frames[key] = frame
+            self.frames.move_to_end(key)
+        while len(self.frames) > MAX_FRAMES:
+            self.frames.popitem(last=False)
+
+    @QtCore.pyqtSlot(object, int, float, bool)
+    def _on_done(self, job, count, seconds, complete):
+        '''
+        Reports a computation of the frames done.
+        '''
+        if job is self.running:
+            self.running = None
+        if not job.cancelled:
+            self.built.emit(count, seconds, complete)
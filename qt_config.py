@@ -135,10 +135,14 @@ class Config_Window(QtWidgets.QDialog):
     '''
     Qt interface to config file parameters
     '''
-    def __init__(self, config, units, parent=None):
+    def __init__(self, config, units, parent=None, config_read=None):
         QtWidgets.QDialog.__init__(self, parent)
         self.config = config
-        self.new_config = self.config.__dict__.copy()
+        # The values as read from the configuration file, which may differ
+        # from config for the preferences changed via the menus
+        if config_read is None:
+            config_read = self.config.__dict__
+        self.new_config = config_read.copy()
         self.line_edit_width = 80
         self.units = units
         self.transl = units.transl
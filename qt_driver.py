@@ -21,6 +21,11 @@
 '''
 Contains the main driver, using pySide or pyQt.
 '''
+from __future__ import print_function
+
+import time
+# The start of the import of this module, for the startup timing
+_IMPORT_START = time.perf_counter()
 
 import os
 import sys
@@ -28,34 +33,60 @@ import traceback
 import webbrowser
 import copy
 import shutil
-from io import BytesIO
-from decimal import getcontext
+from decimal import setcontext
 from builtins import str
-from PIL import Image
-from PIL import ImageCms
-from PIL import PngImagePlugin
 from PyQt5 import QtCore, QtGui, QtWidgets
+import qt_compute
 import qt_fig
-import qt_config
+import qt_io
 import qt_utils
 import config_file
 import router
 import spacing
 import utils
-import doc
-import serialize
-import threeDS
+
+# The modules only needed after startup, such as for the preferences dialog,
+# help strings, and saving, opening, and exporting, are imported on first
+# use, so that the main window appears sooner.
+
+
+class Startup_Timer(object):
+    '''
+    Records the elapsed time of each phase of the application startup, as
+    printed with the --startup-times option.
+    '''
+    def __init__(self, start):
+        self.start = start
+        self.last = start
+        self.phases = []
+
+    def lap(self, phase):
+        '''
+        Records the end of phase, which started at the end of the previous phase.
+        '''
+        t = time.perf_counter()
+        self.phases.append((phase, t - self.last))
+        self.last = t
+
+    def report(self, out=sys.stdout):
+        '''
+        Prints the time of each phase, and the total.
+        '''
+        for (phase, t) in self.phases:
+            print('%-24s %8.1f ms' % (phase, t * 1e3), file=out)
+        print('%-24s %8.1f ms' % ('total', (self.last - self.start) * 1e3), file=out)
 
 
 class Driver(QtWidgets.QMainWindow):
     '''
     Qt driver for pyRouterJig
     '''
-    def __init__(self, parent=None, app=None):
+    def __init__(self, parent=None, app=None, timer=None):
 
         QtWidgets.QMainWindow.__init__(self, parent)
         sys.excepthook = self.exception_hook
         self.except_handled = False
+        self.timer = timer
 
         # translator initialized in load config but we need the object created first
         self.transl = QtCore.QTranslator()
@@ -63,11 +94,12 @@ class Driver(QtWidgets.QMainWindow):
         # Read the config file.  We wait until the end of this init to print
         # the status message, because we need the statusbar to be created first.
         (self.config, msg) = self.load_config(app)
+        self.lap('config')
 
-        # Form the units
+        # Form the units.  The help strings are formed on first use.
         self.units = utils.Units(self.config.english_separator, self.config.metric,
                                  self.config.num_increments, self.transl)
-        self.doc = doc.Doc(self.units)
+        self.doc = None
 
         # Create an initial joint.  Even though another joint may be opened
         # later, we do this now so that the initial widget layout may be
@@ -90,22 +122,41 @@ class Driver(QtWidgets.QMainWindow):
         self.template = router.Incra_Template(self.units, self.boards)
         self.equal_spacing = spacing.Equally_Spaced(self.bit, self.boards, self.config)
         self.equal_spacing.set_cuts()
+        # The Variable spacing labels its widgets.  The Edit spacing is
+        # formed by reinit_spacing() when its tab is selected.
         self.var_spacing = spacing.Variable_Spaced(self.bit, self.boards, self.config)
         self.var_spacing.set_cuts()
-        self.edit_spacing = spacing.Edit_Spaced(self.bit, self.boards, self.config)
-        self.edit_spacing.set_cuts(self.equal_spacing.cuts)
+        self.edit_spacing = None
         self.spacing = self.equal_spacing  # the default
         self.spacing_index = None  # to be set in layout_widgets()
         self.description = None
         self.woods = {}
 
+        # The geometry of the slider and Editor changes is computed in the
+        # background
+        self.scheduler = qt_compute.Compute_Scheduler(self)
+        self.scheduler.geometry_ready.connect(self._on_geometry_ready)
+        self.scheduler.geometry_failed.connect(self._on_geometry_failed)
+        # ...and the cuts of each slider value are computed ahead, in the
+        # slider frames
+        self.frames = qt_compute.Frame_Cache(self)
+        self.frames.built.connect(self._on_frames_built)
+        # ...and files are written in the background
+        self.io_pool = qt_io.IO_Pool(self)
+        self.io_pool.written.connect(self._on_file_written)
+        self.io_pool.failed.connect(self._on_file_failed)
+        self.lap('joint')
+
         # Create the main frame and menus
         self.create_status_bar()
         self.create_widgets()
+        self.lap('widgets')
         self.create_menu()
+        self.lap('menus')
 
         # Draw the initial figure
         self.draw()
+        self.lap('draw')
 
         # Keep track whether the current figure has been saved.  We initialize to true,
         # because we assume that that the user does not want the default joint saved.
@@ -124,15 +175,79 @@ class Driver(QtWidgets.QMainWindow):
         self.control_key = False
         self.alt_key = False
 
-        # Initialize the configuration window, even though we might not use
-        # it.  We do this so that if certain preferences are changed via the
-        # menus, such as show_caul, the config window keeps track whether any such
-        # changes have occurred, in order to enable its Save button.
-        self.config_window = qt_config.Config_Window(self.config, self.units, self)
+        # The configuration window is created on first use.  Until then, keep
+        # the configuration as read and the preferences changed via the menus,
+        # such as show_caul, so that the config window can enable its Save
+        # button for such changes.
+        self.config_window = None
+        self.config_read = self.config.__dict__.copy()
+        self.config_changes = []
+
+        # The tool tips are set after the window is first painted
+        self.fig.canvas.installEventFilter(self)
 
         # ... show the status message from reading the configuration file
         self.status_message(msg)
 
+    def lap(self, phase):
+        '''
+        Records the end of the startup phase, if timing the startup.
+        '''
+        if self.timer is not None:
+            self.timer.lap(phase)
+
+    def eventFilter(self, obj, event):
+        '''
+        Finishes the startup after the figure is first painted.
+        '''
+        if obj is self.fig.canvas and event.type() == QtCore.QEvent.Paint:
+            self.fig.canvas.removeEventFilter(self)
+            QtCore.QTimer.singleShot(0, self._on_first_paint)
+        return False
+
+    @QtCore.pyqtSlot()
+    def _on_first_paint(self):
+        '''
+        Does the startup work deferred until the window is painted.
+        '''
+        self.lap('first paint')
+        self.update_tooltips()
+        self.threeDS_enabler()
+        self.lap('tool tips')
+        if self.timer is not None:
+            self.timer.report()
+            self.timer = None
+
+    def get_doc(self):
+        '''
+        Returns the help strings, forming them on first use.
+        '''
+        if self.doc is None:
+            import doc
+            self.doc = doc.Doc(self.units)
+        return self.doc
+
+    def get_config_window(self):
+        '''
+        Returns the configuration window, creating it on first use.
+        '''
+        if self.config_window is None:
+            import qt_config
+            self.config_window = qt_config.Config_Window(self.config, self.units, self,
+                                                         self.config_read)
+            for key in self.config_changes:
+                self.config_window.update_state(key)
+        return self.config_window
+
+    def update_config_state(self, key):
+        '''
+        Records that the configuration value key was changed via the menus.
+        '''
+        if self.config_window is None:
+            self.config_changes.append(key)
+        else:
+            self.config_window.update_state(key)
+
     def load_config(self, app=None):
         '''
         Sets the config attribute, by either
@@ -263,6 +378,13 @@ class Driver(QtWidgets.QMainWindow):
         open_action.triggered.connect(self._on_open)
         file_menu.addAction(open_action)
 
+        find_action = QtWidgets.QAction(self.transl.tr('&Find Joint...'), self)
+        find_action.setShortcut('Ctrl+Shift+O')
+        find_action.setStatusTip(self.transl.tr(
+            'Finds a saved joint by its bit, board width and spacing'))
+        find_action.triggered.connect(self._on_find)
+        file_menu.addAction(find_action)
+
         save_action = QtWidgets.QAction(self.transl.tr('&Save File...'), self)
         save_action.setShortcut('Ctrl+S')
         save_action.setStatusTip(self.transl.tr('Saves an image of the joint to a file'))
@@ -339,6 +461,14 @@ class Driver(QtWidgets.QMainWindow):
         pass_menu.addAction(self.pass_location_action)
         self.pass_location_action.setChecked(self.config.show_router_pass_locations)
 
+        self.pass_order_action = QtWidgets.QAction(self.transl.tr('Minimize Travel'),
+                                                   self, checkable=True)
+        self.pass_order_action.setStatusTip(self.transl.tr(
+            'Toggle ordering router passes to minimize carriage travel'))
+        self.pass_order_action.triggered.connect(self._on_pass_order)
+        pass_menu.addAction(self.pass_order_action)
+        self.pass_order_action.setChecked(self.config.optimize_pass_order)
+
         # The Mac automatically adds full screen to the View menu, but do so for other platforms
         # if not utils.isMac():
         view_menu.addSeparator()
@@ -368,7 +498,8 @@ class Driver(QtWidgets.QMainWindow):
         self.threeDS_action.setStatusTip(self.transl.tr('Export the joint to a 3DS file'))
         self.threeDS_action.triggered.connect(self._on_3ds)
         tools_menu.addAction(self.threeDS_action)
-        self.threeDS_enabler()
+        # ... enabled in threeDS_enabler(), after the window is first painted
+        self.threeDS_action.setEnabled(False)
 
         tools_menu.addSeparator()
 
@@ -454,6 +585,8 @@ class Driver(QtWidgets.QMainWindow):
         self.fig.canvas.setSizePolicy(QtWidgets.QSizePolicy.Expanding,
                                       QtWidgets.QSizePolicy.Expanding)
         self.fig.canvas.setFocus()
+        self.fig.cut_selected.connect(self._on_fig_cut_selected)
+        self.fig.cuts_edited.connect(self._on_fig_cuts_edited)
 
         # Board width line edit
         self.le_board_width_label = QtWidgets.QLabel(self.transl.tr('Board Width{}').format(us))
@@ -604,6 +737,9 @@ class Driver(QtWidgets.QMainWindow):
         edit_btn_undo = QtWidgets.QPushButton(self.transl.tr('Undo'), self.main_frame)
         edit_btn_undo.clicked.connect(self._on_edit_undo)
         edit_btn_undo.setToolTip(self.transl.tr('Undo the last change'))
+        edit_btn_redo = QtWidgets.QPushButton(self.transl.tr('Redo'), self.main_frame)
+        edit_btn_redo.clicked.connect(self._on_edit_redo)
+        edit_btn_redo.setToolTip(self.transl.tr('Redo the last undone change'))
         edit_btn_add = QtWidgets.QPushButton(self.transl.tr('Add'), self.main_frame)
         edit_btn_add.clicked.connect(self._on_edit_add)
         edit_btn_add.setToolTip(self.transl.tr('Add a cut (if there is space to add cuts)'))
@@ -807,6 +943,7 @@ class Driver(QtWidgets.QMainWindow):
         hbox_edit.addLayout(grid_edit)
         hbox_edit.addStretch(1)
         hbox_edit.addWidget(edit_btn_undo)
+        hbox_edit.addWidget(edit_btn_redo)
 
         # Add the spacing layouts as Tabs
         self.tabs_spacing = QtWidgets.QTabWidget()
@@ -862,7 +999,6 @@ class Driver(QtWidgets.QMainWindow):
         self._on_wood(1)
         self._on_wood(2)
         self._on_wood(3)
-        self.update_tooltips()
 
     def update_cb_vsfingers(self, vMin, vMax, value):
         '''
@@ -879,6 +1015,7 @@ class Driver(QtWidgets.QMainWindow):
         [Re]sets the tool tips for widgets whose tips depend on user settings
         '''
 
+        doc = self.get_doc()
         disable = ''
         if self.spacing_index == self.edit_spacing_id:
             disable = self.transl.tr('  <b>Cannot change if in Editor mode.</b>')
@@ -892,36 +1029,36 @@ class Driver(QtWidgets.QMainWindow):
             disable_dd = self.transl.tr(
                 '  <b>Cannot change unless "Double-Double Board" is not NONE.</b>')
 
-        self.le_board_width_label.setToolTip(self.doc.board_width() + disable)
-        self.le_board_width.setToolTip(self.doc.board_width() + disable)
-        self.le_bit_width_label.setToolTip(self.doc.bit_width() + disable)
-        self.le_bit_width.setToolTip(self.doc.bit_width() + disable)
-        self.le_bit_depth_label.setToolTip(self.doc.bit_depth() + disable)
-        self.le_bit_depth.setToolTip(self.doc.bit_depth() + disable)
-        self.le_bit_angle_label.setToolTip(self.doc.bit_angle() + disable)
-        self.le_bit_angle.setToolTip(self.doc.bit_angle() + disable)
-
-        self.cb_wood_label[0].setToolTip(self.doc.top_board() + disable)
-        self.cb_wood[0].setToolTip(self.doc.top_board() + disable)
-        self.cb_wood_label[1].setToolTip(self.doc.bottom_board() + disable)
-        self.cb_wood[1].setToolTip(self.doc.bottom_board() + disable)
-        self.cb_wood_label[2].setToolTip(self.doc.double_board() + disable)
-        self.cb_wood[2].setToolTip(self.doc.double_board() + disable)
-        self.cb_wood_label[3].setToolTip(self.doc.dd_board() + disable_double)
-        self.cb_wood[3].setToolTip(self.doc.dd_board() + disable_double)
-
-        self.le_boardm_label[0].setToolTip(self.doc.double_thickness() + disable_double)
-        self.le_boardm[0].setToolTip(self.doc.double_thickness() + disable_double)
-        self.le_boardm_label[1].setToolTip(self.doc.dd_thickness() + disable_dd)
-        self.le_boardm[1].setToolTip(self.doc.dd_thickness() + disable_dd)
-
-        self.es_slider0_label.setToolTip(self.doc.es_slider0())
-        self.es_slider0.setToolTip(self.doc.es_slider0())
-        self.es_slider1_label.setToolTip(self.doc.es_slider1())
-        self.es_slider1.setToolTip(self.doc.es_slider1())
-        self.cb_es_centered.setToolTip(self.doc.es_centered())
-        self.cb_vsfingers_label.setToolTip(self.doc.cb_vsfingers())
-        self.cb_vsfingers.setToolTip(self.doc.cb_vsfingers())
+        self.le_board_width_label.setToolTip(doc.board_width() + disable)
+        self.le_board_width.setToolTip(doc.board_width() + disable)
+        self.le_bit_width_label.setToolTip(doc.bit_width() + disable)
+        self.le_bit_width.setToolTip(doc.bit_width() + disable)
+        self.le_bit_depth_label.setToolTip(doc.bit_depth() + disable)
+        self.le_bit_depth.setToolTip(doc.bit_depth() + disable)
+        self.le_bit_angle_label.setToolTip(doc.bit_angle() + disable)
+        self.le_bit_angle.setToolTip(doc.bit_angle() + disable)
+
+        self.cb_wood_label[0].setToolTip(doc.top_board() + disable)
+        self.cb_wood[0].setToolTip(doc.top_board() + disable)
+        self.cb_wood_label[1].setToolTip(doc.bottom_board() + disable)
+        self.cb_wood[1].setToolTip(doc.bottom_board() + disable)
+        self.cb_wood_label[2].setToolTip(doc.double_board() + disable)
+        self.cb_wood[2].setToolTip(doc.double_board() + disable)
+        self.cb_wood_label[3].setToolTip(doc.dd_board() + disable_double)
+        self.cb_wood[3].setToolTip(doc.dd_board() + disable_double)
+
+        self.le_boardm_label[0].setToolTip(doc.double_thickness() + disable_double)
+        self.le_boardm[0].setToolTip(doc.double_thickness() + disable_double)
+        self.le_boardm_label[1].setToolTip(doc.dd_thickness() + disable_dd)
+        self.le_boardm[1].setToolTip(doc.dd_thickness() + disable_dd)
+
+        self.es_slider0_label.setToolTip(doc.es_slider0())
+        self.es_slider0.setToolTip(doc.es_slider0())
+        self.es_slider1_label.setToolTip(doc.es_slider1())
+        self.es_slider1.setToolTip(doc.es_slider1())
+        self.cb_es_centered.setToolTip(doc.es_centered())
+        self.cb_vsfingers_label.setToolTip(doc.cb_vsfingers())
+        self.cb_vsfingers.setToolTip(doc.cb_vsfingers())
 
     def create_status_bar(self):
         '''
@@ -1014,10 +1151,99 @@ class Driver(QtWidgets.QMainWindow):
         '''(Re)draws the template and boards'''
         if self.config.debug:
             print('draw')
+        self.scheduler.cancel()
         self.template = router.Incra_Template(self.units, self.boards)
         self.fig.draw(self.template, self.boards, self.bit, self.spacing, self.woods,
                       self.description)
         self.status_fit()
+        self.frames.prepare(self.boards, self.bit, self.spacing)
+
+    def schedule_draw(self):
+        '''
+        Redraws the template and boards once their geometry is computed in the
+        background, for the changes that come in bursts, such as from the
+        sliders and the Editor.  Until then, the status bar shows that the
+        geometry is pending.
+        '''
+        if self.config.debug:
+            print('schedule_draw')
+        self.template = router.Incra_Template(self.units, self.boards)
+        self.fig.set_fig_dimensions(self.template, self.boards)
+        self.scheduler.submit(self.template, self.boards, self.bit, self.spacing,
+                              self.fig.margins, self.config)
+        self.status_fit_label.setStyleSheet('color: gray')
+        self.status_fit_label.setText(self.transl.tr('Computing the joint...'))
+
+    def draw_spacing(self, sp, background=True):
+        '''
+        Draws the template and boards after a change of the parameters of the
+        spacing sp: at once if their cuts are in the slider frames, and
+        otherwise in the background, or now if background is False.
+        '''
+        frame = None
+        if sp is self.spacing:
+            frame = self.frames.lookup(sp)
+        if frame is None:
+            sp.set_cuts()
+            if background:
+                self.schedule_draw()
+            else:
+                self.draw()
+            return
+        if self.config.debug:
+            print('draw_spacing from the slider frames')
+        self.scheduler.cancel()
+        frame.apply(self.boards, sp)
+        self.template = router.Incra_Template(self.units, self.boards)
+        self.fig.set_fig_dimensions(self.template, self.boards)
+        geom = router.Joint_Geometry(self.template, self.boards, self.bit, sp,
+                                     self.fig.margins, self.config)
+        self.fig.set_geometry(geom.use_board_cuts().compute(), self.woods, self.description)
+        self.status_fit()
+        self.frames.prepare(self.boards, self.bit, sp)
+
+    def finish_draw(self):
+        '''
+        Draws the template and boards now, if their geometry is pending, so
+        that the boards have the cuts of the joint.
+        '''
+        if self.scheduler.pending():
+            self.draw()
+
+    @QtCore.pyqtSlot(object)
+    def _on_geometry_ready(self, geom):
+        '''Draws the geometry computed in the background'''
+        if self.config.debug:
+            print('_on_geometry_ready')
+        self.fig.set_geometry(geom, self.woods, self.description)
+        self.status_fit()
+        self.frames.prepare(self.boards, self.bit, self.spacing)
+
+    @QtCore.pyqtSlot(int, float, bool)
+    def _on_frames_built(self, count, seconds, complete):
+        '''Reports the slider frames computed in the background'''
+        if self.config.debug:
+            print('_on_frames_built %d frames in %.3f s%s' %
+                  (count, seconds, '' if complete else ', stopped at the time limit'))
+
+    @QtCore.pyqtSlot(object)
+    def _on_geometry_failed(self, error):
+        '''Reports the exception of the geometry computed in the background'''
+        msg = ''.join(traceback.format_exception_only(type(error), error)).strip()
+        if self.config.debug:
+            print('_on_geometry_failed', msg)
+        # the fit of the geometry drawn is no longer that of the joint
+        self.status_fit_label.setStyleSheet('background-color: red; color: white')
+        self.status_fit_label.setText(self.transl.tr('Unable to compute the joint'))
+        self.status_message(msg, warning=True)
+        QtWidgets.QMessageBox.warning(self, self.transl.tr('Error'), msg)
+
+    def draw_active_cuts(self):
+        '''
+        Redraws the active cuts, for Editor changes that leave the joint
+        unchanged, such as moving the cursor.
+        '''
+        self.fig.update()
 
     def reinit_spacing(self):
         '''
@@ -1025,6 +1251,7 @@ class Driver(QtWidgets.QMainWindow):
         when the router bit or board change dimensions.
         '''
         spacing_index = self.tabs_spacing.currentIndex()
+        self.frames.clear()
 
         # Re-create the spacings objects
         if spacing_index == self.equal_spacing_id:
@@ -1129,6 +1356,12 @@ class Driver(QtWidgets.QMainWindow):
         else:
             raise ValueError(self.transl.tr('Bad value for spacing_index %d') % self.spacing_index)
 
+        # in the Editor, the cuts are also edited with the mouse
+        if self.spacing is self.edit_spacing:
+            self.fig.enable_cut_editing(self.spacing)
+        else:
+            self.fig.enable_cut_editing(None)
+
         self.update_tooltips()
 
     @QtCore.pyqtSlot(int)
@@ -1253,10 +1486,9 @@ class Driver(QtWidgets.QMainWindow):
         '''Handles changes to the equally-spaced slider spacing'''
         if self.config.debug:
             print('_on_es_slider0', value)
-        self.equal_spacing.params['Spacing'].v = value
-        self.equal_spacing.set_cuts()
+        self.equal_spacing.set_slider('Spacing', value)
+        self.draw_spacing(self.equal_spacing)
         self.es_slider0_label.setText(self.equal_spacing.labels[0])
-        self.draw()
         self.status_message(self.transl.tr('Changed slider %s') % str(self.es_slider0_label.text()))
         self.file_saved = False
 
@@ -1265,10 +1497,9 @@ class Driver(QtWidgets.QMainWindow):
         '''Handles changes to the equally-spaced slider Width'''
         if self.config.debug:
             print('_on_es_slider1', value)
-        self.equal_spacing.params['Width'].v = value
-        self.equal_spacing.set_cuts()
+        self.equal_spacing.set_slider('Width', value)
+        self.draw_spacing(self.equal_spacing)
         self.es_slider1_label.setText(self.equal_spacing.labels[1])
-        self.draw()
         self.status_message(self.transl.tr('Changed slider %s') % str(self.es_slider1_label.text()))
         self.file_saved = False
 
@@ -1277,10 +1508,9 @@ class Driver(QtWidgets.QMainWindow):
         '''Handles changes to the variable spaced slider D'''
         if self.config.debug:
             print('_on_vs_slider0', value)
-        self.var_spacing.params['Spacing'].v = value
-        self.var_spacing.set_cuts()
+        self.var_spacing.set_slider('Spacing', value)
+        self.draw_spacing(self.var_spacing)
         self.vs_slider0_label.setText(self.var_spacing.labels[1])
-        self.draw()
         self.status_message(self.transl.tr('Changed slider %s') % str(self.vs_slider0_label.text()))
         self.file_saved = False
 
@@ -1325,18 +1555,16 @@ class Driver(QtWidgets.QMainWindow):
         '''Handles changes to the variable-spaced slider Fingers'''
         if self.config.debug:
             print('_on_cb_vsfingers', index)
-        self.var_spacing.params['Fingers'].v = int(self.cb_vsfingers.itemText(index))
-        self.var_spacing.calc_var_params()
+        self.var_spacing.set_slider('Fingers', int(self.cb_vsfingers.itemText(index)))
 
         # ...combox box for fingers
         p = self.var_spacing.params['Spacing']
         self.vs_slider0.setMinimum(p.vMin)
         self.vs_slider0.setMaximum(p.vMax)
         self.vs_slider0.setValue(p.v)
-        self.var_spacing.set_cuts()
+        self.draw_spacing(self.var_spacing, False)
 
         self.cb_vsfingers_label.setText(self.var_spacing.labels[0])
-        self.draw()
         self.status_message(self.transl.tr('%s ') % str(self.cb_vsfingers_label.text()) + \
                             self.cb_vsfingers.itemText(index))
         self.file_saved = False
@@ -1358,6 +1586,8 @@ class Driver(QtWidgets.QMainWindow):
         '''
         if self.config.debug:
             print('_on_save')
+        self.finish_draw()
+        import serialize
 
         # Form the default filename prefix
         prefix = 'pyrouterjig'
@@ -1398,11 +1628,12 @@ class Driver(QtWidgets.QMainWindow):
                 self.status_message(self.transl.tr('File not saved'), warning=True)
                 return
 
-        # Save the file with metadata
+        # Save the file with metadata.  The image and the serialized joint
+        # are the snapshot, which is encoded and written in the background.
 
         if do_screenshot:
             p_screen = QtWidgets.QApplication.primaryScreen()
-            image = p_screen.grabWindow(self.winId())
+            image = p_screen.grabWindow(self.winId()).toImage()
         else:
             image = self.fig.image(self.template, self.boards, self.bit, self.spacing,
                                    self.woods, self.description)
@@ -1410,65 +1641,53 @@ class Driver(QtWidgets.QMainWindow):
         s = serialize.serialize(self.bit, self.boards, self.spacing,
                                 self.config)
 
-        # we use UUEC encoding so need more attributes in the image file
-        # QT5 does not work propertly with PNG text; use PIL as workaround
+        def write(path):
+            qt_io.write_bytes(qt_utils.png_bytes(image, s))(path)
 
-        # Save QT image into stream and get it back into PIL to avoid native
-        # pil conversion risks
-        buffer = QtCore.QBuffer()
-        buffer.open(QtCore.QIODevice.ReadWrite)
-        image.save(buffer, "PNG")
-        pio = BytesIO()
-        pio.write(buffer.data())
-        pio.seek(0)
-        buffer.close()
-        pilimg = Image.open(pio)
-
-        # convert image to unifyed profile
-        # however we know that the image taken from monitor so need to convert monitor to sRGB
-        # feel free to use other profile if any
-        monitor_profile = ImageCms.get_display_profile()
-        if monitor_profile != None:
-            monitor_profile = ImageCms.createProfile('sRGB') # rare happen case - non profiled monitor!!!!
-
-        srgb = ImageCms.createProfile('sRGB')
-
-        # here we convert image to the profile. and got the profile into info
-        # The point is that the info will lost on save so we have to assign the proper one profile when safe the image
-        pilimg = ImageCms.profileToProfile(pilimg, monitor_profile, srgb)
-
-        # uncomment the line below to set color profiling off
-        info = PngImagePlugin.PngInfo()
-
-        info.add_text('pyRouterJig', s)
-        info.add_text('pyRouterJig_v', utils.VERSION)
+        self.submit_file(qt_io.IO_Job(filename, write,
+                                      self.transl.tr('Saved to file %s') % filename,
+                                      self.transl.tr('Unable to save to file %s') % filename,
+                                      'png'))
+        if self.screenshot_index is not None:
+            self.screenshot_index += 1
+        self.file_saved = True
 
-        r = True
-        try:
-            pilimg.save(filename, 'png', pnginfo=info )
-        except OSError:
-            r = False
+    def submit_file(self, job):
+        '''
+        Writes the file of the qt_io.IO_Job job in the background.
+        '''
+        self.status_message(self.transl.tr('Writing %s...') % job.filename)
+        self.io_pool.submit(job)
 
-        if r:
-            self.status_message(self.transl.tr('Saved to file %s') % filename)
-            if self.screenshot_index is not None:
-                self.screenshot_index += 1
-            self.file_saved = True
+    @QtCore.pyqtSlot(object)
+    def _on_file_written(self, job):
+        '''
+        Handles files written in the background
+        '''
+        if self.config.debug:
+            print('_on_file_written', job.filename)
+        if self.io_pool.pending() == 0:
+            self.status_message(job.message)
         else:
-            self.status_message(self.transl.tr('Unable to save to file %s') % filename,
-                                warning=True)
+            self.status_message(job.message + self.transl.tr(' (%d more files being written)') %
+                                self.io_pool.pending())
 
-    @QtCore.pyqtSlot()
-    def _on_open(self):
+    @QtCore.pyqtSlot(object, object)
+    def _on_file_failed(self, job, error):
         '''
-        Handles open file events.  The file format is  PNG, with metadata
-        to support recreating the joint.  In other words, the file must
-        have been saved using _on_save().
+        Handles files that could not be written in the background
         '''
         if self.config.debug:
-            print('_on_open')
+            print('_on_file_failed', job.filename, error)
+        if job.kind == 'png':
+            self.file_saved = False
+        self.status_message(job.error_message, warning=True)
 
-        # Make sure changes are not lost
+    def confirm_open(self):
+        '''
+        Returns True if the current joint may be replaced by opening a file,
+        asking the user if it has not been saved.
+        '''
         if not self.file_saved:
             msg = self.transl.tr('Current joint not saved.'\
                   ' Opening a new file will overwrite the current joint.'\
@@ -1478,7 +1697,22 @@ class Driver(QtWidgets.QMainWindow):
                                                    QtWidgets.QMessageBox.No)
 
             if reply == QtWidgets.QMessageBox.No:
-                return
+                return False
+        return True
+
+    @QtCore.pyqtSlot()
+    def _on_open(self):
+        '''
+        Handles open file events.  The file format is  PNG, with metadata
+        to support recreating the joint.  In other words, the file must
+        have been saved using _on_save().
+        '''
+        if self.config.debug:
+            print('_on_open')
+
+        # Make sure changes are not lost
+        if not self.confirm_open():
+            return
 
         # Get the file name
         filename, _ = QtWidgets.QFileDialog.getOpenFileName(
@@ -1489,10 +1723,51 @@ class Driver(QtWidgets.QMainWindow):
         if not filename:
             self.status_message(self.transl.tr('File open aborted'), warning=True)
             return
+        self.open_file(filename)
+
+    @QtCore.pyqtSlot()
+    def _on_find(self):
+        '''
+        Handles find joint events.  The PNG files in the working directory
+        are indexed, and the one chosen in the qt_index.Index_Dialog is
+        opened.
+        '''
+        if self.config.debug:
+            print('_on_find')
+        import joint_index
+        import qt_index
+
+        if not self.confirm_open():
+            return
+
+        index = joint_index.Joint_Index()
+        try:
+            (nread, _) = index.update(self.working_dir, self.config)
+            if self.config.debug:
+                print('indexed', nread)
+            dialog = qt_index.Index_Dialog(index, self.units, self)
+            filename = None
+            if dialog.exec_():
+                filename = dialog.selected_file()
+        finally:
+            index.close()
+        if not filename:
+            self.status_message(self.transl.tr('File open aborted'), warning=True)
+            return
+        self.open_file(filename)
+
+    def open_file(self, filename):
+        '''
+        Opens the joint saved in the PNG file filename.
+        '''
+        import serialize
 
-        # From the image file, parse the metadata.
-        image = Image.open(filename)
-        s = image.info['pyRouterJig']
+        # From the image file, parse the metadata, without reading the image.
+        try:
+            text = serialize.read_png_text(filename)
+        except (IOError, serialize.Serialize_Exception):
+            text = {}
+        s = text.get('pyRouterJig')
 
         if not s:
             msg = self.transl.tr('File %s does not contain pyRouterJig data.  The PNG file'\
@@ -1502,8 +1777,7 @@ class Driver(QtWidgets.QMainWindow):
 
         # backwards compatibility
         (bit, boards, sp, sp_type) = \
-            serialize.unserialize(s, self.config, ('pyRouterJig_v' in image.info.keys()),
-                                  self.transl)
+            serialize.unserialize(s, self.config, ('pyRouterJig_v' in text), self.transl)
 
         if self.bit.units.metric != bit.units.metric:
             scales_name = 'English'
@@ -1520,7 +1794,7 @@ class Driver(QtWidgets.QMainWindow):
         self.bit = bit
         self.boards = boards
         self.units = self.bit.units
-        self.doc = doc.Doc(self.units)
+        self.doc = None
         self.template = router.Incra_Template(self.units, self.boards)
 
         # ... set the wood selection for each board.  If the wood does not
@@ -1553,13 +1827,11 @@ class Driver(QtWidgets.QMainWindow):
             i = self.cb_wood[3].findText('NONE')
             self.cb_wood[3].setCurrentIndex(i)
 
-        # ... set spacing cuts and tabs
+        # ... set spacing tabs.  The cuts are read with the spacing.
         if sp_type == 'Equa':
-            sp.set_cuts()
             self.equal_spacing = sp
             self.spacing_index = self.equal_spacing_id
         elif sp_type == 'Vari':
-            sp.set_cuts()
             self.var_spacing = sp
             self.spacing_index = self.var_spacing_id
         elif sp_type == 'Edit':
@@ -1588,10 +1860,8 @@ class Driver(QtWidgets.QMainWindow):
         if self.config.debug:
             print('threeDS_enabler')
 
-        if self.bit.angle > 0 or self.boards[2].active:
-            self.threeDS_action.setEnabled(False)
-        else:
-            self.threeDS_action.setEnabled(True)
+        import threeDS
+        self.threeDS_action.setEnabled(threeDS.is_supported(self.bit, self.boards))
 
     @QtCore.pyqtSlot()
     def _on_3ds(self):
@@ -1600,6 +1870,8 @@ class Driver(QtWidgets.QMainWindow):
         '''
         if self.config.debug:
             print('_on_3ds')
+        self.finish_draw()
+        import threeDS
 
         fname = 'pyrouterjig.3ds'
 
@@ -1622,14 +1894,22 @@ class Driver(QtWidgets.QMainWindow):
             self.status_message(self.transl.tr('Joint not exported'), warning=True)
             return
 
-        threeDS.joint_to_3ds(filename, self.boards, self.bit, self.spacing)
-        self.status_message(self.transl.tr('Exported to file %s') % filename)
+        # the 3DS is computed and written in the background, from a snapshot.
+        # The boards are deep-copied, since the Editor changes their cuts in
+        # place.
+        (boards, bit, sp) = qt_compute.snapshot(threeDS.copy_boards(self.boards), self.bit,
+                                                self.spacing)
+        self.submit_file(qt_io.IO_Job(
+            filename, lambda path: threeDS.joint_to_3ds(path, boards, bit, sp),
+            self.transl.tr('Exported to file %s') % filename,
+            self.transl.tr('Unable to export to file %s') % filename))
 
     @QtCore.pyqtSlot()
     def _on_print(self):
         '''Handles print events'''
         if self.config.debug:
             print('_on_print')
+        self.finish_draw()
 
         r = self.fig.print(self.template, self.boards, self.bit, self.spacing,
                            self.woods, self.description)
@@ -1643,6 +1923,7 @@ class Driver(QtWidgets.QMainWindow):
         '''Handles printing the router pass location table'''
         if self.config.debug:
             print('_on_print_table')
+        self.finish_draw()
 
         prefix = 'table_'
         suffix = '.txt'
@@ -1652,9 +1933,12 @@ class Driver(QtWidgets.QMainWindow):
         fname = prefix + str(self.table_index) + suffix
         filename = os.path.join(self.working_dir, fname)
         title = router.create_title(self.boards, self.bit, self.spacing)
-        utils.print_table(filename, self.boards, title)
+        text = utils.format_table(self.boards, title, self.fig.geom.pass_order)
+        self.submit_file(qt_io.IO_Job(
+            filename, qt_io.write_bytes(text.encode('utf-8')),
+            self.transl.tr('Saved router pass location table to %s') % filename,
+            self.transl.tr('Unable to save router pass location table to %s') % filename))
         self.table_index += 1
-        self.status_message(self.transl.tr('Saved router pass location table to %s') % filename)
 
     @QtCore.pyqtSlot()
     def _on_about(self):
@@ -1665,7 +1949,7 @@ class Driver(QtWidgets.QMainWindow):
         box = QtWidgets.QMessageBox(self)
         s = self.transl.tr('<font size=5 color=red>Welcome to <i>pyRouterJig</i> !</font>')
         s += self.transl.tr('<h3>Version: %s</h3>') % utils.VERSION
-        box.setText(s + self.doc.short_desc() + self.doc.license())
+        box.setText(s + self.get_doc().short_desc() + self.get_doc().license())
         box.setTextFormat(QtCore.Qt.RichText)
         box.show()
 
@@ -1675,14 +1959,18 @@ class Driver(QtWidgets.QMainWindow):
         if self.config.debug:
             print('_on_preferences')
 
-        self.config_window.initialize()
-        r = self.config_window.exec_()
+        config_window = self.get_config_window()
+        config_window.initialize()
+        r = config_window.exec_()
         if r == 0:
             self.status_message(self.transl.tr('No changes made to configuration file.'),
                                 warning=True)
         else:
             self.status_message(self.transl.tr('Preference changes saved in configuration file.'))
-            self.bit.bit_gentle = self.config_window.bit.bit_gentle
+            self.bit.bit_gentle = config_window.bit.bit_gentle
+            # The slider frames were computed with the old bit_gentle and
+            # min_finger_width, which are not part of their keys
+            self.frames.clear()
 
         # Update widgets that may have changed
         actions = [self.finger_size_action,
@@ -1719,6 +2007,9 @@ class Driver(QtWidgets.QMainWindow):
         '''Handles code exit events'''
         if self.config.debug:
             print('_on_exit')
+        # finish writing the files in flight, which sets file_saved to False
+        # if the last save failed
+        self.io_pool.wait()
         if self.file_saved:
             # QtGui.qApp.quit()
             QtWidgets.qApp.quit()
@@ -1850,9 +2141,40 @@ class Driver(QtWidgets.QMainWindow):
         '''Handles undo event'''
         if self.config.debug:
             print('_on_edit_undo')
-        self.spacing.undo()
-        self.status_message('Undo')
-        self.draw()
+        if self.spacing.undo():
+            self.status_message('Undo')
+            self.schedule_draw()
+        else:
+            self.status_message(self.transl.tr('Nothing to undo'), warning=True)
+
+    @QtCore.pyqtSlot()
+    def _on_edit_redo(self):
+        '''Handles redo event'''
+        if self.config.debug:
+            print('_on_edit_redo')
+        if self.spacing.redo():
+            self.status_message('Redo')
+            self.schedule_draw()
+        else:
+            self.status_message(self.transl.tr('Nothing to redo'), warning=True)
+
+    @QtCore.pyqtSlot(int)
+    def _on_fig_cut_selected(self, index):
+        '''Handles the selection of a cut with the mouse'''
+        if self.config.debug:
+            print('_on_fig_cut_selected')
+        # A geometry still computing in the background would copy the cuts
+        # from before the drag back to the spacing, so finish it first
+        self.finish_draw()
+        self.status_message(self.transl.tr('Selected cut index %d') % index)
+
+    @QtCore.pyqtSlot(str, bool)
+    def _on_fig_cuts_edited(self, msg, warning):
+        '''Handles the end of a drag of a cut with the mouse'''
+        if self.config.debug:
+            print('_on_fig_cuts_edited')
+        self.status_message(msg, warning)
+        self.schedule_draw()
 
     @QtCore.pyqtSlot()
     def _on_edit_moveL(self):
@@ -1861,7 +2183,7 @@ class Driver(QtWidgets.QMainWindow):
             print('_on_edit_moveL')
         (msg, warning) = self.spacing.cut_move_left()
         self.status_message(msg, warning)
-        self.draw()
+        self.schedule_draw()
 
     @QtCore.pyqtSlot()
     def _on_edit_moveR(self):
@@ -1870,7 +2192,7 @@ class Driver(QtWidgets.QMainWindow):
             print('_on_edit_moveR')
         (msg, warning) = self.spacing.cut_move_right()
         self.status_message(msg, warning)
-        self.draw()
+        self.schedule_draw()
 
     @QtCore.pyqtSlot()
     def _on_edit_widenL(self):
@@ -1879,7 +2201,7 @@ class Driver(QtWidgets.QMainWindow):
             print('_on_edit_widenL')
         (msg, warning) = self.spacing.cut_widen_left()
         self.status_message(msg, warning)
-        self.draw()
+        self.schedule_draw()
 
     @QtCore.pyqtSlot()
     def _on_edit_widenR(self):
@@ -1888,7 +2210,7 @@ class Driver(QtWidgets.QMainWindow):
             print('_on_edit_widenR')
         (msg, warning) = self.spacing.cut_widen_right()
         self.status_message(msg, warning)
-        self.draw()
+        self.schedule_draw()
 
     @QtCore.pyqtSlot()
     def _on_edit_trimL(self):
@@ -1897,7 +2219,7 @@ class Driver(QtWidgets.QMainWindow):
             print('_on_edit_trimL')
         (msg, warning) = self.spacing.cut_trim_left()
         self.status_message(msg, warning)
-        self.draw()
+        self.schedule_draw()
 
     @QtCore.pyqtSlot()
     def _on_edit_trimR(self):
@@ -1906,7 +2228,7 @@ class Driver(QtWidgets.QMainWindow):
             print('_on_edit_trimR')
         (msg, warning) = self.spacing.cut_trim_right()
         self.status_message(msg, warning)
-        self.draw()
+        self.schedule_draw()
 
     @QtCore.pyqtSlot()
     def _on_edit_toggle(self):
@@ -1915,7 +2237,7 @@ class Driver(QtWidgets.QMainWindow):
             print('_on_edit_toggle')
         msg = self.spacing.cut_toggle()
         self.status_message(msg)
-        self.draw()
+        self.draw_active_cuts()
 
     @QtCore.pyqtSlot()
     def _on_edit_cursorL(self):
@@ -1924,7 +2246,7 @@ class Driver(QtWidgets.QMainWindow):
             print('_on_edit_cursorL')
         msg = self.spacing.cut_increment_cursor(-1)
         self.status_message(msg)
-        self.draw()
+        self.draw_active_cuts()
 
     @QtCore.pyqtSlot()
     def _on_edit_cursorR(self):
@@ -1933,7 +2255,7 @@ class Driver(QtWidgets.QMainWindow):
             print('_on_edit_cursorR')
         msg = self.spacing.cut_increment_cursor(1)
         self.status_message(msg)
-        self.draw()
+        self.draw_active_cuts()
 
     @QtCore.pyqtSlot()
     def _on_edit_activate_all(self):
@@ -1942,7 +2264,7 @@ class Driver(QtWidgets.QMainWindow):
             print('_on_edit_activate_all')
         msg = self.spacing.cut_all_active()
         self.status_message(msg)
-        self.draw()
+        self.draw_active_cuts()
 
     @QtCore.pyqtSlot()
     def _on_edit_deactivate_all(self):
@@ -1951,7 +2273,7 @@ class Driver(QtWidgets.QMainWindow):
             print('_on_edit_deactivate_all')
         msg = self.spacing.cut_all_not_active()
         self.status_message(msg)
-        self.draw()
+        self.draw_active_cuts()
 
     @QtCore.pyqtSlot()
     def _on_edit_add(self):
@@ -1960,7 +2282,7 @@ class Driver(QtWidgets.QMainWindow):
             print('_on_edit_add')
         (msg, warning) = self.spacing.cut_add()
         self.status_message(msg, warning)
-        self.draw()
+        self.schedule_draw()
 
     @QtCore.pyqtSlot()
     def _on_edit_del(self):
@@ -1969,7 +2291,7 @@ class Driver(QtWidgets.QMainWindow):
             print('_on_edit_del')
         (msg, warning) = self.spacing.cut_delete_active()
         self.status_message(msg, warning)
-        self.draw()
+        self.schedule_draw()
 
     @QtCore.pyqtSlot()
     def _on_flash_status_off(self):
@@ -1994,8 +2316,7 @@ class Driver(QtWidgets.QMainWindow):
     def _on_caul(self):
         '''Handles toggling showing caul template'''
         self.config.show_caul = self.caul_action.isChecked()
-        if self.config_window is not None:
-            self.config_window.update_state('show_caul')
+        self.update_config_state('show_caul')
         if self.config.show_caul:
             self.status_message(self.transl.tr('Turned on caul template.'))
         else:
@@ -2009,8 +2330,7 @@ class Driver(QtWidgets.QMainWindow):
         if self.config.debug:
             print('_on_finger_sizes')
         self.config.show_finger_widths = self.finger_size_action.isChecked()
-        if self.config_window is not None:
-            self.config_window.update_state('show_finger_widths')
+        self.update_config_state('show_finger_widths')
         if self.config.show_finger_widths:
             self.status_message(self.transl.tr('Turned on finger widths.'))
         else:
@@ -2021,8 +2341,7 @@ class Driver(QtWidgets.QMainWindow):
     def _on_fit(self):
         '''Handles toggling showing fit of joint'''
         self.config.show_fit = self.fit_action.isChecked()
-        if self.config_window is not None:
-            self.config_window.update_state('show_fit')
+        self.update_config_state('show_fit')
         if self.config.show_fit:
             self.status_message(self.transl.tr('Turned on fit view.'))
         else:
@@ -2045,8 +2364,7 @@ class Driver(QtWidgets.QMainWindow):
         if self.config.debug:
             print('_on_pass_id')
         self.config.show_router_pass_identifiers = self.pass_id_action.isChecked()
-        if self.config_window is not None:
-            self.config_window.update_state('show_router_pass_identifiers')
+        self.update_config_state('show_router_pass_identifiers')
         if self.config.show_router_pass_identifiers:
             self.status_message(self.transl.tr('Turned on router pass identifiers.'))
         else:
@@ -2059,14 +2377,25 @@ class Driver(QtWidgets.QMainWindow):
         if self.config.debug:
             print('_on_pass_locations')
         self.config.show_router_pass_locations = self.pass_location_action.isChecked()
-        if self.config_window is not None:
-            self.config_window.update_state('show_router_pass_locations')
+        self.update_config_state('show_router_pass_locations')
         if self.config.show_router_pass_locations:
             self.status_message(self.transl.tr('Turned on router pass locations.'))
         else:
             self.status_message(self.transl.tr('Turned off router pass locations.'))
         self.draw()
 
+    @QtCore.pyqtSlot()
+    def _on_pass_order(self):
+        '''Handles toggling ordering router passes to minimize carriage travel'''
+        if self.config.debug:
+            print('_on_pass_order')
+        self.config.optimize_pass_order = self.pass_order_action.isChecked()
+        self.draw()
+        if self.config.optimize_pass_order:
+            self.status_message(self.fig.geom.pass_order.describe(self.units))
+        else:
+            self.status_message(self.transl.tr('Router passes ordered right to left.'))
+
     def closeEvent(self, event):
         '''
         For closeEvents (user closes window or presses Ctrl-Q), ignore and call
@@ -2088,29 +2417,31 @@ class Driver(QtWidgets.QMainWindow):
 
         msg = None
         warning = False
+        # a held key changes the cuts in one undo step
+        self.spacing.repeat = event.isAutoRepeat()
         if event.key() == QtCore.Qt.Key_Control:
             self.control_key = True
         elif event.key() == QtCore.Qt.Key_Alt:
             self.alt_key = True
         elif event.key() == QtCore.Qt.Key_U:
-            self.spacing.undo()
-            msg = 'Undo'
-            self.draw()
+            self._on_edit_undo()
+        elif event.key() == QtCore.Qt.Key_R:
+            self._on_edit_redo()
         elif event.key() == QtCore.Qt.Key_A:
             msg = self.spacing.cut_all_active()
-            self.draw()
+            self.draw_active_cuts()
         elif event.key() == QtCore.Qt.Key_N:
             msg = self.spacing.cut_all_not_active()
-            self.draw()
+            self.draw_active_cuts()
         elif event.key() == QtCore.Qt.Key_Return:
             msg = self.spacing.cut_toggle()
-            self.draw()
+            self.draw_active_cuts()
         elif event.key() == QtCore.Qt.Key_Minus:
             (msg, warning) = self.spacing.cut_delete_active()
-            self.draw()
+            self.schedule_draw()
         elif event.key() == QtCore.Qt.Key_Plus:
             (msg, warning) = self.spacing.cut_add()
-            self.draw()
+            self.schedule_draw()
         elif event.key() == QtCore.Qt.Key_Left:
             if self.control_key and self.alt_key:
                 (msg, warning) = self.spacing.cut_widen_left()
@@ -2120,7 +2451,10 @@ class Driver(QtWidgets.QMainWindow):
                 (msg, warning) = self.spacing.cut_move_left()
             else:
                 msg = self.spacing.cut_increment_cursor(-1)
-            self.draw()
+            if self.control_key or self.alt_key:
+                self.schedule_draw()
+            else:
+                self.draw_active_cuts()
         elif event.key() == QtCore.Qt.Key_Right:
             if self.control_key and self.alt_key:
                 (msg, warning) = self.spacing.cut_widen_right()
@@ -2130,7 +2464,10 @@ class Driver(QtWidgets.QMainWindow):
                 (msg, warning) = self.spacing.cut_move_right()
             else:
                 msg = self.spacing.cut_increment_cursor(1)
-            self.draw()
+            if self.control_key or self.alt_key:
+                self.schedule_draw()
+            else:
+                self.draw_active_cuts()
         else:
             msg = self.transl.tr('You pressed an unrecognized key: ')
             warning = True
@@ -2140,6 +2477,7 @@ class Driver(QtWidgets.QMainWindow):
             else:
                 msg += '%x' % event.key()
             event.ignore()
+        self.spacing.repeat = False
         if msg is not None:
             self.status_message(msg, warning)
 
@@ -2164,11 +2502,16 @@ class Driver(QtWidgets.QMainWindow):
 
 def run():
     '''
-    Sets up and runs the application
+    Sets up and runs the application.  With the --startup-times option,
+    prints the time of each phase of the startup, up to when the window is
+    first painted.
     '''
-    getcontext().prec = 4 + 4  # working in f8.4
-    getcontext().Emin = -99999999  # working in f8.4
-    getcontext().Emax = 99999999  # working in f8.4
+    timer = None
+    if '--startup-times' in sys.argv:
+        sys.argv.remove('--startup-times')
+        timer = Startup_Timer(_IMPORT_START)
+        timer.lap('imports')
+    setcontext(utils.decimal_context())
 
 #    QtGui.QApplication.setStyle('plastique')
 #    QtGui.QApplication.setStyle('windows')
@@ -2178,11 +2521,14 @@ def run():
 #    QtGui.QApplication.setStyle('cde')
 
     app = QtWidgets.QApplication(sys.argv)
+    if timer is not None:
+        timer.lap('application')
 
-    driver = Driver(app=app)
+    driver = Driver(app=app, timer=timer)
     driver.show()
     driver.center()
     driver.raise_()
+    driver.lap('show')
     app.exec_()
 
 
@@ -25,6 +25,7 @@ Contains the Qt functionality for drawing the template and boards.
 from decimal import Decimal as D
 import time
 from PyQt5 import QtCore, QtGui, QtWidgets, QtPrintSupport
+import qt_textures
 import router
 import utils
 
@@ -85,7 +86,18 @@ class Qt_Fig(QtWidgets.QWidget):
     Interface to the qt_driver, using Qt to draw the boards and template.
     The attribute "canvas" is self, to mimic the old interface to matplotlib,
     which this class replaced.
+
+    In the Editor, the cuts of Board-A may be selected and dragged with the
+    mouse (see enable_cut_editing()).  The signal cut_selected(index) is
+    emitted when a cut is clicked, and cuts_edited(message, warning) when a
+    drag that changed the cuts ends.
     '''
+    cut_selected = QtCore.pyqtSignal(int)
+    cuts_edited = QtCore.pyqtSignal(str, bool)
+
+    # distance, in pixels, within which a press on a cut grabs its edge
+    edge_pixels = 4
+
     def __init__(self, template, boards, config):
         QtWidgets.QWidget.__init__(self)
         self.canvas = self
@@ -109,10 +121,27 @@ class Qt_Fig(QtWidgets.QWidget):
                           'watermark': 4}
         self.transform = None
         self.base_transform = None
+        # The static layers (boards, templates, labels, and title) as painted
+        # on the screen at pixmap_transform, and as recorded at
+        # picture_transform once the zoom or pan changes.  Cleared by
+        # clear_picture() when the figure changes.
+        self.picture = None
+        self.picture_transform = None
+        self.pixmap = None
+        self.pixmap_transform = None
+        # The wood textures.  If wait_for_textures is False, boards whose
+        # texture is not yet decoded are filled with a pattern.
+        self.textures = qt_textures.cache()
+        self.textures.texture_ready.connect(self._on_texture_ready)
+        self.wait_for_textures = True
         self.mouse_pos = None
         self.scaling = 1.0
         self.translate = [0.0, 0.0]
         self.zoom_mode = False
+        # The Edit_Spaced whose cuts are edited with the mouse, and the drag
+        # in progress
+        self.edit_spacing = None
+        self.drag = None
 
         # Initialize keyboard modifiers
         self.shift_key = False
@@ -130,12 +159,46 @@ class Qt_Fig(QtWidgets.QWidget):
         '''
         return QtCore.QSize(self.window_width, self.window_height)
 
+    def clear_picture(self):
+        '''
+        Clears the recorded static layers, so that they are painted again on
+        the next paint event.
+        '''
+        self.picture = None
+        self.picture_transform = None
+        self.pixmap = None
+        self.pixmap_transform = None
+
+    @QtCore.pyqtSlot()
+    def _on_texture_ready(self):
+        '''
+        Repaints with a wood texture decoded in the background.
+        '''
+        self.pixmap = None
+        self.update()
+
+    def resizeEvent(self, event):
+        '''
+        Handles resizing, which changes the font sizes of the static layers.
+        '''
+        self.clear_picture()
+        QtWidgets.QWidget.resizeEvent(self, event)
+
     def enable_zoom_mode(self, mode):
         '''
         Sets the zoom mode
         '''
         self.zoom_mode = mode
 
+    def enable_cut_editing(self, spacing):
+        '''
+        Enables selecting and dragging the cuts of Board-A with the mouse, to
+        edit the cuts of spacing, an Edit_Spaced.  Disables it if spacing is
+        None.
+        '''
+        self.edit_spacing = spacing
+        self.drag = None
+
     def set_fig_dimensions(self, template, boards):
         '''
         Computes the figure dimension attributes, fig_width and fig_height, in
@@ -217,10 +280,19 @@ class Qt_Fig(QtWidgets.QWidget):
         '''
         # Generate the new geometry layout
         self.set_fig_dimensions(template, boards)
+        geom = router.Joint_Geometry(template, boards, bit, spacing, self.margins,
+                                     self.config).compute()
+        self.set_geometry(geom, woods, description)
+
+    def set_geometry(self, geom, woods, description):
+        '''
+        Draws the figure of geom, a computed router.Joint_Geometry whose
+        template and boards were given to set_fig_dimensions().
+        '''
         self.woods = woods
         self.description = description
-        self.geom = router.Joint_Geometry(template, boards, bit, spacing, self.margins,
-                                          self.config)
+        self.geom = geom
+        self.clear_picture()
         self.update()
 
     def print(self, template, boards, bit, spacing, woods, description):
@@ -234,7 +306,8 @@ class Qt_Fig(QtWidgets.QWidget):
         # Generate the new geometry layout
         self.set_fig_dimensions(template, boards)
         self.geom = router.Joint_Geometry(template, boards, bit, spacing, self.margins,
-                                          self.config)
+                                          self.config).compute()
+        self.clear_picture()
 
         # Print through the preview dialog
         printer = QtPrintSupport.QPrinter(QtPrintSupport.QPrinter.HighResolution)
@@ -253,7 +326,8 @@ class Qt_Fig(QtWidgets.QWidget):
         self.description = description
         self.set_fig_dimensions(template, boards)
         self.geom = router.Joint_Geometry(template, boards, bit, spacing, self.margins,
-                                          self.config)
+                                          self.config).compute()
+        self.clear_picture()
         self.set_colors(True)
 
         s = self.size()
@@ -271,11 +345,13 @@ class Qt_Fig(QtWidgets.QWidget):
         painter = QtGui.QPainter()
         painter.begin(im)
         size = im.size()
-        if self.colors['canvas_background'] is not None:
-            b = QtGui.QBrush(self.colors['canvas_background'])
-            painter.fillRect(0, 0, size.width(), size.height(), b)
-        self.paint_all(painter)
-        painter.end()
+        try:
+            if self.colors['canvas_background'] is not None:
+                b = QtGui.QBrush(self.colors['canvas_background'])
+                painter.fillRect(0, 0, size.width(), size.height(), b)
+            self.paint_all(painter)
+        finally:
+            painter.end()
         return im
 
     def preview_requested(self, printer):
@@ -299,14 +375,50 @@ class Qt_Fig(QtWidgets.QWidget):
         self.set_colors(True)
         painter = QtGui.QPainter(self)
         size = self.size()
-        # on the screen, we add a background color:
-        if self.colors['canvas_background'] is not None:
-            b = QtGui.QBrush(self.colors['canvas_background'])
-            painter.fillRect(0, 0, size.width(), size.height(), b)
-        # paint all of the objects
-        self.window_width, self.window_height = self.paint_all(painter)
+        self.window_width, self.window_height = self.set_transform(painter)
+        # The static layers are painted into a pixmap, which is kept for
+        # repaints at the same transform, such as for changes in the active
+        # cuts.  Once the zoom or pan changes, the layers are also recorded,
+        # in device coordinates, and then replayed under each later change in
+        # transform; the fonts scale with the zoom, so they look the same.  The
+        # board fills are painted with each replay, rather than recorded, since
+        # a picture stores a copy of each wood texture.
+        if self.pixmap is None or self.pixmap_transform != self.transform:
+            if self.picture is None and self.pixmap is not None:
+                self.picture = QtGui.QPicture()
+                recorder = QtGui.QPainter(self.picture)
+                recorder.setTransform(self.transform)
+                self.paint_layers(recorder, False)
+                recorder.end()
+                self.picture_transform = self.transform
+            ratio = self.devicePixelRatioF()
+            self.pixmap = QtGui.QPixmap(size * ratio)
+            self.pixmap.setDevicePixelRatio(ratio)
+            # on the screen, we add a background color
+            self.pixmap.fill(self.colors['canvas_background'])
+            player = QtGui.QPainter(self.pixmap)
+            player.setTransform(self.transform)
+            self.wait_for_textures = False
+            try:
+                self.fill_boards(player)
+            finally:
+                self.wait_for_textures = True
+            if self.picture is None:
+                self.paint_layers(player, False)
+            else:
+                (inverted, dummy_invertable) = self.picture_transform.inverted()
+                player.setTransform(inverted * self.transform)
+                player.drawPicture(0, 0, self.picture)
+            player.end()
+            self.pixmap_transform = self.transform
+        painter.save()
+        painter.resetTransform()
+        painter.drawPixmap(0, 0, self.pixmap)
+        painter.restore()
         # on the screen, highlight the active cuts
         self.draw_active_cuts(painter)
+        if self.drag is not None:
+            self.draw_drag(painter)
         painter.end()
 
     def set_font_size(self, painter, param):
@@ -327,6 +439,19 @@ class Qt_Fig(QtWidgets.QWidget):
         dpi: The resolution of the painter, in dots-per-inch.  If None, then
              the image is maximized in the window, but maintaining aspect ratio.
         '''
+        dimensions = self.set_transform(painter, dpi)
+        self.paint_layers(painter)
+        return dimensions
+
+    def set_transform(self, painter, dpi=None):
+        '''
+        Sets the painter transform from the figure coordinates, and the
+        transform and base_transform attributes.  Returns the painter window
+        (width, height).
+
+        painter: A QPainter object
+        dpi: As in paint_all()
+        '''
         rw = painter.window()
         window_width = rw.width()
         window_height = rw.height()
@@ -362,7 +487,16 @@ class Qt_Fig(QtWidgets.QWidget):
         painter.translate(x, y)
         self.transform = painter.transform()
 
-        # draw the objects
+        return (window_width, window_height)
+
+    def paint_layers(self, painter, fill_boards=True):
+        '''
+        Paints the boards, templates, labels, and title, using the transform
+        from set_transform().  If fill_boards is False, the boards are labeled
+        but not drawn.
+        '''
+        if fill_boards:
+            self.fill_boards(painter)
         self.draw_boards(painter)
         self.draw_template(painter)
         self.draw_title(painter)
@@ -370,8 +504,6 @@ class Qt_Fig(QtWidgets.QWidget):
         if self.config.show_finger_widths:
             self.draw_finger_sizes(painter)
 
-        return (window_width, window_height)
-
     def draw_passes(self, painter, blabel, cuts, y1, y2, flags, xMid,
                     is_template=True):
         '''
@@ -395,11 +527,16 @@ class Qt_Fig(QtWidgets.QWidget):
         char_size = self.font_size[font_type]
         self.set_font_size(painter, font_type)
         # Collect the router pass locations in a single array by looping
-        # through each cut and each pass for each cut, right-to-left.
+        # through each cut and each pass for each cut, right-to-left.  The
+        # pass numbers follow the pass order of the geometry.
         xp = []
-        for c in cuts[::-1]:
+        ids = []
+        for ic in range(len(cuts) - 1, -1, -1):
+            c = cuts[ic]
             for p in range(len(c.passes) - 1, -1, -1):
                 xp.append(c.passes[p])
+                ids.append((ic, p))
+        numbers = self.geom.pass_order.pass_numbers(blabel, cuts)
         # Loop through the passes and do the labels
         np = len(xp)
         for i in range(np):
@@ -434,7 +571,10 @@ class Qt_Fig(QtWidgets.QWidget):
             label = ''
             this_is_midpoint = False
             if is_template or self.config.show_router_pass_identifiers:
-                label = '%d%s' % (i + 1, blabel)
+                if numbers is None:
+                    label = '%d%s' % (i + 1, blabel)
+                else:
+                    label = '%d%s' % (numbers[ids[i]], blabel)
                 if xpShift == xMid:
                     passMid = label
                     this_is_midpoint = True
@@ -496,7 +636,7 @@ class Qt_Fig(QtWidgets.QWidget):
                 y1 = b.yB()
                 y2 = b.yT()
                 painter.setPen(pen)
-                painter.drawLine(x, y1, x, y2)
+                painter.drawLine(QtCore.QLineF(x, y1, x, y2))
                 paint_text(painter, label, (x, (y1 + y2) // 2), flags, (0, 0), -90)
                 painter.setPen(bg_pen)
                 painter.drawLine(QtCore.QPointF(x-0.5, y1+0.5), QtCore.QPointF(x-0.5, y2-0.5))
@@ -507,15 +647,15 @@ class Qt_Fig(QtWidgets.QWidget):
         Draws the geometry of a template
         '''
         # Fill the entire template as white
-        painter.fillRect(r.xL(), r.yB(), r.width, r.height, QtCore.Qt.white)
+        painter.fillRect(QtCore.QRectF(r.xL(), r.yB(), r.width, r.height), QtCore.Qt.white)
 
         # Fill the template margins with a grayshade
         brush = QtGui.QBrush(QtGui.QColor(self.colors['template_margin_background']))
-        painter.fillRect(r.xL(), r.yB(), b.xL() - r.xL(), r.height, brush)
-        painter.fillRect(b.xR(), r.yB(), r.xR() - b.xR(), r.height, brush)
+        painter.fillRect(QtCore.QRectF(r.xL(), r.yB(), b.xL() - r.xL(), r.height), brush)
+        painter.fillRect(QtCore.QRectF(b.xR(), r.yB(), r.xR() - b.xR(), r.height), brush)
 
         # Draw the template bounding box
-        painter.drawRect(r.xL(), r.yB(), r.width, r.height)
+        painter.drawRect(QtCore.QRectF(r.xL(), r.yB(), r.width, r.height))
 
         # Label the template with a watermark
         if self.description is not None:
@@ -706,7 +846,7 @@ class Qt_Fig(QtWidgets.QWidget):
                 pen.setColor(self.colors['center_color'])
                 pen.setWidthF(0)
                 painter.setPen(pen)
-                painter.drawLine(xMid, rect_caul.yB(), xMid, rect_caul.yT())
+                painter.drawLine(QtCore.QLineF(xMid, rect_caul.yB(), xMid, rect_caul.yT()))
             painter.setPen(self.colors['template_margin_foreground'])
             paint_text(painter, label + datetime, (rect_caul.xL(), rect_caul.yMid()),
                        flagsLC, (5, 0))
@@ -723,7 +863,7 @@ class Qt_Fig(QtWidgets.QWidget):
 
         else:
             painter.setPen(pen)
-            painter.drawLine(xMid, rect_T.yB(), xMid, rect_T.yT())
+            painter.drawLine(QtCore.QLineF(xMid, rect_T.yB(), xMid, rect_T.yT()))
 
         painter.setPen(self.colors['template_margin_foreground'])
 
@@ -738,7 +878,7 @@ class Qt_Fig(QtWidgets.QWidget):
                 label_top += self.transl.tr('\nCenter: ') + centerline_TDD[0]
             else:
                 painter.setPen(pen)
-                painter.drawLine(xMid, rect_TDD.yB(), xMid, rect_TDD.yT())
+                painter.drawLine(QtCore.QLineF(xMid, rect_TDD.yB(), xMid, rect_TDD.yT()))
             painter.setPen(self.colors['template_margin_foreground'])
             paint_text(painter, label_top + label_left, (rect_TDD.xL(), rect_TDD.yMid()),
                        flagsLC, (5, 0))
@@ -765,10 +905,15 @@ class Qt_Fig(QtWidgets.QWidget):
         pen.setWidthF(0)
         painter.setPen(pen)
         icon = self.woods[board.wood]
+        pixmap = None
+        if isinstance(icon, str):
+            # then it's an image file, filled with a pattern until it is decoded
+            pixmap = self.textures.pixmap(icon, self.wait_for_textures)
+            if pixmap is None:
+                icon = QtCore.Qt.DiagCrossPattern
         if icon is not None:
-            if isinstance(icon, str):
-                # then it's an image file
-                brush = QtGui.QBrush(QtGui.QPixmap(icon))
+            if pixmap is not None:
+                brush = QtGui.QBrush(pixmap)
             else:
                 # oterhwise, if must be a pattern fill
                 if icon == QtCore.Qt.SolidPattern:
@@ -789,17 +934,18 @@ class Qt_Fig(QtWidgets.QWidget):
         painter.drawPolygon(poly)
         painter.restore()
 
-    def draw_boards(self, painter):
+    def fill_boards(self, painter):
         '''
-        Draws all the boards
+        Draws all the boards, filled with their woods
         '''
-
-        # Draw all of the boards
         for i in range(4):
             self.draw_one_board(painter, self.geom.boards[i], self.geom.bit,
                                 self.colors['board_background'])
 
-        # Label the boards
+    def draw_boards(self, painter):
+        '''
+        Labels the boards
+        '''
         if self.config.show_router_pass_identifiers or self.config.show_router_pass_locations:
             self.set_font_size(painter, 'boards')
             pen = QtGui.QPen(QtCore.Qt.SolidLine)
@@ -814,7 +960,7 @@ class Qt_Fig(QtWidgets.QWidget):
             y = self.geom.boards[0].yB()
             p = (x1, y)
             paint_text(painter, 'A', p, flags, (-3, 0))
-            painter.drawLine(x1, y, x2, y)
+            painter.drawLine(QtCore.QLineF(x1, y, x2, y))
 
             i = 0  # index in self.labels
 
@@ -822,43 +968,48 @@ class Qt_Fig(QtWidgets.QWidget):
                 y = self.geom.boards[3].yT()
                 p = (x1, y)
                 paint_text(painter, 'B', p, flags, (-3, 0))
-                painter.drawLine(x1, y, x2, y)
+                painter.drawLine(QtCore.QLineF(x1, y, x2, y))
                 y = self.geom.boards[3].yB()
                 p = (x1, y)
                 paint_text(painter, 'C', p, flags, (-3, 0))
-                painter.drawLine(x1, y, x2, y)
+                painter.drawLine(QtCore.QLineF(x1, y, x2, y))
                 i = 2
             if self.geom.boards[2].active:
                 y = self.geom.boards[2].yT()
                 p = (x1, y)
                 paint_text(painter, self.labels[i], p, flags, (-3, 0))
-                painter.drawLine(x1, y, x2, y)
+                painter.drawLine(QtCore.QLineF(x1, y, x2, y))
                 y = self.geom.boards[2].yB()
                 p = (x1, y)
                 paint_text(painter, self.labels[i + 1], p, flags, (-3, 0))
-                painter.drawLine(x1, y, x2, y)
+                painter.drawLine(QtCore.QLineF(x1, y, x2, y))
                 i += 2
 
             y = self.geom.boards[1].yT()
             p = (x1, y)
             paint_text(painter, self.labels[i], p, flags, (-3, 0))
-            painter.drawLine(x1, y, x2, y)
+            painter.drawLine(QtCore.QLineF(x1, y, x2, y))
 
-    def cut_polygon(self, c):
+    def cut_polygon(self, c, board=None):
         '''
-        Forms the polygon for the cut corresponding to the cut c
+        Forms the polygon for the cut corresponding to the cut c, on the
+        bottom of Board-A, or on the top of board if given
         '''
-        boards = self.geom.boards
-        xLT = boards[0].xL() + c.xmin
-        xRT = boards[0].xL() + c.xmax
+        if board is None:
+            board = self.geom.boards[0]
+            yB = board.yB()
+            yT = yB + self.geom.bit.depth
+        else:
+            yB = board.yT()
+            yT = yB - self.geom.bit.depth
+        xLT = board.xL() + c.xmin
+        xRT = board.xL() + c.xmax
         xLB = xLT
         xRB = xRT
         if c.xmin > 0:
             xLB += self.geom.bit.overhang
-        if c.xmax < self.geom.boards[0].width:
+        if c.xmax < board.width:
             xRB -= self.geom.bit.overhang
-        yB = boards[0].yB()
-        yT = yB + self.geom.bit.depth
         poly = QtGui.QPolygonF()
         poly.append(QtCore.QPointF(xLT, yT))
         poly.append(QtCore.QPointF(xRT, yT))
@@ -873,15 +1024,18 @@ class Qt_Fig(QtWidgets.QWidget):
         draw their limits
         '''
 
+        # The cuts of the spacing may be ahead of the geometry, while the
+        # geometry of an edit is computed in the background
+        cuts = self.geom.boards[0].bottom_cuts
         f = self.geom.spacing.cursor_cut
-        if f is None:
+        if f is None or f >= len(cuts):
             return
 
         pen = QtGui.QPen()
         pen.setWidthF(0)
 
         # get the perimeter of the cursor
-        cursor_poly = self.cut_polygon(self.geom.boards[0].bottom_cuts[f])
+        cursor_poly = self.cut_polygon(cuts[f])
 
         # initialize limits
         xminG = self.geom.boards[0].width
@@ -889,6 +1043,7 @@ class Qt_Fig(QtWidgets.QWidget):
 
         # draw the active cuts filled, and track the limits
         painter.save()
+        self.set_font_size(painter, 'title')
         brush = QtGui.QBrush(QtGui.QColor(255, 0, 0, 75))
         painter.setBrush(brush)
         pen.setColor(QtCore.Qt.red)
@@ -896,7 +1051,9 @@ class Qt_Fig(QtWidgets.QWidget):
         fcolor = QtGui.QColor(self.colors['board_background'])
         fcolor.setAlphaF(1.0)
         for f in self.geom.spacing.active_cuts:
-            poly = self.cut_polygon(self.geom.boards[0].bottom_cuts[f])
+            if f >= len(cuts):
+                continue
+            poly = self.cut_polygon(cuts[f])
             painter.drawPolygon(poly)
             # keep track of the limits
             (xmin, xmax) = self.geom.spacing.get_limits(f)
@@ -932,6 +1089,38 @@ class Qt_Fig(QtWidgets.QWidget):
         painter.drawPolyline(cursor_poly)
         painter.restore()
 
+    def draw_drag(self, painter):
+        '''
+        Draws the cut being dragged, and the cuts adjoining it, where the
+        drag has moved them.  The rest of the joint is drawn again when the
+        drag ends.
+        '''
+        sp = self.edit_spacing
+        f = self.drag['index']
+        if f >= len(sp.cuts):
+            return
+        # the board whose top cuts adjoin Board-A, as in router.cut_boards()
+        boards = self.geom.boards
+        if boards[3].active:
+            (board, dboard) = (boards[3], boards[0])
+        elif boards[2].active:
+            (board, dboard) = (boards[2], boards[0])
+        else:
+            (board, dboard) = (boards[1], boards[1])
+        slots = router.adjoining_slots(sp.cuts, self.geom.bit, dboard, f, f + 2)
+
+        pen = QtGui.QPen()
+        pen.setWidthF(0)
+        pen.setColor(QtCore.Qt.blue)
+        painter.save()
+        painter.setPen(pen)
+        painter.setBrush(QtGui.QBrush(QtGui.QColor(0, 0, 255, 75)))
+        painter.drawPolygon(self.cut_polygon(sp.cuts[f]))
+        for slot in slots:
+            for (xmin, xmax) in slot:
+                painter.drawPolygon(self.cut_polygon(router.Cut(xmin, xmax), board))
+        painter.restore()
+
     def draw_title(self, painter):
         '''
         Draws the title
@@ -1050,12 +1239,106 @@ class Qt_Fig(QtWidgets.QWidget):
         self.scaling *= 1 + 0.05 * ppp.y()
         self.update()
 
+    def board_position(self, pos):
+        '''
+        Returns (x, on_board) for the widget position pos, where x is from
+        the left edge of Board-A, in increments, and on_board is True if pos
+        is on Board-A.
+        '''
+        (inverted, dummy_invertable) = self.transform.inverted()
+        p = inverted.map(QtCore.QPointF(pos))
+        board = self.geom.boards[0]
+        on_board = float(board.yB()) <= p.y() <= float(board.yT())
+        return (p.x() - float(board.xL()), on_board)
+
+    def start_drag(self, pos):
+        '''
+        Selects the cut of Board-A at the widget position pos, and starts
+        dragging it: its left or right edge, if pos is near one, and
+        otherwise the whole cut.  Returns False if there is no cut at pos.
+        '''
+        if self.geom is None or self.transform is None:
+            return False
+        sp = self.edit_spacing
+        (x, on_board) = self.board_position(pos)
+        f = sp.cut_at(x) if on_board else None
+        if f is None:
+            return False
+        c = sp.cuts[f]
+        tolerance = self.edge_pixels / abs(self.transform.m11())
+        if c.xmin > 0 and x - float(c.xmin) <= tolerance:
+            mode = 'left'
+        elif c.xmax < self.geom.boards[0].width and float(c.xmax) - x <= tolerance:
+            mode = 'right'
+        else:
+            mode = 'move'
+        if mode == 'move':
+            self.setCursor(QtCore.Qt.ClosedHandCursor)
+        else:
+            self.setCursor(QtCore.Qt.SizeHorCursor)
+        sp.cursor_cut = f
+        sp.active_cuts = [f]
+        # the changes of the drag make one undo step
+        sp.log.close()
+        self.drag = {'index': f, 'mode': mode, 'x': x, 'distance': 0,
+                     'xmin': c.xmin, 'xmax': c.xmax}
+        self.cut_selected.emit(f)
+        self.update()
+        return True
+
+    def continue_drag(self, pos):
+        '''
+        Drags the cut to the widget position pos, snapped to increments.
+        The spacing limits the cut, as for the other Editor changes.
+        '''
+        drag = self.drag
+        (x, dummy_on_board) = self.board_position(pos)
+        distance = utils.math_round(D(x - drag['x']))
+        if distance == drag['distance']:
+            return
+        drag['distance'] = distance
+        sp = self.edit_spacing
+        sp.repeat = True
+        if drag['mode'] == 'left':
+            sp.cut_resize_to(True, drag['xmin'] + distance)
+        elif drag['mode'] == 'right':
+            sp.cut_resize_to(False, drag['xmax'] + distance)
+        elif drag['xmin'] > 0:
+            sp.cut_move_to(drag['xmin'] + distance)
+        else:
+            sp.cut_move_to(drag['xmax'] + distance)
+        sp.repeat = False
+        self.update()
+
+    def end_drag(self):
+        '''
+        Ends the drag, and emits cuts_edited if it changed the cut.
+        '''
+        drag = self.drag
+        self.drag = None
+        self.unsetCursor()
+        sp = self.edit_spacing
+        sp.log.close()
+        f = drag['index']
+        c = sp.cuts[f]
+        if (c.xmin, c.xmax) != (drag['xmin'], drag['xmax']):
+            units = self.geom.bit.units
+            msg = self.transl.tr('Dragged cut index %d to %s - %s') % \
+                (f, units.increments_to_string(c.xmin), units.increments_to_string(c.xmax))
+            self.cuts_edited.emit(msg, False)
+        self.update()
+
     def mousePressEvent(self, event):
         '''
         Handles mouse button press:
-           left: start a move at that location
+           left: in the Editor, select and start dragging the cut at that
+                 location; otherwise, start a move at that location
            right: reset view
         '''
+        if event.button() == QtCore.Qt.LeftButton and self.edit_spacing is not None and \
+           self.start_drag(event.localPos()):
+            return
+
         if not self.zoom_mode:
             event.ignore()
             return
@@ -1075,8 +1358,12 @@ class Qt_Fig(QtWidgets.QWidget):
     def mouseReleaseEvent(self, event):
         '''
         Handles mouse button release:
-           left: end the move
+           left: end the drag of a cut, or the move
         '''
+        if event.button() == QtCore.Qt.LeftButton and self.drag is not None:
+            self.end_drag()
+            return
+
         if not self.zoom_mode:
             event.ignore()
             return
@@ -1088,9 +1375,13 @@ class Qt_Fig(QtWidgets.QWidget):
 
     def mouseMoveEvent(self, event):
         '''
-        Handles mouse move, when a button is pressed.  In this case, we keep track
-        of the translation under zoom.
+        Handles mouse move, when a button is pressed.  In this case, we drag
+        the cut, or else keep track of the translation under zoom.
         '''
+        if self.drag is not None:
+            self.continue_drag(event.localPos())
+            return
+
         if not self.zoom_mode or self.mouse_pos is None:
             event.ignore()
             return
@@ -0,0 +1,150 @@
+###########################################################################
+#
+# Copyright 2015-2018 Robert B. Lowrie (http://github.com/lowrie)
+#
+# This file is part of pyRouterJig.
+#
+# pyRouterJig is free software: you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# pyRouterJig is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR
+# A PARTICULAR PURPOSE.  See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along with
+# pyRouterJig; see the file LICENSE. If not, see <http://www.gnu.org/licenses/>.
+#
+###########################################################################
+
+'''
+This module contains the Qt dialog that finds saved joints in the
+joint_index.
+'''
+
+import os
+from PyQt5 import QtCore, QtWidgets
+
+
+class Index_Dialog(QtWidgets.QDialog):
+    '''
+    Lists the joints of a joint_index.Joint_Index that match the bit
+    width, bit angle, board width and spacing entered, and opens the one
+    selected.  Dimensions are entered in the units of the joint being
+    edited.
+    '''
+    def __init__(self, index, units, parent=None):
+        QtWidgets.QDialog.__init__(self, parent)
+        self.index = index
+        self.units = units
+        self.transl = units.transl
+        self.entries = []
+        self.setWindowTitle(self.transl.tr('Find Joint'))
+
+        grid = QtWidgets.QGridLayout()
+        self.le_bit_width = QtWidgets.QLineEdit(self)
+        self.le_bit_angle = QtWidgets.QLineEdit(self)
+        self.le_board_width = QtWidgets.QLineEdit(self)
+        labels = [self.transl.tr('Bit Width'), self.transl.tr('Bit Angle'),
+                  self.transl.tr('Board Width')]
+        edits = [self.le_bit_width, self.le_bit_angle, self.le_board_width]
+        for (i, (label, le)) in enumerate(zip(labels, edits)):
+            le.setToolTip(self.transl.tr('Leave blank to match any value'))
+            le.editingFinished.connect(self._on_filter)
+            grid.addWidget(QtWidgets.QLabel(label), 0, i)
+            grid.addWidget(le, 1, i)
+        self.cb_spacing = QtWidgets.QComboBox(self)
+        for (name, sp_type) in [(self.transl.tr('Any'), None),
+                                (self.transl.tr('Equal'), 'Equa'),
+                                (self.transl.tr('Variable'), 'Vari'),
+                                (self.transl.tr('Edit'), 'Edit')]:
+            self.cb_spacing.addItem(name, sp_type)
+        self.cb_spacing.currentIndexChanged.connect(self._on_filter)
+        grid.addWidget(QtWidgets.QLabel(self.transl.tr('Spacing')), 0, len(edits))
+        grid.addWidget(self.cb_spacing, 1, len(edits))
+
+        self.table = QtWidgets.QTableWidget(0, 5, self)
+        self.table.setHorizontalHeaderLabels(
+            [self.transl.tr('File'), self.transl.tr('Bit Width'), self.transl.tr('Bit Angle'),
+             self.transl.tr('Board Width'), self.transl.tr('Spacing')])
+        self.table.setSelectionBehavior(QtWidgets.QAbstractItemView.SelectRows)
+        self.table.setSelectionMode(QtWidgets.QAbstractItemView.SingleSelection)
+        self.table.setEditTriggers(QtWidgets.QAbstractItemView.NoEditTriggers)
+        self.table.horizontalHeader().setStretchLastSection(True)
+        self.table.itemSelectionChanged.connect(self._on_selection)
+        self.table.itemDoubleClicked.connect(self.accept)
+
+        self.buttons = QtWidgets.QDialogButtonBox(
+            QtWidgets.QDialogButtonBox.Open | QtWidgets.QDialogButtonBox.Cancel, parent=self)
+        self.buttons.accepted.connect(self.accept)
+        self.buttons.rejected.connect(self.reject)
+
+        vbox = QtWidgets.QVBoxLayout()
+        vbox.addLayout(grid)
+        vbox.addWidget(self.table)
+        vbox.addWidget(self.buttons)
+        self.setLayout(vbox)
+        self.resize(700, 400)
+        self._on_filter()
+
+    def filters(self):
+        '''
+        Returns the dictionary of the arguments to Joint_Index.query() for
+        the values entered.  Raises ValueError if a value is not a number.
+        '''
+        args = {'metric': self.units.metric}
+        for (k, le) in [('bit_width', self.le_bit_width), ('board_width', self.le_board_width)]:
+            s = str(le.text()).strip()
+            if s:
+                args[k] = self.units.increments_to_inches(self.units.string_to_increments(s,
+                                                                                         False))
+        s = str(self.le_bit_angle.text()).strip()
+        if s:
+            args['bit_angle'] = float(s)
+        args['spacing'] = self.cb_spacing.currentData()
+        return args
+
+    def selected_file(self):
+        '''
+        Returns the path of the selected joint, or None if none is selected.
+        '''
+        rows = self.table.selectionModel().selectedRows()
+        if not rows:
+            return None
+        return self.entries[rows[0].row()].path
+
+    @QtCore.pyqtSlot()
+    def _on_filter(self):
+        '''
+        Lists the joints that match the values entered
+        '''
+        try:
+            args = self.filters()
+        except (ValueError, ZeroDivisionError):
+            return
+        self.entries = self.index.query(**args)
+        self.table.setRowCount(len(self.entries))
+        spacings = dict((self.cb_spacing.itemData(i), self.cb_spacing.itemText(i))
+                        for i in range(self.cb_spacing.count()))
+        for (i, e) in enumerate(self.entries):
+            values = [os.path.basename(e.path),
+                      self.units.increments_to_string(self.units.inches_to_increments(e.bit_width)),
+                      '%g' % e.bit_angle,
+                      self.units.increments_to_string(
+                          self.units.inches_to_increments(e.board_width)),
+                      spacings.get(e.spacing, e.spacing)]
+            for (j, v) in enumerate(values):
+                item = QtWidgets.QTableWidgetItem(v)
+                if j == 0:
+                    item.setToolTip(e.path)
+                self.table.setItem(i, j, item)
+        self._on_selection()
+
+    @QtCore.pyqtSlot()
+    def _on_selection(self):
+        '''
+        Enables opening only if a joint is selected
+        '''
+        self.buttons.button(QtWidgets.QDialogButtonBox.Open).setEnabled(
+            self.selected_file() is not None)
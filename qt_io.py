@@ -0,0 +1,197 @@
+###########################################################################
+#
+# Copyright 2015-2018 Robert B. Lowrie (http://github.com/lowrie)
+#
+# This file is part of pyRouterJig.
+#
+# pyRouterJig is free software: you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# pyRouterJig is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR
+# A PARTICULAR PURPOSE.  See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along with
+# pyRouterJig; see the file LICENSE. If not, see <http://www.gnu.org/licenses/>.
+#
+###########################################################################
+
+'''
+Contains the pool that writes files in background threads, such as the
+saved images, the 3DS exports and the router pass tables, so that the
+window does not freeze while a large image is compressed.
+
+Each file is written from a snapshot of the joint, taken when it is
+submitted, so the joint may change while it is written.  The file is first
+written to a temporary file in the same directory, and then renamed, so
+that a partial file never appears.  At most MAX_PENDING files are in
+flight; a submission beyond that waits for one of them to finish.
+'''
+
+import os
+import tempfile
+import threading
+from decimal import localcontext
+
+from PyQt5 import QtCore
+
+import utils
+
+# The number of threads that write files
+MAX_THREADS = 2
+
+# The maximum number of files submitted but not yet written
+MAX_PENDING = 8
+
+# The permissions of new files, which os.umask() returns only by changing it
+UMASK = os.umask(0o022)
+os.umask(UMASK)
+
+
+def write_atomic(filename, write):
+    '''
+    Calls write(path) to write the file filename to a temporary path in the
+    same directory, and then renames it to filename.  If write raises an
+    exception, the temporary file is removed and filename is unchanged.
+    '''
+    (d, base) = os.path.split(os.path.abspath(filename))
+    (fd, path) = tempfile.mkstemp(dir=d, prefix='.' + base + '.', suffix='.tmp')
+    os.close(fd)
+    try:
+        write(path)
+        # mkstemp() makes the file private; give it the permissions of the
+        # file it replaces, or of a new file
+        try:
+            mode = os.stat(filename).st_mode & 0o777
+        except OSError:
+            mode = 0o666 & ~UMASK
+        os.chmod(path, mode)
+        os.replace(path, filename)
+    except BaseException:
+        if os.path.exists(path):
+            os.remove(path)
+        raise
+
+
+def write_bytes(data):
+    '''
+    Returns a write function for write_atomic() that writes the bytes data.
+    '''
+    def write(path):
+        with open(path, 'wb') as fd:
+            fd.write(data)
+    return write
+
+
+class IO_Job(object):
+    '''
+    A file to be written in the background.
+
+    filename: The file written
+    write: The function that writes the file to the path given, from a
+           snapshot of the joint
+    message: The status message when the file is written
+    error_message: The status message if the file cannot be written
+    kind: The kind of file, such as 'png', for the handlers of the signals
+    '''
+    def __init__(self, filename, write, message, error_message, kind=None):
+        self.filename = filename
+        self.write = write
+        self.message = message
+        self.error_message = error_message
+        self.kind = kind
+
+
+class IO_Signals(QtCore.QObject):
+    '''
+    The signals of an IO_Runner, which is not itself a QObject.
+    '''
+    done = QtCore.pyqtSignal(object, object)
+
+
+class IO_Runner(QtCore.QRunnable):
+    '''
+    Writes the file of an IO_Job in a thread of the QThreadPool, and emits
+    signals.done with the job and the exception raised, if any.
+    '''
+    def __init__(self, job, pool):
+        QtCore.QRunnable.__init__(self)
+        self.job = job
+        self.pool = pool
+
+    def run(self):
+        error = None
+        try:
+            with localcontext(utils.decimal_context()):
+                write_atomic(self.job.filename, self.job.write)
+        except Exception as e:
+            error = e
+        self.pool.release()
+        self.pool.signals.done.emit(self.job, error)
+
+
+class IO_Pool(QtCore.QObject):
+    '''
+    Writes the files of the IO_Jobs submitted, in background threads.
+
+    written is emitted with each job whose file is written, and failed with
+    the job and the exception raised for each that is not.
+    '''
+    written = QtCore.pyqtSignal(object)
+    failed = QtCore.pyqtSignal(object, object)
+
+    def __init__(self, parent=None, max_threads=MAX_THREADS, max_pending=MAX_PENDING):
+        QtCore.QObject.__init__(self, parent)
+        self.max_pending = max_pending
+        self.npending = 0
+        self.condition = threading.Condition()
+        self.pool = QtCore.QThreadPool(self)
+        self.pool.setMaxThreadCount(max_threads)
+        self.signals = IO_Signals()
+        self.signals.done.connect(self._on_done)
+
+    def submit(self, job):
+        '''
+        Starts writing the file of job.  If MAX_PENDING files are in flight,
+        waits for one of them to finish first.
+        '''
+        with self.condition:
+            while self.npending >= self.max_pending:
+                self.condition.wait()
+            self.npending += 1
+        self.pool.start(IO_Runner(job, self))
+
+    def release(self):
+        '''
+        Called by an IO_Runner when its file is done.
+        '''
+        with self.condition:
+            self.npending -= 1
+            self.condition.notify()
+
+    def pending(self):
+        '''
+        Returns the number of files submitted that are not yet written.
+        '''
+        with self.condition:
+            return self.npending
+
+    def wait(self):
+        '''
+        Waits until all of the files are written, and emits their signals,
+        so that a failure is known before, say, the application quits.
+        '''
+        self.pool.waitForDone()
+        QtCore.QCoreApplication.sendPostedEvents(self, QtCore.QEvent.MetaCall)
+
+    @QtCore.pyqtSlot(object, object)
+    def _on_done(self, job, error):
+        '''
+        Emits the signal for the job done.
+        '''
+        if error is None:
+            self.written.emit(job)
+        else:
+            self.failed.emit(job, error)
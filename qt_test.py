@@ -24,9 +24,27 @@ Tests for qt_driver
 from __future__ import print_function
 from builtins import str
 
+import copy
+import os
+import shutil
 import sys
+import tempfile
+import threading
+import time
 import unittest
+from unittest import mock
 from qt_driver import Driver
+import engine
+import joint_index
+import qt_compute
+import qt_fig
+import qt_index
+import qt_io
+import qt_textures
+import qt_utils
+import router
+import router_test
+import serialize
 import utils
 from PyQt5 import QtGui
 from PyQt5 import QtCore
@@ -302,6 +320,451 @@ class Driver_Test(unittest.TestCase):
                 if do_all_screenshots:
                     self.screenshot()
 
+
+class Texture_Cache_Test(unittest.TestCase):
+    '''
+    Tests qt_textures.Texture_Cache
+    '''
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmpdir)
+
+    def wood(self, name, width, height):
+        filename = os.path.join(self.tmpdir, name + '.png')
+        im = QtGui.QImage(width, height, QtGui.QImage.Format_RGB32)
+        im.fill(QtGui.QColor(200, 150, 100))
+        self.assertTrue(im.save(filename))
+        return filename
+
+    def test_decode_once(self):
+        c = qt_textures.Texture_Cache()
+        f = self.wood('oak', 40, 30)
+        p = c.pixmap(f)
+        self.assertEqual((p.width(), p.height()), (40, 30))
+        self.assertTrue(c.pixmap(f) is p)
+        self.assertEqual((c.hits, c.misses, c.loads), (1, 1, 1))
+        # a changed file is decoded again, and replaces the old texture
+        st = os.stat(f)
+        os.utime(f, (st.st_atime, st.st_mtime + 10))
+        self.assertFalse(c.pixmap(f) is p)
+        self.assertEqual(c.loads, 2)
+        self.assertEqual(len(c.textures), 1)
+        self.assertTrue(c.pixmap(os.path.join(self.tmpdir, 'none.png')).isNull())
+
+    def test_budget(self):
+        f0 = self.wood('oak', 40, 30)
+        f1 = self.wood('maple', 40, 30)
+        c = qt_textures.Texture_Cache(budget=40 * 30 * 4)
+        c.pixmap(f0)
+        c.pixmap(f1)
+        self.assertEqual(list(c.textures.keys())[0][0], f1)
+        self.assertEqual(len(c.textures), 1)
+        self.assertTrue(c.nbytes <= c.budget)
+
+    def test_crop(self):
+        c = qt_textures.Texture_Cache(max_size=32)
+        p = c.pixmap(self.wood('oak', 100, 20))
+        self.assertEqual((p.width(), p.height()), (32, 20))
+
+    def test_background(self):
+        c = qt_textures.Texture_Cache()
+        ready = []
+        c.texture_ready.connect(lambda: ready.append(True))
+        f = self.wood('oak', 40, 30)
+        self.assertTrue(c.pixmap(f, False) is None)
+        self.assertTrue(c.pixmap(f, False) is None)
+        self.assertEqual(c.loads, 1)
+        c.wait()
+        QtCore.QCoreApplication.processEvents()
+        self.assertEqual(ready, [True])
+        self.assertEqual(c.pixmap(f, False).width(), 40)
+
+    def test_stale_load(self):
+        c = qt_textures.Texture_Cache()
+        f = self.wood('oak', 40, 30)
+        old = (f, os.path.getmtime(f), c.max_size)
+        st = os.stat(f)
+        os.utime(f, (st.st_atime, st.st_mtime + 10))
+        p = c.pixmap(f)
+        # the decoding of the older file finishes after the newer one
+        c._on_loaded(old, qt_textures.read_texture(f, c.max_size))
+        self.assertEqual([k[1] for k in c.textures], [old[1] + 10])
+        self.assertTrue(c.pixmap(f) is p)
+
+
+class Compute_Scheduler_Test(unittest.TestCase):
+    '''
+    Tests qt_compute.Compute_Scheduler
+    '''
+    def setUp(self):
+        spec = engine.Joint_Spec(board_width='7 1/2', bit_width='1/4', spacing='Equal')
+        (self.config, self.bit, self.boards, self.sp) = engine.make_joint(spec)
+        self.template = router.Incra_Template(self.bit.units, self.boards)
+        self.margins = engine.make_margins(self.bit.units, self.config)
+        self.s = qt_compute.Compute_Scheduler()
+        self.ready = []
+        self.s.geometry_ready.connect(self.ready.append)
+
+    def submit(self, spacing):
+        self.sp.params['Spacing'].v = spacing
+        self.sp.set_cuts()
+        self.s.submit(self.template, self.boards, self.bit, self.sp, self.margins, self.config)
+
+    def finish(self):
+        while self.s.pending():
+            self.s.wait()
+            QtCore.QCoreApplication.processEvents()
+
+    def test_newest(self):
+        for spacing in [10, 11, 12, 13]:
+            self.submit(spacing)
+        self.assertTrue(self.s.pending())
+        self.finish()
+        self.assertEqual(len(self.ready), 1)
+        geom = self.ready[0]
+        self.assertTrue(geom.boards is self.boards)
+        self.assertTrue(geom.spacing is self.sp)
+        self.assertTrue(self.boards[0].bottom_cuts is self.sp.cuts)
+        expected = engine.compute(engine.Joint_Spec(board_width='7 1/2', bit_width='1/4',
+                                                    spacing='Equal', params={'Spacing': 13}))
+        for (b, e) in zip(self.boards, expected.boards):
+            for (c, ec) in [(b.bottom_cuts, e.bottom_cuts), (b.top_cuts, e.top_cuts)]:
+                if ec is not None:
+                    self.assertEqual(router.Cut_Set(c), router.Cut_Set(ec))
+        self.assertEqual(geom.max_gap, expected.max_gap)
+
+    def test_cancel(self):
+        cuts = self.sp.cuts
+        self.submit(12)
+        self.s.cancel()
+        self.assertFalse(self.s.pending())
+        self.s.wait()
+        QtCore.QCoreApplication.processEvents()
+        self.assertEqual(self.ready, [])
+        self.assertFalse(self.sp.cuts is cuts)
+        self.assertTrue(self.boards[0].bottom_cuts is None)
+
+
+class Frame_Cache_Test(unittest.TestCase):
+    '''
+    Tests qt_compute.Frame_Cache
+    '''
+    def setUp(self):
+        spec = engine.Joint_Spec(board_width='5', bit_width='1/2', spacing='Variable')
+        (self.config, self.bit, self.boards, self.sp) = engine.make_joint(spec)
+        self.built = []
+
+    def build(self, seconds):
+        c = qt_compute.Frame_Cache(seconds=seconds, delay_ms=0)
+        c.built.connect(lambda *args: self.built.append(args))
+        c.prepare(self.boards, self.bit, self.sp)
+        while not self.built:
+            c.wait()
+            QtCore.QCoreApplication.processEvents()
+        return c
+
+    def cuts(self):
+        return [tuple(None if c is None else router.Cut_Set(c)
+                      for c in (b.bottom_cuts, b.top_cuts))
+                for b in self.boards[:2]]
+
+    def test_frames(self):
+        c = self.build(100)
+        (count, _, complete) = self.built[0]
+        self.assertTrue(complete)
+        self.assertEqual(count, len(qt_compute.slider_settings(self.sp)))
+        # the frames vary one slider from the values when they were computed
+        params = copy.deepcopy(self.sp.params)
+        for (key, value) in [('Spacing', 0), ('Fingers', 3), ('Fingers', 5)]:
+            self.sp.params = copy.deepcopy(params)
+            self.sp.set_slider(key, value)
+            frame = c.lookup(self.sp)
+            self.assertTrue(frame is not None)
+            frame.apply(self.boards, self.sp)
+            cached = (self.cuts(), self.sp.labels, self.sp.description)
+            self.sp.set_cuts()
+            router.cut_boards(self.boards, self.bit, self.sp)
+            self.assertEqual(cached, (self.cuts(), self.sp.labels, self.sp.description))
+        # a change of the Inverted parameter is not a slider frame
+        self.sp.set_slider('Inverted', True)
+        self.assertTrue(c.lookup(self.sp) is None)
+        self.assertEqual((c.hits, c.misses), (3, 1))
+        c.clear()
+        self.assertEqual(len(c.frames), 0)
+
+    def test_time_limit(self):
+        c = self.build(0)
+        self.assertEqual(self.built[0][0], 0)
+        self.assertFalse(self.built[0][2])
+        self.assertEqual(len(c.frames), 0)
+
+
+class Fig_Drag_Test(unittest.TestCase):
+    '''
+    Tests editing the cuts with the mouse in qt_fig.Qt_Fig
+    '''
+    def setUp(self):
+        spec = engine.Joint_Spec(board_width=12, bit_width='1/2', spacing='Edit',
+                                 cuts=[(0, 20), (60, 90), (150, 180), (250, 270), (330, 384)])
+        (self.config, self.bit, self.boards, self.sp) = engine.make_joint(spec)
+        template = router.Incra_Template(self.bit.units, self.boards)
+        self.fig = qt_fig.Qt_Fig(template, self.boards, self.config)
+        self.fig.resize(1200, 800)
+        self.fig.draw(template, self.boards, self.bit, self.sp, {None: None}, '')
+        self.fig.enable_cut_editing(self.sp)
+        self.fig.show()
+        QTest.qWaitForWindowExposed(self.fig)
+        self.fig.repaint()
+        self.selected = []
+        self.edited = []
+        self.fig.cut_selected.connect(self.selected.append)
+        self.fig.cuts_edited.connect(lambda *args: self.edited.append(args))
+
+    def tearDown(self):
+        self.fig.close()
+
+    def mouse(self, kind, x):
+        board = self.boards[0]
+        pos = self.fig.transform.map(QtCore.QPointF(float(board.xL()) + x,
+                                                    float(board.yB() + self.bit.depth / 2)))
+        if kind == QtCore.QEvent.MouseMove:
+            button = QtCore.Qt.NoButton
+        else:
+            button = QtCore.Qt.LeftButton
+        event = QtGui.QMouseEvent(kind, pos, button, QtCore.Qt.LeftButton,
+                                  QtCore.Qt.NoModifier)
+        QtWidgets.QApplication.sendEvent(self.fig, event)
+
+    def drag(self, x0, xs):
+        self.mouse(QtCore.QEvent.MouseButtonPress, x0)
+        for x in xs:
+            self.mouse(QtCore.QEvent.MouseMove, x)
+            self.fig.repaint()
+        self.mouse(QtCore.QEvent.MouseButtonRelease, xs[-1])
+
+    def values(self):
+        return [(c.xmin, c.xmax) for c in self.sp.cuts]
+
+    def test_move(self):
+        before = self.values()
+        self.drag(75, [76.2, 80, 85.3])
+        self.assertEqual(self.selected, [1])
+        self.assertEqual((self.sp.cursor_cut, self.sp.active_cuts), (1, [1]))
+        self.assertEqual(self.values()[1], (70, 100))
+        self.assertEqual(len(self.edited), 1)
+        # clamped to the limits
+        self.drag(85, [200])
+        self.assertTrue(self.sp.check_limits(1))
+        self.assertEqual(self.sp.cuts[1].xmax, self.sp.get_limits(1)[1])
+        # each drag is one undo step
+        self.assertEqual(len(self.sp.log.undo_steps), 2)
+        self.sp.undo()
+        self.sp.undo()
+        self.assertEqual(self.values(), before)
+
+    def test_edges(self):
+        self.drag(150.2, [145, 140])
+        self.assertEqual(self.values()[2], (140, 180))
+        self.drag(179.8, [185])
+        self.assertEqual(self.values()[2], (140, 185))
+        self.assertEqual(len(self.edited), 2)
+
+    def test_miss(self):
+        self.drag(40, [50])
+        self.assertEqual(self.selected, [])
+        self.assertEqual(self.edited, [])
+        self.assertFalse(self.sp.changes_made())
+
+
+
+class Index_Dialog_Test(unittest.TestCase):
+    '''
+    Tests finding saved joints with qt_index.Index_Dialog
+    '''
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        for (name, spec) in [('a.png', engine.Joint_Spec(board_width='7 1/2', bit_width='1/2')),
+                             ('b.png', engine.Joint_Spec(board_width='7 1/2', bit_width='3/8',
+                                                         spacing='Variable')),
+                             ('c.png', engine.Joint_Spec(board_width=10, bit_width='1/2'))]:
+            (config, bit, boards, sp) = engine.make_joint(spec)
+            router_test.write_png(os.path.join(self.tmpdir, name),
+                                  {'pyRouterJig': serialize.serialize(bit, boards, sp, config),
+                                   'pyRouterJig_v': utils.VERSION})
+        self.index = joint_index.Joint_Index(':memory:')
+        self.index.update(self.tmpdir, config)
+        self.dialog = qt_index.Index_Dialog(self.index, bit.units)
+
+    def tearDown(self):
+        self.dialog.close()
+        self.index.close()
+        shutil.rmtree(self.tmpdir)
+
+    def files(self):
+        return [self.dialog.table.item(i, 0).text() for i in range(self.dialog.table.rowCount())]
+
+    def set_text(self, le, text):
+        le.setText(text)
+        le.editingFinished.emit()
+
+    def test_filter(self):
+        self.assertEqual(self.files(), ['a.png', 'b.png', 'c.png'])
+        self.set_text(self.dialog.le_board_width, '7 1/2')
+        self.assertEqual(self.files(), ['a.png', 'b.png'])
+        self.set_text(self.dialog.le_bit_width, '1/2')
+        self.assertEqual(self.files(), ['a.png'])
+        self.assertEqual(self.dialog.table.item(0, 1).text(), '1/2')
+        self.set_text(self.dialog.le_board_width, '')
+        self.assertEqual(self.files(), ['a.png', 'c.png'])
+        self.dialog.cb_spacing.setCurrentIndex(self.dialog.cb_spacing.findData('Vari'))
+        self.assertEqual(self.files(), [])
+        # an invalid value leaves the list alone
+        self.set_text(self.dialog.le_bit_angle, 'x')
+        self.assertEqual(self.files(), [])
+
+    def test_select(self):
+        button = self.dialog.buttons.button(QtWidgets.QDialogButtonBox.Open)
+        self.assertIsNone(self.dialog.selected_file())
+        self.assertFalse(button.isEnabled())
+        self.dialog.table.selectRow(1)
+        self.assertEqual(self.dialog.selected_file(), os.path.join(self.tmpdir, 'b.png'))
+        self.assertTrue(button.isEnabled())
+
+
+
+class Save_Png_Test(unittest.TestCase):
+    '''
+    Tests saving images with qt_utils.save_png
+    '''
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.filename = os.path.join(self.tmpdir, 'joint.png')
+        self.image = QtGui.QImage(300, 200, QtGui.QImage.Format_RGB32)
+        self.image.fill(QtGui.QColor(250, 240, 200))
+        painter = QtGui.QPainter(self.image)
+        painter.fillRect(20, 30, 100, 50, QtGui.QColor(90, 40, 10))
+        painter.end()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def check_file(self, tolerance):
+        from PIL import Image
+        self.assertEqual(serialize.read_png_text(self.filename),
+                         {'pyRouterJig': '{"format":1}', 'pyRouterJig_v': utils.VERSION})
+        # earlier versions read the joint with PIL
+        image = Image.open(self.filename)
+        self.assertEqual(image.info['pyRouterJig'], '{"format":1}')
+        image.close()
+        saved = QtGui.QImage(self.filename)
+        self.assertEqual(saved.size(), self.image.size())
+        for (x, y) in [(0, 0), (50, 50), (299, 199)]:
+            c0 = QtGui.QColor(self.image.pixel(x, y))
+            c1 = QtGui.QColor(saved.pixel(x, y))
+            for (v0, v1) in zip(c0.getRgb(), c1.getRgb()):
+                self.assertLessEqual(abs(v0 - v1), tolerance)
+
+    def test_srgb(self):
+        self.assertIs(qt_utils.icc_profiles(), qt_utils.icc_profiles())
+        with mock.patch('PIL.ImageCms.profileToProfile', side_effect=AssertionError):
+            with mock.patch.object(qt_utils, 'icc_profiles', return_value=(None, None, True)):
+                self.assertTrue(qt_utils.save_png(self.image, self.filename, '{"format":1}'))
+        self.check_file(0)
+
+    def test_convert(self):
+        from PIL import ImageCms
+        srgb = ImageCms.createProfile('sRGB')
+        with mock.patch.object(qt_utils, 'icc_profiles', return_value=(srgb, srgb, False)):
+            self.assertTrue(qt_utils.save_png(self.image, self.filename, '{"format":1}'))
+            pixmap = QtGui.QPixmap.fromImage(self.image)
+            self.assertTrue(qt_utils.save_png(pixmap, self.filename, '{"format":1}'))
+        self.check_file(2)
+
+    def test_error(self):
+        self.assertFalse(qt_utils.save_png(self.image, os.path.join(self.tmpdir, 'no', 'x.png'),
+                                           '{"format":1}'))
+
+
+
+class IO_Pool_Test(unittest.TestCase):
+    '''
+    Tests writing files in the background with qt_io.IO_Pool
+    '''
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.pool = qt_io.IO_Pool(max_threads=2, max_pending=2)
+        self.written = []
+        self.failed = []
+        self.pool.written.connect(lambda job: self.written.append(job.filename))
+        self.pool.failed.connect(lambda job, e: self.failed.append((job.filename, e)))
+
+    def tearDown(self):
+        self.pool.wait()
+        shutil.rmtree(self.tmpdir)
+
+    def job(self, name, write):
+        return qt_io.IO_Job(os.path.join(self.tmpdir, name), write, 'written', 'failed')
+
+    def finish(self):
+        # the signals are emitted by wait(), without the event loop
+        self.pool.wait()
+        self.assertEqual(self.pool.pending(), 0)
+        # no temporary files are left
+        self.assertEqual([f for f in os.listdir(self.tmpdir) if f.endswith('.tmp')], [])
+
+    def test_write(self):
+        for i in range(5):
+            self.pool.submit(self.job('%d.txt' % i, qt_io.write_bytes(b'x' * i)))
+        self.finish()
+        self.assertEqual(sorted(self.written),
+                         [os.path.join(self.tmpdir, '%d.txt' % i) for i in range(5)])
+        self.assertEqual(self.failed, [])
+        with open(os.path.join(self.tmpdir, '4.txt'), 'rb') as fd:
+            self.assertEqual(fd.read(), b'xxxx')
+
+    def test_failure(self):
+        filename = os.path.join(self.tmpdir, 'a.txt')
+        with open(filename, 'w') as fd:
+            fd.write('old')
+
+        def write(path):
+            with open(path, 'w') as fd:
+                fd.write('partial')
+            raise IOError('disk full')
+
+        self.pool.submit(self.job('a.txt', write))
+        self.pool.submit(self.job('b.txt', write))
+        self.finish()
+        self.assertEqual(self.written, [])
+        self.assertEqual(sorted(f for (f, _) in self.failed),
+                         [filename, os.path.join(self.tmpdir, 'b.txt')])
+        # the partial files never appear
+        self.assertEqual(os.listdir(self.tmpdir), ['a.txt'])
+        with open(filename) as fd:
+            self.assertEqual(fd.read(), 'old')
+
+    def test_bounded(self):
+        event = threading.Event()
+
+        def write(path):
+            event.wait()
+            qt_io.write_bytes(b'')(path)
+
+        self.pool.submit(self.job('a.txt', write))
+        self.pool.submit(self.job('b.txt', write))
+        self.assertEqual(self.pool.pending(), 2)
+        timer = threading.Timer(0.2, event.set)
+        timer.start()
+        # the third waits for room
+        t = time.perf_counter()
+        self.pool.submit(self.job('c.txt', write))
+        self.assertGreater(time.perf_counter() - t, 0.1)
+        self.assertLessEqual(self.pool.pending(), 2)
+        timer.join()
+        self.finish()
+        self.assertEqual(len(self.written), 3)
+
+
 if __name__ == '__main__':
     unittest.main()
 
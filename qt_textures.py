@@ -0,0 +1,205 @@
+###########################################################################
+#
+# Copyright 2015-2018 Robert B. Lowrie (http://github.com/lowrie)
+#
+# This file is part of pyRouterJig.
+#
+# pyRouterJig is free software: you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# pyRouterJig is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR
+# A PARTICULAR PURPOSE.  See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along with
+# pyRouterJig; see the file LICENSE. If not, see <http://www.gnu.org/licenses/>.
+#
+###########################################################################
+
+'''
+Contains the cache of the decoded wood images, used as the textures of the
+boards.
+
+Each image is decoded once, and kept as a QPixmap until it is least recently
+used and the cache exceeds its memory budget.  The boards are filled with the
+texture at one image pixel per device pixel, so only the top-left corner of a
+large photo is ever seen; images larger than MAX_TEXTURE_SIZE are cropped to
+it when decoded, which also limits the decoding for formats that support
+clipping, such as JPEG.
+
+For painting on the screen, the images are decoded in a background thread,
+and texture_ready is emitted as each one is ready.  Until then, the boards are
+filled with a pattern.
+'''
+
+import os
+from collections import OrderedDict
+
+from PyQt5 import QtCore, QtGui
+
+# The memory budget of the cache, in bytes
+TEXTURE_CACHE_BYTES = 128 * 2**20
+
+# The maximum width and height of a texture, in pixels
+MAX_TEXTURE_SIZE = 4096
+
+
+def read_texture(filename, max_size):
+    '''
+    Returns the QImage of the image file filename, cropped to at most
+    max_size pixels in width and height.  The image is null if the file
+    could not be read.
+    '''
+    reader = QtGui.QImageReader(filename)
+    size = reader.size()
+    if size.isValid() and (size.width() > max_size or size.height() > max_size):
+        reader.setClipRect(QtCore.QRect(0, 0, min(size.width(), max_size),
+                                        min(size.height(), max_size)))
+    return reader.read()
+
+
+class Texture_Signals(QtCore.QObject):
+    '''
+    The signals of a Texture_Loader, which is not itself a QObject.
+    '''
+    loaded = QtCore.pyqtSignal(object, object)
+
+
+class Texture_Loader(QtCore.QRunnable):
+    '''
+    Decodes an image file in a thread of the QThreadPool, and emits
+    signals.loaded with the cache key and the QImage.
+    '''
+    def __init__(self, key, signals):
+        QtCore.QRunnable.__init__(self)
+        self.key = key
+        self.signals = signals
+
+    def run(self):
+        (filename, _, max_size) = self.key
+        self.signals.loaded.emit(self.key, read_texture(filename, max_size))
+
+
+class Texture_Cache(QtCore.QObject):
+    '''
+    Least-recently-used cache of the textures, keyed by the image filename,
+    its modification time, and the maximum texture size.
+
+    Attributes:
+
+    budget: The memory budget, in bytes
+    nbytes: The memory of the textures in the cache, in bytes
+    hits, misses, loads: Counts of the cache lookups, and of the images decoded
+    '''
+    texture_ready = QtCore.pyqtSignal()
+
+    def __init__(self, budget=TEXTURE_CACHE_BYTES, max_size=MAX_TEXTURE_SIZE):
+        QtCore.QObject.__init__(self)
+        self.budget = budget
+        self.max_size = max_size
+        self.textures = OrderedDict()
+        self.pending = set()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.loads = 0
+        self.signals = Texture_Signals()
+        self.signals.loaded.connect(self._on_loaded)
+
+    def pixmap(self, filename, wait=True):
+        '''
+        Returns the QPixmap of the image file filename.  The pixmap is null if
+        the file could not be read.  If wait is False and the image is not yet
+        decoded, starts decoding it in the background and returns None.
+        '''
+        try:
+            mtime = os.path.getmtime(filename)
+        except OSError:
+            return QtGui.QPixmap()
+        key = (filename, mtime, self.max_size)
+        pixmap = self.textures.get(key)
+        if pixmap is not None:
+            self.hits += 1
+            self.textures.move_to_end(key)
+            return pixmap
+        self.misses += 1
+        if wait:
+            self.loads += 1
+            return self._store(key, read_texture(filename, self.max_size))
+        if key not in self.pending:
+            self.pending.add(key)
+            self.loads += 1
+            QtCore.QThreadPool.globalInstance().start(Texture_Loader(key, self.signals))
+        return None
+
+    def wait(self):
+        '''
+        Waits until the background decoding is done.  Textures finished are
+        stored when the event loop next runs.
+        '''
+        QtCore.QThreadPool.globalInstance().waitForDone()
+
+    def clear(self):
+        '''
+        Removes all of the textures.
+        '''
+        self.textures.clear()
+        self.nbytes = 0
+
+    def _store(self, key, image):
+        '''
+        Stores the texture of image under key, evicting the least recently
+        used textures, and any of older versions of the file, to stay within
+        the budget.  Returns the QPixmap.  The texture is not stored if a
+        newer version of the file is already cached, such as when a background
+        decoding finishes after the changed file was decoded directly.
+        '''
+        pixmap = QtGui.QPixmap.fromImage(image)
+        if any(k[0] == key[0] and k[1] > key[1] for k in self.textures):
+            return pixmap
+        for k in list(self.textures.keys()):
+            if k[0] == key[0]:
+                self._remove(k)
+        self.textures[key] = pixmap
+        self.nbytes += pixmap_bytes(pixmap)
+        while self.nbytes > self.budget and len(self.textures) > 1:
+            self._remove(next(iter(self.textures)))
+        return pixmap
+
+    def _remove(self, key):
+        '''
+        Removes the texture of key.
+        '''
+        self.nbytes -= pixmap_bytes(self.textures.pop(key))
+
+    @QtCore.pyqtSlot(object, object)
+    def _on_loaded(self, key, image):
+        '''
+        Stores a texture decoded in the background.
+        '''
+        self.pending.discard(key)
+        self._store(key, image)
+        self.texture_ready.emit()
+
+
+def pixmap_bytes(pixmap):
+    '''
+    Returns the memory used by pixmap, in bytes.
+    '''
+    return pixmap.width() * pixmap.height() * pixmap.depth() // 8
+
+
+# The cache shared by all of the figures, created by cache()
+_cache = None
+
+
+def cache():
+    '''
+    Returns the shared Texture_Cache.
+    '''
+    global _cache
+    if _cache is None:
+        _cache = Texture_Cache()
+    return _cache
@@ -23,10 +23,13 @@ Contains utilities for Qt functionality
 '''
 
 import os
+import functools
 import glob
 import operator
-from PyQt5 import QtCore, QtWidgets
+from io import BytesIO
+from PyQt5 import QtCore, QtGui, QtWidgets
 import router
+import utils
 
 def set_router_value(line_edit, obj, attr, setter, is_float=False, bit=None):
     '''
@@ -164,6 +167,86 @@ def create_wood_dict(wood_images, transl):
                 transl.tr('No Fill'): None}
     return (woods, patterns)
 
+@functools.lru_cache(maxsize=1)
+def icc_profiles():
+    '''
+    Returns the tuple (display profile, sRGB profile, is_srgb) used to
+    convert images taken from the display to sRGB, where is_srgb is True if
+    the display profile is sRGB, so that no conversion is needed.  The
+    profiles are built once per session.
+    '''
+    # PIL is imported here, rather than at startup, since it is slow to import
+    from PIL import ImageCms
+
+    srgb = ImageCms.createProfile('sRGB')
+    monitor_profile = ImageCms.get_display_profile()
+    if monitor_profile is None:
+        # rare happen case - non profiled monitor, which is taken as sRGB
+        return (srgb, srgb, True)
+    is_srgb = 'sRGB' in ImageCms.getProfileDescription(monitor_profile)
+    return (monitor_profile, srgb, is_srgb)
+
+
+def png_bytes(image, s):
+    '''
+    Returns the QImage image encoded as a PNG file, with the serialized
+    joint s as metadata.  The image is encoded once.  If the display is not
+    sRGB, the pixels are first converted to sRGB.
+    '''
+    import serialize
+
+    text = {serialize.PNG_KEYS[0]: s, serialize.PNG_KEYS[1]: utils.VERSION}
+    (monitor_profile, srgb, is_srgb) = icc_profiles()
+    if is_srgb:
+        # Encode with Qt, and add the text chunks to its bytes
+        buffer = QtCore.QBuffer()
+        buffer.open(QtCore.QIODevice.WriteOnly)
+        ok = image.save(buffer, 'PNG')
+        png = bytes(buffer.data())
+        buffer.close()
+        if not ok:
+            raise IOError('Unable to encode the image')
+        return serialize.add_png_text(png, text)
+
+    # The image is taken from the monitor, so convert it to sRGB.  PIL reads
+    # the pixels of the QImage directly, and encodes them once.
+    from PIL import Image
+    from PIL import ImageCms
+    from PIL import PngImagePlugin
+    if isinstance(image, QtGui.QPixmap):
+        image = image.toImage()
+    if image.hasAlphaChannel():
+        (qformat, mode) = (QtGui.QImage.Format_RGBA8888, 'RGBA')
+    else:
+        (qformat, mode) = (QtGui.QImage.Format_RGB888, 'RGB')
+    image = image.convertToFormat(qformat)
+    bits = image.constBits()
+    bits.setsize(image.byteCount())
+    pilimg = Image.frombuffer(mode, (image.width(), image.height()), bytes(bits), 'raw', mode,
+                              image.bytesPerLine(), 1)
+    pilimg = ImageCms.profileToProfile(pilimg, monitor_profile, srgb)
+    info = PngImagePlugin.PngInfo()
+    for k in serialize.PNG_KEYS:
+        info.add_text(k, text[k])
+    pio = BytesIO()
+    pilimg.save(pio, 'png', pnginfo=info)
+    return pio.getvalue()
+
+
+def save_png(image, filename, s):
+    '''
+    Saves the QImage image to the PNG file filename, with the serialized
+    joint s as metadata.  Returns True if the file was saved.
+    '''
+    png = png_bytes(image, s)
+    try:
+        with open(filename, 'wb') as fd:
+            fd.write(png)
+    except OSError:
+        return False
+    return True
+
+
 def create_lang_dict():
     '''
     Creates a dictionary {lang_name : locale_id} by parsing the
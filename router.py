@@ -23,9 +23,42 @@ Contains the router, board, template and their geometry properties.
 '''
 
 from decimal import Decimal as D
-from decimal import ROUND_HALF_DOWN
+from decimal import ROUND_HALF_DOWN, getcontext
+from array import array
+import copy
+import functools
 import math
+import sys
 import utils
+import fixed_point
+import pass_order
+import pass_planner
+
+# The geometry kernel used to compute cuts, passes and perimeters:
+#   'decimal': Decimal arithmetic (the reference implementation)
+#   'fixed': integer fixed-point arithmetic (see fixed_point.py), which falls
+#            back to 'decimal' for any value it cannot represent exactly
+#   'vector': as 'fixed', but plans the passes of each edge with at least
+#             VECTOR_MIN_CUTS cuts in one call (see pass_planner.py), since
+#             numpy's overhead dominates for fewer cuts.  Requires numpy.
+GEOMETRY_KERNELS = ['decimal', 'fixed']
+if pass_planner.AVAILABLE:
+    GEOMETRY_KERNELS.append('vector')
+VECTOR_MIN_CUTS = 128
+geometry_kernel = 'decimal'
+
+# The number of distinct Bit_Geometry records kept by bit_geometry()
+BIT_GEOMETRY_CACHE_SIZE = 256
+
+
+def set_geometry_kernel(kernel):
+    '''
+    Selects the geometry kernel, which must be one of GEOMETRY_KERNELS.
+    '''
+    global geometry_kernel
+    if kernel not in GEOMETRY_KERNELS:
+        raise ValueError('Unknown geometry kernel: %s' % kernel)
+    geometry_kernel = kernel
 
 
 class Router_Exception(Exception):
@@ -62,6 +95,75 @@ class Incra_Template(object):
         else:
             self.length = length
 
+class Bit_Geometry(object):
+    '''
+    The immutable attributes of a Router_Bit computed from its width, depth
+    and angle.  See Router_Bit for their descriptions.  Create these with
+    bit_geometry(), so that identical bits share one record.
+    '''
+    __slots__ = ('midline', 'depth_0', 'width_f', 'gap', 'overhang')
+
+    def __init__(self, midline, depth_0, width_f, gap, overhang):
+        for (k, v) in zip(self.__slots__, (midline, depth_0, width_f, gap, overhang)):
+            object.__setattr__(self, k, v)
+
+    def __setattr__(self, name, value):
+        raise AttributeError('Bit_Geometry is immutable')
+
+    def __reduce__(self):
+        return (Bit_Geometry, tuple(getattr(self, k) for k in self.__slots__))
+
+
+@functools.lru_cache(maxsize=BIT_GEOMETRY_CACHE_SIZE, typed=True)
+def _bit_geometry(width, depth, angle, metric, num_increments, prec, rounding):
+    '''
+    Computes the Bit_Geometry, keyed by all of the arguments.  The units and
+    the Decimal context are part of the key, since the same increments mean
+    different lengths in other units, and the Decimal arithmetic rounds to
+    the context.
+    '''
+    midline = D(repr(width))
+    depth_0 = D(repr(depth))
+    width_f = D(repr(width))
+    gap = D('0')
+
+    if angle > 0:
+        tan = D(math.tan(angle * math.pi / 180))
+        offset = D(depth) * tan
+        midline = width_f - offset
+        rounded = midline.to_integral_value(rounding=ROUND_HALF_DOWN)
+        gap = D(midline) - rounded
+        midline = rounded
+        depth_0 = (width_f - midline) / tan
+
+    return Bit_Geometry(midline, depth_0, width_f, gap, (width_f - midline) / 2)
+
+
+def bit_geometry(units, width, depth, angle):
+    '''
+    Returns the shared Bit_Geometry of a bit with the given width and depth,
+    in increments of units, and angle, in degrees.
+    '''
+    context = getcontext()
+    return _bit_geometry(width, depth, angle, units.metric, units.num_increments,
+                         context.prec, context.rounding)
+
+
+def bit_geometry_cache_info():
+    '''
+    Returns the (hits, misses, maxsize, currsize) of the cache of
+    bit_geometry().
+    '''
+    return _bit_geometry.cache_info()
+
+
+def clear_bit_geometry_cache():
+    '''
+    Empties the cache of bit_geometry(), and resets its counters.
+    '''
+    _bit_geometry.cache_clear()
+
+
 class Router_Bit(object):
     '''
     Stores properties of dovetail and straight router bits.
@@ -102,12 +204,6 @@ class Router_Bit(object):
         self.angle = angle
         self.bit_gentle = D(bit_gentle)
 
-        self.midline = D('0')
-        self.depth_0 = D('0')
-        self.width_f = D(repr(width))
-        self.overhang = (self.width_f - self.midline) / 2
-        self.gap = D('0')
-
         self.reinit()
 
     def set_gentle_from_string(self, s):
@@ -200,23 +296,14 @@ class Router_Bit(object):
     def reinit(self):
         '''
         Reinitializes internal attributes that are dependent on width
-        and angle.
+        and angle.  Identical bits share the record from bit_geometry().
         '''
-        self.midline = D(repr(self.width))
-        self.depth_0 = D(repr(self.depth))
-        self.width_f = D(repr(self.width))
-        self.gap = D('0')
-
-        if self.angle > 0:
-            tan = D(math.tan(self.angle * math.pi / 180))
-            offset = D(self.depth) * tan
-            self.midline = self.width_f - offset
-            midline = self.midline.to_integral_value(rounding=ROUND_HALF_DOWN)
-            self.gap = D(self.midline) - midline
-            self.midline = midline
-            self.depth_0 = (self.width_f - self.midline) / tan
-
-        self.overhang = (self.width_f - self.midline) / 2
+        self.geometry = bit_geometry(self.units, self.width, self.depth, self.angle)
+        self.midline = self.geometry.midline
+        self.depth_0 = self.geometry.depth_0
+        self.width_f = self.geometry.width_f
+        self.gap = self.geometry.gap
+        self.overhang = self.geometry.overhang
 
 
 class My_Rectangle(object):
@@ -288,6 +375,40 @@ class Board(My_Rectangle):
         self.bottom_cuts = None
         self.top_cuts = None
         self.transl = bit.units.transl
+        # The router passes of the last cuts on each edge, and of the caul
+        # cuts made with this board
+        self.pass_caches = {'top': Pass_Cache(),
+                            'bottom': Pass_Cache(),
+                            'caul': Pass_Cache()}
+        # The values computed from the last cuts: the cuts of each edge
+        # adjoining the edge cut before it, the caul cuts, and the
+        # perimeter along the cuts of each edge
+        self.span_caches = {'top': Span_Cache(1),
+                            'bottom': Span_Cache(1),
+                            'caul': Span_Cache(),
+                            'perimeter_top': Span_Cache(),
+                            'perimeter_bottom': Span_Cache()}
+
+    def snapshot(self):
+        '''
+        Returns a copy of the board, with copies of its caches, whose cuts
+        may be computed apart from this board, such as in another thread.
+        '''
+        b = copy.copy(self)
+        b.pass_caches = dict((k, c.copy()) for (k, c) in self.pass_caches.items())
+        b.span_caches = dict((k, c.copy()) for (k, c) in self.span_caches.items())
+        return b
+
+    def adopt_cuts(self, other):
+        '''
+        Takes the cuts, caches, and origin computed on other, a snapshot() of
+        this board.
+        '''
+        self.bottom_cuts = other.bottom_cuts
+        self.top_cuts = other.top_cuts
+        self.pass_caches = other.pass_caches
+        self.span_caches = other.span_caches
+        self.set_origin(other.xOrg, other.yOrg)
 
     def set_wood(self, wood):
         '''Sets attribute wood'''
@@ -355,42 +476,43 @@ class Board(My_Rectangle):
 
     def set_bottom_cuts(self, cuts, bit):
         '''Sets the bottom cuts for the board'''
-        for c in cuts:
-            c.make_router_passes(bit, self)
+        self.pass_caches['bottom'].make_router_passes(cuts, bit, self)
         self.bottom_cuts = cuts
 
     def set_top_cuts(self, cuts, bit):
         '''Sets the top cuts for the board'''
-        for c in cuts:
-            c.make_router_passes(bit, self)
+        self.pass_caches['top'].make_router_passes(cuts, bit, self)
         self.top_cuts = cuts
 
-    def _do_cuts(self, bit, cuts, y_nocut, y_cut):
-        '''Creates the perimeter coordinates for the given cuts'''
+    def _do_cuts(self, bit, cuts, y_nocut, y_cut, cache=None):
+        '''
+        Creates the perimeter coordinates for the given cuts.  If cache is
+        a Span_Cache, only the points along the cuts changed since its last
+        cuts are computed.
+        '''
+        # the first point, used by the points along each cut
+        if cuts[0].xmin > 0:
+            x0 = D(self.xL())
+        else:
+            x0 = cuts[0].xmin + self.xL() - bit.gap / 2
+
+        def compute(lo, hi):
+            return [self._cut_points(bit, c, x0, y_nocut, y_cut) for c in cuts[lo:hi]]
+
+        if cache is None:
+            segments = compute(0, len(cuts))
+        else:
+            key = (geometry_kernel, bit.gap, bit.overhang, self.xL(), self.width, x0,
+                   y_nocut, y_cut)
+            segments = cache.get(key, cuts, compute)
         x = []
         y = []
-        halfgap = bit.gap / 2
-        overhang = 2 * bit.overhang
-
         if cuts[0].xmin > 0:
-            x = [D(self.xL())]
+            x = [x0]
             y = [D(y_nocut)]
-        # loop through the cuts and add them to the perimeter
-        for c in cuts:
-            if c.xmin > 0:
-                # on the surface, start of cut
-                x.append(c.xmin + x[0] + overhang - halfgap)
-                y.append(D(y_nocut))
-            # at the cut depth, start of cut
-            x.append(c.xmin + self.xL() - halfgap)
-            y.append(D(y_cut))
-            # at the cut depth, end of cut
-            x.append(c.xmax + self.xL() + halfgap)
-            y.append(D(y_cut))
-            if c.xmax < self.width:
-                # at the surface, end of cut
-                x.append(c.xmax + self.xL() - overhang + halfgap)
-                y.append(D(y_nocut))
+        for (xs, ys) in segments:
+            x.extend(xs)
+            y.extend(ys)
         # add the last point on the top and bottom, at the right edge,
         # accounting for whether the last cut includes this edge or not.
         if cuts[-1].xmax < self.width:
@@ -398,6 +520,46 @@ class Board(My_Rectangle):
             y.append(D(y_nocut))
         return (x, y)
 
+    def _cut_points(self, bit, c, x0, y_nocut, y_cut):
+        '''
+        Returns the perimeter coordinates along the Cut c, as a tuple of the
+        x and y coordinates.  x0 is the first x-coordinate of the perimeter.
+        '''
+        if geometry_kernel != 'decimal':
+            try:
+                bt = fixed_point.bit_ticks(bit)
+                (xt, on_surface) = fixed_point.cut_points((fixed_point.to_ticks(c.xmin),
+                                                           fixed_point.to_ticks(c.xmax)),
+                                                          bt, fixed_point.to_ticks(x0),
+                                                          fixed_point.to_ticks(self.xL()),
+                                                          fixed_point.to_ticks(self.width))
+            except fixed_point.Fixed_Point_Exception:
+                pass
+            else:
+                y_nocut = D(y_nocut)
+                y_cut = D(y_cut)
+                return (tuple(fixed_point.from_ticks(t) for t in xt),
+                        tuple(y_nocut if s else y_cut for s in on_surface))
+        x = []
+        y = []
+        halfgap = bit.gap / 2
+        overhang = 2 * bit.overhang
+        if c.xmin > 0:
+            # on the surface, start of cut
+            x.append(c.xmin + x0 + overhang - halfgap)
+            y.append(D(y_nocut))
+        # at the cut depth, start of cut
+        x.append(c.xmin + self.xL() - halfgap)
+        y.append(D(y_cut))
+        # at the cut depth, end of cut
+        x.append(c.xmax + self.xL() + halfgap)
+        y.append(D(y_cut))
+        if c.xmax < self.width:
+            # at the surface, end of cut
+            x.append(c.xmax + self.xL() - overhang + halfgap)
+            y.append(D(y_nocut))
+        return (tuple(x), tuple(y))
+
     def do_all_cuts(self, bit):
         '''
         Returns (xtop, ytop, xbottom, ybottom), which are the coordinates of the top and
@@ -411,7 +573,8 @@ class Board(My_Rectangle):
             ytop = [y_nocut, y_nocut]
         else:
             y_cut = y_nocut - bit.depth   # y-location of routed edge
-            (xtop, ytop) = self._do_cuts(bit, self.top_cuts, y_nocut, y_cut)
+            (xtop, ytop) = self._do_cuts(bit, self.top_cuts, y_nocut, y_cut,
+                                         self.span_caches['perimeter_top'])
         # Do the bottom edge
         y_nocut = self.yB()  # y-location of uncut edge
         if self.bottom_cuts is None:
@@ -419,7 +582,8 @@ class Board(My_Rectangle):
             yb = [y_nocut, y_nocut]
         else:
             y_cut = y_nocut + bit.depth   # y-location of routed edge
-            (xb, yb) = self._do_cuts(bit, self.bottom_cuts, y_nocut, y_cut)
+            (xb, yb) = self._do_cuts(bit, self.bottom_cuts, y_nocut, y_cut,
+                                     self.span_caches['perimeter_bottom'])
         return (xtop, ytop, xb, yb)
 
     def perimeter(self, bit):
@@ -444,113 +608,113 @@ class Board(My_Rectangle):
 
     def triangulate(self, bit):
         '''
-        Compute the triangulation of the board.
+        Compute the triangulation of the board, which may have cuts on
+        either or both edges.  Requires a straight bit, so that each edge is
+        a sequence of horizontal segments and vertical steps.
 
         bit: A Router_Bit object.
 
-        Returns (x, y, t), where
-
-        x, y = lists of vertex coordinates, ordered clockwise around perimeter
-        t = list of triangle indices in x, y
-
-        Note that perimeter() returns a smaller list of (x, y), but more
-        coordinates are needed to create a good triangulation.
-        '''
-        t = []
-        y_top = self.yT()
-        y_bot = self.yB()
-        v = 0
-        if self.top_cuts is None:  # has only bottom cuts
-            y_cut = y_bot + bit.depth  # y-location of routed edge
-            cuts = self.bottom_cuts
-            (xc, yc) = self._do_cuts(bit, cuts, y_bot, y_cut)
-            nintervals = 2 * len(cuts) - 1
-            incut = True
-            if cuts[0].xmin > 0:
-                nintervals += 1
-                incut = False
-                xc.insert(0, xc[0])
-                yc.insert(0, y_cut)
-            if cuts[-1].xmax < self.width:
-                nintervals += 1
-                xc.append(self.width)
-                yc.append(y_cut)
-            ntop = nintervals + 1
-            ntotal = ntop + len(xc)
-            v = [[self.xL(), y_top]] * ntotal
-            v[0] = [xc[0], yc[0]]
-            v[1] = [xc[1], yc[1]]
-            ic = 0
-            ibot = 2
-            itop = ntotal - 2
-            for _ in range(nintervals):
-                v[ibot] = [xc[ibot], yc[ibot]]
-                if ibot < len(xc) - 1:
-                    v[ibot + 1] = [xc[ibot + 1], yc[ibot + 1]]
-                if incut:
-                    v[itop] = [cuts[ic].xmax + self.xL(), y_top]
-                    ic += 1
-                    t.append([ibot - 1, ibot, itop])
-                    t.append([ibot - 1, itop, itop + 1])
-                else:
-                    if ic < len(cuts):
-                        v[itop] = [cuts[ic].xmin + self.xL(), y_top]
-                    else:
-                        v[itop] = [self.xR(), y_top]
-                    t.append([ibot - 1, ibot, ibot + 1])
-                    t.append([ibot - 1, ibot + 1, ibot - 2])
-                    t.append([ibot - 2, ibot + 1, itop])
-                    t.append([ibot - 2, itop, itop + 1])
-                incut = (not incut)
-                ibot += 2
-                itop -= 1
-        elif self.bottom_cuts is None:  # has only top cuts
-            y_cut = y_top - bit.depth  # y-location of routed edge
-            cuts = self.top_cuts
-            (xc, yc) = self._do_cuts(bit, cuts, y_top, y_cut)
-            nintervals = 2 * len(cuts) - 1
-            incut = True
-            if cuts[0].xmin > 0:
-                nintervals += 1
-                incut = False
-                xc.insert(0, xc[0])
-                yc.insert(0, y_cut)
-            if cuts[-1].xmax < self.width:
-                nintervals += 1
-                xc.append(self.width)
-                yc.append(y_cut)
-            nbot = nintervals + 1
-            ntotal = nbot + len(xc)
-            v = [[self.xL(), y_bot]] * ntotal
-            v[0] = [xc[0], yc[0]]
-            v[1] = [xc[1], yc[1]]
-            ic = 0
-            ibot = ntotal - 2
-            itop = 2
-            for _ in range(nintervals):
-                v[itop] = [xc[itop], yc[itop]]
-                if itop < len(xc) - 1:
-                    v[itop + 1] = [xc[itop + 1], yc[itop + 1]]
-                if incut:
-                    v[ibot] = [cuts[ic].xmax + self.xL(), y_bot]
-                    ic += 1
-                    t.append([itop - 1, itop, ibot + 1])
-                    t.append([itop, ibot, ibot + 1])
+        Returns (v, t), where
+
+        v = array of the vertex coordinates x0, y0, x1, y1, ..., ordered
+            clockwise around the perimeter
+        t = array of the vertex indices of each triangle, three per triangle,
+            each counterclockwise
+
+        The board is split into vertical slabs at the x-location of every
+        step on either edge, and each slab is triangulated between its left
+        and right sides.  Vertices are added on each edge below or above
+        the steps of the other edge, so that the slabs share all of their
+        vertices and the triangulation has no cracks.  Note that perimeter()
+        returns a smaller list of (x, y).
+        '''
+        if bit.angle > 0:
+            raise Router_Exception(bit.transl.tr('Unable to triangulate the board'
+                                                 ' for a dovetail bit'))
+        (xt, yt, xb, yb) = self.do_all_cuts(bit)
+        top = _profile_columns(xt, yt)
+        bottom = _profile_columns(xb, yb)
+        xs = sorted(set(top).union(bottom))
+
+        # Number the vertices clockwise: the top edge from left to right, then
+        # the bottom edge from right to left.  Each edge gets a vertex at every
+        # x in xs.
+        v = array('d')
+        columns = []
+        ytop = ybot = None
+        for x in xs:
+            ytop = top.get(x, [ytop])
+            ybot = bottom.get(x, [ybot])
+            columns.append([x, ytop, None, ybot, None])
+            ytop = ytop[-1]
+            ybot = ybot[-1]
+        n = 0
+        for c in columns:
+            c[2] = list(range(n, n + len(c[1])))
+            n += len(c[1])
+            for y in c[1]:
+                v.append(float(c[0]))
+                v.append(float(y))
+        for c in reversed(columns):
+            c[4] = list(range(n + len(c[3]) - 1, n - 1, -1))
+            n += len(c[3])
+            for y in reversed(c[3]):
+                v.append(float(c[0]))
+                v.append(float(y))
+
+        t = array('l')
+        for (left, right) in zip(columns[:-1], columns[1:]):
+            y0 = left[3][-1]
+            y1 = left[1][-1]
+            if y1 <= y0:
+                continue
+            side_l = _slab_side(left, -1, y0, y1)
+            side_r = _slab_side(right, 0, y0, y1)
+            # zip up the two sides, from the bottom
+            i = 0
+            j = 0
+            while i < len(side_l) - 1 or j < len(side_r) - 1:
+                if j == len(side_r) - 1 or \
+                   (i < len(side_l) - 1 and side_l[i + 1][0] <= side_r[j + 1][0]):
+                    t.extend([side_l[i][1], side_r[j][1], side_l[i + 1][1]])
+                    i += 1
                 else:
-                    if ic < len(cuts):
-                        v[ibot] = [cuts[ic].xmin + self.xL(), y_bot]
-                    else:
-                        v[ibot] = [self.xR(), y_bot]
-                    t.append([itop - 2, itop + 1, itop])
-                    t.append([itop - 2, itop, itop - 1])
-                    t.append([itop + 1, itop - 2, ibot + 1])
-                    t.append([itop + 1, ibot + 1, ibot])
-                incut = (not incut)
-                itop += 2
-                ibot -= 1
+                    t.extend([side_l[i][1], side_r[j][1], side_r[j + 1][1]])
+                    j += 1
         return (v, t)
 
 
+def _profile_columns(x, y):
+    '''
+    Groups the profile (x, y) of an edge of a board, ordered left to right, by
+    x-location.  Returns a dictionary of the y-locations of the profile at
+    each x, in profile order.
+    '''
+    columns = {}
+    for (xi, yi) in zip(x, y):
+        ys = columns.setdefault(xi, [])
+        if not ys or ys[-1] != yi:
+            ys.append(yi)
+    return columns
+
+
+def _slab_side(column, end, y0, y1):
+    '''
+    Returns the (y, vertex index) of a side of the slab from y0 to y1, from
+    the bottom up, where column is the [x, top ys, top indices, bottom ys,
+    bottom indices] of the side, and end is the index in each edge of the
+    vertex at the corner of the slab.
+    '''
+    side = [(y0, column[4][end])]
+    for (ys, iv) in [(column[1], column[2]), (column[3], column[4])]:
+        for (y, i) in zip(ys, iv):
+            if y0 < y < y1:
+                side.append((y, i))
+    side.append((y1, column[2][end]))
+    side.sort()
+    return side
+
+
 class Cut(object):
     '''
     Cut description.
@@ -564,12 +728,24 @@ class Cut(object):
     midPass: The particle pass in passes that is centered (within an increment)
              on the cut
     '''
+    __slots__ = ('xmin', 'xmax', 'passes')
+
+    # Presission value is about 1/64 inch (the exact 1/64 = 0.0156 so we fine for bouth mesument systems)
+    precision = D('0.01')
+
     def __init__(self, xmin, xmax):
         self.xmin = D(xmin)
         self.xmax = D(xmax)
         self.passes = []
-        # Presission value is about 1/64 inch (the exact 1/64 = 0.0156 so we fine for bouth mesument systems)
-        self.precision = D('0.01')
+
+    def __getstate__(self):
+        return {'xmin': self.xmin, 'xmax': self.xmax, 'passes': self.passes}
+
+    def __setstate__(self, state):
+        # cuts pickled before __slots__ also stored the precision
+        self.xmin = state['xmin']
+        self.xmax = state['xmax']
+        self.passes = state.get('passes', [])
 
     def validate(self, bit, board):
         '''
@@ -647,50 +823,394 @@ class Cut(object):
                                        % (self.xmin, self.xmax, p, bit.width_f))
 
 
-def adjoining_cuts(cuts, bit, board):
+class Cut_Set(object):
     '''
-    Given the cuts on an edge, computes the cuts on the adjoining edge.
+    An immutable, compact copy of a list of Cuts, for holding many joints
+    (such as the cached frames of the spacing sliders).
 
-    cuts: An array of Cut objects
-    bit: A Router_Bit object
-    board: A Board object
+    The xmin and xmax of the cuts are stored in integer arrays of ticks (see
+    fixed_point.py), or as tuples of Decimals if any is not representable in
+    ticks.  The passes of all of the cuts are stored in one integer array,
+    where the passes of cut i are passes[offsets[i]:offsets[i+1]].
 
-    Returns an array of Cut objects
+    Indexing returns a new Cut, and slicing a new Cut_Set, so that the
+    stored values cannot change.
+    '''
+    __slots__ = ('xmin', 'xmax', 'offsets', 'passes', 'ticks')
+
+    def __init__(self, cuts=()):
+        self.offsets = array('q', [0])
+        self.passes = array('q')
+        for c in cuts:
+            self.passes.extend(c.passes)
+            self.offsets.append(len(self.passes))
+        try:
+            self.xmin = array('q', [fixed_point.to_ticks(c.xmin) for c in cuts])
+            self.xmax = array('q', [fixed_point.to_ticks(c.xmax) for c in cuts])
+            self.ticks = True
+        except (fixed_point.Fixed_Point_Exception, OverflowError):
+            self.xmin = tuple(c.xmin for c in cuts)
+            self.xmax = tuple(c.xmax for c in cuts)
+            self.ticks = False
+
+    def __len__(self):
+        return len(self.xmin)
+
+    def _value(self, v):
+        if self.ticks:
+            return fixed_point.from_ticks(v)
+        return v
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            (start, stop, step) = i.indices(len(self))
+            if step != 1:
+                return Cut_Set([self[j] for j in range(start, stop, step)])
+            stop = max(start, stop)
+            result = Cut_Set()
+            result.xmin = self.xmin[start:stop]
+            result.xmax = self.xmax[start:stop]
+            result.ticks = self.ticks
+            p0 = self.offsets[start]
+            result.passes = self.passes[p0:self.offsets[stop]]
+            result.offsets = array('q', [o - p0 for o in self.offsets[start:stop + 1]])
+            return result
+        if i < 0:
+            i += len(self)
+        if i < 0 or i >= len(self):
+            raise IndexError('Cut_Set index out of range')
+        c = Cut(self._value(self.xmin[i]), self._value(self.xmax[i]))
+        c.passes = self.passes[self.offsets[i]:self.offsets[i + 1]].tolist()
+        return c
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def __eq__(self, other):
+        if not isinstance(other, Cut_Set):
+            return NotImplemented
+        if self.ticks != other.ticks:
+            return self.cuts_values() == other.cuts_values()
+        return self.xmin == other.xmin and self.xmax == other.xmax and \
+            self.offsets == other.offsets and self.passes == other.passes
+
+    def __ne__(self, other):
+        eq = self.__eq__(other)
+        if eq is NotImplemented:
+            return eq
+        return not eq
+
+    __hash__ = None
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __getstate__(self):
+        return (self.xmin, self.xmax, self.offsets, self.passes, self.ticks)
+
+    def __setstate__(self, state):
+        (self.xmin, self.xmax, self.offsets, self.passes, self.ticks) = state
+
+    def cuts_values(self):
+        '''
+        Returns the list of (xmin, xmax, passes) of each cut.
+        '''
+        return [(c.xmin, c.xmax, c.passes) for c in self]
+
+    def cuts(self):
+        '''
+        Returns a new list of the Cuts.
+        '''
+        return list(self)
+
+    def nbytes(self):
+        '''
+        Returns the approximate memory used, in bytes.
+        '''
+        n = sys.getsizeof(self) + sys.getsizeof(self.offsets) + sys.getsizeof(self.passes)
+        for v in [self.xmin, self.xmax]:
+            n += sys.getsizeof(v)
+            if not self.ticks:
+                n += sum(sys.getsizeof(x) for x in v)
+        return n
+
+
+def _cuts_to_ticks(cuts):
+    '''
+    Converts the Cut objects cuts to a list of (xmin, xmax) in ticks.  Raises
+    fixed_point.Fixed_Point_Exception if any value is not representable.
+    '''
+    return [(fixed_point.to_ticks(c.xmin), fixed_point.to_ticks(c.xmax)) for c in cuts]
+
+
+def make_router_passes(cuts, bit, board):
+    '''
+    Computes the router passes of each Cut in cuts, using the current
+    geometry kernel.
     '''
+    if geometry_kernel != 'decimal':
+        try:
+            bt = fixed_point.bit_ticks(bit)
+            width = fixed_point.to_ticks(board.width)
+            fixed_point.check_magnitude(width + bt.width)
+            tcuts = _cuts_to_ticks(cuts)
+        except fixed_point.Fixed_Point_Exception:
+            pass
+        else:
+            if geometry_kernel == 'vector' and len(cuts) >= VECTOR_MIN_CUTS:
+                _plan_router_passes(cuts, tcuts, width, bit, board, bt)
+                return
+            for (c, (xmin, xmax)) in zip(cuts, tcuts):
+                passes = fixed_point.router_passes(xmin, xmax, width, bt)
+                if passes is None:
+                    # let the Decimal computation raise the error
+                    c.make_router_passes(bit, board)
+                else:
+                    c.passes = passes
+            return
+    for c in cuts:
+        c.make_router_passes(bit, board)
 
+
+class Pass_Cache(object):
+    '''
+    Remembers the router passes of the cuts last computed on an edge.  When
+    the cuts are recomputed after an edit, the cuts that the edit did not
+    touch have the same xmin and xmax as before, and reuse their passes, so
+    that only the touched cuts are passed to make_router_passes().
+
+    Attributes:
+
+    hits: Number of cuts whose passes were reused
+    misses: Number of cuts whose passes were computed
+    '''
+    def __init__(self):
+        self.key = None
+        self.passes = {}
+        self.hits = 0
+        self.misses = 0
+
+    def clear(self):
+        '''Forgets all of the passes'''
+        self.key = None
+        self.passes = {}
+
+    def copy(self):
+        '''Returns a copy, which remembers the same passes'''
+        c = Pass_Cache()
+        c.key = self.key
+        c.passes = self.passes.copy()
+        c.hits = self.hits
+        c.misses = self.misses
+        return c
+
+    def make_router_passes(self, cuts, bit, board):
+        '''
+        Sets the router passes of each Cut in cuts, as make_router_passes().
+        '''
+        # The passes of a cut depend only on the cut, these values, and the
+        # kernel (through its fallbacks).
+        key = (bit.width_f, bit.midline, bit.bit_gentle, board.width, geometry_kernel)
+        if key != self.key:
+            self.passes = {}
+        todo = []
+        for c in cuts:
+            p = self.passes.get((c.xmin, c.xmax))
+            if p is None:
+                todo.append(c)
+            else:
+                c.passes = p[:]
+        make_router_passes(todo, bit, board)
+        self.hits += len(cuts) - len(todo)
+        self.misses += len(todo)
+        self.key = key
+        self.passes = {}
+        for c in cuts:
+            self.passes[(c.xmin, c.xmax)] = c.passes[:]
+
+
+def _plan_router_passes(cuts, tcuts, width, bit, board, bt):
+    '''
+    Sets the router passes of each Cut in cuts using the vectorized planner.
+    tcuts are the cuts in ticks and width the board width in ticks.
+    '''
+    (xmin, xmax) = zip(*tcuts)
+    (offsets, values, valid) = pass_planner.plan_passes(xmin, xmax, width, bt)
+    offsets = offsets.tolist()
+    values = values.tolist()
+    for (i, c) in enumerate(cuts):
+        if valid[i]:
+            c.passes = values[offsets[i]:offsets[i + 1]]
+        else:
+            # let the Decimal computation raise the error
+            c.make_router_passes(bit, board)
+
+
+class Span_Cache(object):
+    '''
+    Remembers the values computed from the cuts last computed on an edge,
+    such as the cuts of the adjoining edge, the caul cuts, and the points of
+    the perimeter.  Value i depends only on the cuts i - reach through i
+    (those that exist), so that there are len(cuts) + reach values.  When
+    the cuts are recomputed after an edit, the cuts that the edit changed
+    are found by comparing with the last cuts from both ends, and only the
+    values that depend on them are computed; the others are reused.
+
+    Attributes:
+
+    hits: Number of values reused
+    misses: Number of values computed
+    '''
+    def __init__(self, reach=0):
+        self.reach = reach
+        self.key = None
+        self.cuts = []
+        self.values = []
+        self.hits = 0
+        self.misses = 0
+
+    def clear(self):
+        '''Forgets all of the values'''
+        self.key = None
+        self.cuts = []
+        self.values = []
+
+    def copy(self):
+        '''Returns a copy, which remembers the same values'''
+        c = Span_Cache(self.reach)
+        c.key = self.key
+        c.cuts = self.cuts
+        c.values = self.values
+        c.hits = self.hits
+        c.misses = self.misses
+        return c
+
+    def get(self, key, cuts, compute):
+        '''
+        Returns the list of the values of the Cuts cuts.  compute(lo, hi)
+        returns the list of values lo through hi - 1.  The values also depend
+        upon key, which is compared with the key of the last cuts.
+        '''
+        new = [(c.xmin, c.xmax) for c in cuts]
+        n = len(new) + self.reach
+        if key != self.key:
+            (lo, old_hi, new_hi) = (0, len(self.values), n)
+        elif new == self.cuts:
+            self.hits += n
+            return self.values
+        else:
+            old = self.cuts
+            m = min(len(old), len(new))
+            lo = 0
+            while lo < m and old[lo] == new[lo]:
+                lo += 1
+            same = 0
+            while same < m - lo and old[-1 - same] == new[-1 - same]:
+                same += 1
+            # the values from the changed cuts through reach cuts after them
+            old_hi = len(old) - same + self.reach
+            new_hi = len(new) - same + self.reach
+        self.values = self.values[:lo] + compute(lo, new_hi) + self.values[old_hi:]
+        self.misses += new_hi - lo
+        self.hits += n - (new_hi - lo)
+        self.key = key
+        self.cuts = new
+        return self.values
+
+
+def adjoining_slot(prev, cut, bit, board):
+    '''
+    Returns the tuple of the (xmin, xmax) of the cut on the adjoining edge
+    between the Cuts prev and cut, which is empty if there is none.  prev is
+    None left of the first cut, and cut is None right of the last cut.
+    '''
     q_prec =D('0.0001')
-    nc = len(cuts)
     offset = bit.width_f-bit.midline
-    adjCuts = []
 
     # if the left-most input cut does not include the left edge, add an
     # adjoining cut that includes the left edge
-    if cuts[0].xmin > 0:
-        left = 0
-        right = cuts[0].xmin + offset - board.dheight
-        if right - left >= board.dheight:
-            adjCuts.append(Cut(left, right.quantize(q_prec)))
-
-    # loop through the input cuts and form an adjoining cut, formed
-    # by looking where the previous cut ended and the current cut starts
-    for i in range(1, nc):
-        left = cuts[i-1].xmax - offset + board.dheight
-        right = cuts[i].xmin + offset - board.dheight
-        adjCuts.append(Cut(max(0, left), min(board.width, right)))
+    if prev is None:
+        if cut.xmin > 0:
+            left = 0
+            right = cut.xmin + offset - board.dheight
+            if right - left >= board.dheight:
+                return ((left, right.quantize(q_prec)),)
+        return ()
 
     # if the right-most input cut does not include the right edge, add an
     # adjoining cut that includes this edge
-    if cuts[-1].xmax < board.width:
-        left = cuts[-1].xmax - offset + board.dheight
+    if cut is None:
+        if prev.xmax < board.width:
+            left = prev.xmax - offset + board.dheight
+
+            right = D(board.width)
+
+            if right - left >= board.dheight:
+                return ((max(0, left), min(board.width, right)),)
+        return ()
+
+    # form an adjoining cut, formed by looking where the previous cut ended
+    # and the current cut starts
+    left = prev.xmax - offset + board.dheight
+    right = cut.xmin + offset - board.dheight
+    return ((max(0, left), min(board.width, right)),)
+
+
+def adjoining_slots(cuts, bit, board, lo, hi):
+    '''
+    Returns the list of adjoining_slot() between each pair of consecutive
+    cuts, from the pair (cuts[lo - 1], cuts[lo]) through (cuts[hi - 2],
+    cuts[hi - 1]), where cuts[-1] and cuts[len(cuts)] are None.
+    '''
+    n = len(cuts)
+    if geometry_kernel != 'decimal':
+        try:
+            bt = fixed_point.bit_ticks(bit)
+            width = fixed_point.to_ticks(board.width)
+            fixed_point.check_magnitude(width + bt.width)
+            dheight = fixed_point.to_ticks(board.dheight)
+            a = max(0, lo - 1)
+            tcuts = [None] * a + _cuts_to_ticks(cuts[a:min(hi, n)])
+        except fixed_point.Fixed_Point_Exception:
+            pass
+        else:
+            slots = []
+            for i in range(lo, hi):
+                prev = tcuts[i - 1] if i > 0 else None
+                cut = tcuts[i] if i < n else None
+                slots.append(tuple((fixed_point.from_ticks(xmin), fixed_point.from_ticks(xmax))
+                                   for (xmin, xmax) in
+                                   fixed_point.adjoining_slot(prev, cut, bt, width, dheight)))
+            return slots
+    return [adjoining_slot(cuts[i - 1] if i > 0 else None, cuts[i] if i < n else None,
+                           bit, board) for i in range(lo, hi)]
+
+
+def adjoining_cuts(cuts, bit, board, cache=None):
+    '''
+    Given the cuts on an edge, computes the cuts on the adjoining edge.
 
-        right = D(board.width)
+    cuts: An array of Cut objects
+    bit: A Router_Bit object
+    board: A Board object
+    cache: If a Span_Cache, only the adjoining cuts next to the cuts changed
+           since its last cuts are computed
 
-        if right - left >= board.dheight:
-            adjCuts.append(Cut(max(0, left), min(board.width, right)))
+    Returns an array of Cut objects
+    '''
+    def compute(lo, hi):
+        return adjoining_slots(cuts, bit, board, lo, hi)
 
-    # print('adjoining_cuts cuts:')
-    # dump_cuts(adjCuts)
-    return adjCuts
+    if cache is None:
+        slots = compute(0, len(cuts) + 1)
+    else:
+        key = (bit.width_f, bit.midline, board.width, board.dheight, geometry_kernel)
+        slots = cache.get(key, cuts, compute)
+    return [Cut(xmin, xmax) for slot in slots for (xmin, xmax) in slot]
 
 
 def caul_cuts(cuts, bit, board, trim):
@@ -704,19 +1224,20 @@ def caul_cuts(cuts, bit, board, trim):
 
     Returns an array of Cut objects
     '''
-    new_cuts = []
-    for c in cuts:
-        xmin = max(0, c.xmin - trim)
-        xmax = min(board.width, c.xmax + trim)
-        cut = Cut(xmin, xmax)
-        cut.make_router_passes(bit, board)
-        new_cuts.append(cut)
+    def compute(lo, hi):
+        return [(max(0, c.xmin - trim), min(board.width, c.xmax + trim))
+                for c in cuts[lo:hi]]
+
+    limits = board.span_caches['caul'].get((trim, board.width), cuts, compute)
+    new_cuts = [Cut(xmin, xmax) for (xmin, xmax) in limits]
+    board.pass_caches['caul'].make_router_passes(new_cuts, bit, board)
     return new_cuts
 
 
 def cut_boards(boards, bit, spacing):
     '''
-    Determines the cuts for each board for the given bit and spacing
+    Determines the cuts for each board for the given bit and spacing.  Only
+    the cuts adjoining the A-cuts changed since the last call are computed.
     '''
     # determine all the cuts from the A-cuts (index 0) on the top board.
     last = spacing.cuts
@@ -724,26 +1245,45 @@ def cut_boards(boards, bit, spacing):
 
     if boards[3].active:
         # double-double case
-        top = adjoining_cuts(last, bit, boards[0])
+        top = adjoining_cuts(last, bit, boards[0], boards[3].span_caches['top'])
         boards[3].set_top_cuts(top, bit)
-        last = adjoining_cuts(top, bit, boards[3])
+        last = adjoining_cuts(top, bit, boards[3], boards[3].span_caches['bottom'])
         boards[3].set_bottom_cuts(last, bit)
     if boards[2].active:
         # double and double-double
-        top = adjoining_cuts(last, bit, boards[0])
+        top = adjoining_cuts(last, bit, boards[0], boards[2].span_caches['top'])
         boards[2].set_top_cuts(top, bit)
-        last = adjoining_cuts(top, bit, boards[2])
+        last = adjoining_cuts(top, bit, boards[2], boards[2].span_caches['bottom'])
         boards[2].set_bottom_cuts(last, bit)
 
     # make the top cuts on the bottom board
-    top = adjoining_cuts(last, bit, boards[1])
+    top = adjoining_cuts(last, bit, boards[1], boards[1].span_caches['top'])
     boards[1].set_top_cuts(top, bit)
 
 
 class Joint_Geometry(object):
     '''
     Computes and stores all of the geometry attributes of the joint.
+
+    Each product of the geometry is computed on its first access, and then
+    kept until invalidate():
+
+    board_cuts: The cuts and router passes of every board, from cut_boards()
+    layout: The template rectangles (rect_T, board_T, rect_TDD, board_TDD,
+            rect_caul, board_caul) and the board origins
+    cauls: The caul cuts (caul_top, caul_bottom), which need board_cuts
+    fit: The maximum gap and overlap (max_gap, max_overlap)
+    pass_order: The pass_order.Pass_Order of the cut edges, which needs
+                board_cuts.  Optimized if config.optimize_pass_order.
+
+    compute() computes the products up front, so that any Router_Exception is
+    raised there.
     '''
+    PRODUCTS = ['board_cuts', 'layout', 'cauls', 'fit', 'pass_order']
+
+    # The products computed from each product
+    DEPENDENTS = {'board_cuts': ['cauls', 'pass_order']}
+
     def __init__(self, template, boards, bit, spacing, margins, config):
         if config.debug:
             print('construct Joint_Geometry')
@@ -752,80 +1292,212 @@ class Joint_Geometry(object):
         self.bit = bit
         self.spacing = spacing
         self.margins = margins
+        self.config = config
+        self.products = {}
 
-        cut_boards(boards, bit, spacing)
+    def compute(self, *products):
+        '''
+        Computes the given products, or all of them if none are given.
+        Returns this Joint_Geometry.
+        '''
+        for p in products or self.PRODUCTS:
+            self.get(p)
+        return self
+
+    def get(self, product):
+        '''
+        Returns the product, computing it if needed.
+        '''
+        if product not in self.products:
+            if self.config.debug:
+                print('compute Joint_Geometry', product)
+            self.products[product] = getattr(self, '_compute_' + product)()
+        return self.products[product]
+
+    def invalidate(self, *products):
+        '''
+        Discards the given products, or all of them if none are given, and
+        the products computed from them, so that they are recomputed on
+        their next access.
+        '''
+        products = list(products or self.PRODUCTS)
+        while products:
+            p = products.pop()
+            self.products.pop(p, None)
+            products.extend(self.DEPENDENTS.get(p, []))
+
+    def use_board_cuts(self):
+        '''
+        Takes the cuts already set on the boards, such as from a cache, as
+        the board_cuts product, instead of cutting the boards.  Returns this
+        Joint_Geometry.
+        '''
+        self.invalidate('board_cuts')
+        self.products['board_cuts'] = [(b.bottom_cuts, b.top_cuts) for b in self.boards]
+        return self
+
+    def _compute_board_cuts(self):
+        '''
+        Cuts the boards.  Returns the (bottom_cuts, top_cuts) of each board.
+        '''
+        cut_boards(self.boards, self.bit, self.spacing)
+        return [(b.bottom_cuts, b.top_cuts) for b in self.boards]
+
+    def _compute_layout(self):
+        '''
+        Sets the board origins.  Returns the dictionary of the template
+        rectangles.
+        '''
+        template = self.template
+        margins = self.margins
+        boards = self.boards
+        r = {}
 
         board_sep = margins.sep
-        if config.show_fit:
-            board_sep = -bit.depth
+        if self.config.show_fit:
+            board_sep = -self.bit.depth
 
         # Create the corners of the template
-        self.rect_T = My_Rectangle(margins.left, margins.bottom,
+        r['rect_T'] = My_Rectangle(margins.left, margins.bottom,
                                    template.length, template.height)
 
         # The sub-rectangle in the template of the board's width
         # (no template margins)
-        self.board_T = My_Rectangle(self.rect_T.xL() + template.margin, self.rect_T.yB(),
+        r['board_T'] = My_Rectangle(r['rect_T'].xL() + template.margin, r['rect_T'].yB(),
                                     boards[0].width, template.height)
-        x = self.board_T.xL()
-        y = self.rect_T.yT() + margins.sep
+        x = r['board_T'].xL()
+        y = r['rect_T'].yT() + margins.sep
 
         # Set bottom board origin
-        self.boards[1].set_origin(x, y)
-        y = self.boards[1].yT() + board_sep
+        boards[1].set_origin(x, y)
+        y = boards[1].yT() + board_sep
 
         # Set double and double-double origins
-        if self.boards[2].active:
-            self.boards[2].set_origin(x, y)
-            y = self.boards[2].yT() + board_sep
-            if self.boards[3].active:
-                self.boards[3].set_origin(x, y)
-                y = self.boards[3].yT() + board_sep
+        if boards[2].active:
+            boards[2].set_origin(x, y)
+            y = boards[2].yT() + board_sep
+            if boards[3].active:
+                boards[3].set_origin(x, y)
+                y = boards[3].yT() + board_sep
 
         # Set top board origin
-        self.boards[0].set_origin(x, y)
-        y = self.boards[0].yT() + margins.sep
+        boards[0].set_origin(x, y)
+        y = boards[0].yT() + margins.sep
 
         # Template stuff for double-double cases
-        if self.boards[3].active:
-            self.rect_TDD = My_Rectangle(margins.left, y,
+        if boards[3].active:
+            r['rect_TDD'] = My_Rectangle(margins.left, y,
                                          template.length, template.height)
-            self.board_TDD = My_Rectangle(self.rect_TDD.xL() + template.margin, y,
+            r['board_TDD'] = My_Rectangle(r['rect_TDD'].xL() + template.margin, y,
                                           boards[0].width, template.height)
-            y = self.board_TDD.yT() + margins.sep
+            y = r['board_TDD'].yT() + margins.sep
         else:
-            self.rect_TDD = None
-            self.board_TDD = None
+            r['rect_TDD'] = None
+            r['board_TDD'] = None
 
         # Caul template
-        if config.show_caul:
-            caul_trim = max(1, bit.units.abstract_to_increments(config.caul_trim))
-            self.rect_caul = My_Rectangle(margins.left, y,
+        if self.config.show_caul:
+            r['rect_caul'] = My_Rectangle(margins.left, y,
                                           template.length, template.height)
-            self.board_caul = My_Rectangle(self.rect_caul.xL() + template.margin, y,
+            r['board_caul'] = My_Rectangle(r['rect_caul'].xL() + template.margin, y,
                                            boards[0].width, template.height)
-            self.caul_top = caul_cuts(self.boards[0].bottom_cuts, bit, boards[0], caul_trim)
-            self.caul_bottom = caul_cuts(self.boards[1].top_cuts, bit, boards[1], caul_trim)
         else:
-            self.rect_caul = None
-            self.board_caul = None
-            self.caul_top = None
-            self.caul_bottom = None
+            r['rect_caul'] = None
+            r['board_caul'] = None
+        return r
 
-        self.compute_fit()
-
-    def compute_fit(self):
+    def _compute_cauls(self):
+        '''
+        Returns the (top, bottom) caul cuts, or (None, None) if the cauls
+        are not shown.
+        '''
+        if not self.config.show_caul:
+            return (None, None)
+        self.get('board_cuts')
+        caul_trim = max(1, self.bit.units.abstract_to_increments(self.config.caul_trim))
+        top = caul_cuts(self.boards[0].bottom_cuts, self.bit, self.boards[0], caul_trim)
+        bottom = caul_cuts(self.boards[1].top_cuts, self.bit, self.boards[1], caul_trim)
+        return (top, bottom)
+
+    def _compute_fit(self):
         '''
-        Sets the maximum gap and overlap over all joints.
+        Returns the maximum (gap, overlap) over all joints.
         '''
         # The gap is same around allof joints:
-        self.max_gap = 0
-        self.max_overlap = 0
-
         if self.bit.gap > 0:
-            self.max_gap = self.bit.gap
-        else:
-            self.max_overlap = -self.bit.gap
+            return (self.bit.gap, 0)
+        return (0, -self.bit.gap)
+
+    def _compute_pass_order(self):
+        '''
+        Returns the Pass_Order of the cut edges.
+        '''
+        self.get('board_cuts')
+        (all_cuts, labels) = utils.cut_edges(self.boards)
+        if self.config.optimize_pass_order:
+            cost = pass_order.REVERSAL_INCHES * self.bit.units.increments_per_inch
+            return pass_order.optimize(all_cuts, labels, cost)
+        return pass_order.table_order(all_cuts, labels)
+
+    @property
+    def board_cuts(self):
+        '''The (bottom_cuts, top_cuts) of each board'''
+        return self.get('board_cuts')
+
+    @property
+    def rect_T(self):
+        '''The template rectangle'''
+        return self.get('layout')['rect_T']
+
+    @property
+    def board_T(self):
+        '''The board's width in the template'''
+        return self.get('layout')['board_T']
+
+    @property
+    def rect_TDD(self):
+        '''The double-double template rectangle, or None'''
+        return self.get('layout')['rect_TDD']
+
+    @property
+    def board_TDD(self):
+        '''The board's width in the double-double template, or None'''
+        return self.get('layout')['board_TDD']
+
+    @property
+    def rect_caul(self):
+        '''The caul template rectangle, or None'''
+        return self.get('layout')['rect_caul']
+
+    @property
+    def board_caul(self):
+        '''The board's width in the caul template, or None'''
+        return self.get('layout')['board_caul']
+
+    @property
+    def caul_top(self):
+        '''The caul cuts of the top board, or None'''
+        return self.get('cauls')[0]
+
+    @property
+    def caul_bottom(self):
+        '''The caul cuts of the bottom board, or None'''
+        return self.get('cauls')[1]
+
+    @property
+    def max_gap(self):
+        '''The maximum gap of the joint'''
+        return self.get('fit')[0]
+
+    @property
+    def max_overlap(self):
+        '''The maximum overlap of the joint'''
+        return self.get('fit')[1]
+
+    @property
+    def pass_order(self):
+        '''The Pass_Order of the cut edges'''
+        return self.get('pass_order')
 
 
 def create_title(boards, bit, spacing):
@@ -0,0 +1,964 @@
+###########################################################################
+#
+# Copyright 2015-2018 Robert B. Lowrie (http://github.com/lowrie)
+#
+# This file is part of pyRouterJig.
+#
+# pyRouterJig is free software: you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# pyRouterJig is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR
+# A PARTICULAR PURPOSE.  See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along with
+# pyRouterJig; see the file LICENSE. If not, see <http://www.gnu.org/licenses/>.
+#
+###########################################################################
+
+'''
+Tests for the geometry in router, which do not require Qt.
+'''
+
+import copy
+import io
+import itertools
+import json
+import math
+import os
+import pickle
+import random
+import shutil
+import struct
+import tempfile
+import unittest
+import zlib
+from collections import Counter
+from decimal import Decimal as D
+from decimal import getcontext, setcontext
+from unittest import mock
+
+import config_file
+import engine
+import fixed_point
+import joint_index
+import pass_order
+import pass_planner
+import router
+import serialize
+import spacing
+import threeDS
+import utils
+
+
+class Case(object):
+    def __init__(self, metric, width, depth, angle, board_width, dheights=()):
+        self.metric = metric
+        self.width = width
+        self.depth = depth
+        self.angle = angle
+        self.board_width = board_width
+        self.dheights = dheights
+
+
+# Regression corpus of bits and boards, as strings in the units of each case
+cases = []
+for (w, d, a) in [('1/2', '3/4', 0), ('3/4', '1/2', 0), ('1/4', '1/4', 0),
+                  ('3/4', '3/4', 7), ('5/8', '1/2', 7), ('1/2', '3/8', 14),
+                  ('1/2', '1/2', 10), ('5/16', '3/16', 9), ('1/4', '1/4', 7.5)]:
+    for bw in ['7 1/2', '4 1/4', '12', '23 5/8']:
+        cases.append(Case(False, w, d, a, bw))
+    if a == 0:
+        cases.append(Case(False, w, d, a, '7 1/2', ('1/8',)))
+        cases.append(Case(False, w, d, a, '10', ('1/8', '3/16')))
+for (w, d, a) in [('12', '12', 0), ('6', '10', 0), ('1/2', '6.82', 14), ('5/8', '15', 7)]:
+    for bw in ['200', '97', '450']:
+        cases.append(Case(True, w, d, a, bw))
+
+
+def make_joint(case):
+    '''
+    Returns (bit, boards, config) for the case.
+    '''
+    config = config_file.default_config(case.metric)
+    units = utils.Units(config.english_separator, case.metric, config.num_increments)
+    bit = router.Router_Bit(units, 2, 2)
+    bit.set_angle_from_string(str(case.angle))
+    bit.set_width_from_string(case.width)
+    bit.set_depth_from_string(case.depth)
+    boards = [router.Board(bit, 10) for _ in range(4)]
+    boards[0].set_width_from_string(case.board_width)
+    for b in boards:
+        b.width = boards[0].width
+    for b in boards[2:]:
+        b.set_active(False)
+    for (i, dh) in enumerate(case.dheights):
+        boards[i + 2].set_active(True)
+        boards[i + 2].set_height_from_string(bit, dh)
+    return (bit, boards, config)
+
+
+def spacings(bit, boards, config):
+    '''
+    Yields the spacings of the corpus for the bit and boards.
+    '''
+    sp = spacing.Equally_Spaced(bit, boards, config)
+    for (s, centered) in [(0, True), (3, True), (0, False), (5, False)]:
+        sp.params['Spacing'].v = s
+        sp.params['Centered'].v = centered
+        try:
+            sp.set_cuts()
+        except spacing.Spacing_Exception:
+            continue
+        yield sp
+    if spacing.Variable_Spaced.is_board_width_ok(bit, boards):
+        sp = spacing.Variable_Spaced(bit, boards, config)
+        p = sp.params['Fingers']
+        for n in range(p.vMin, p.vMax + 1):
+            sp.params['Fingers'].v = n
+            sp.calc_var_params()
+            sp.set_cuts()
+            yield sp
+
+
+def joint_state(boards, geom):
+    '''
+    Returns the cuts, passes and perimeters of every board, as values.
+    '''
+    state = []
+    for b in boards:
+        for cuts in [b.bottom_cuts, b.top_cuts]:
+            if cuts is not None:
+                state.append([(c.xmin, c.xmax, list(c.passes)) for c in cuts])
+        if b.active:
+            state.append(b.perimeter(geom.bit))
+    for cuts in [geom.caul_top, geom.caul_bottom]:
+        state.append([(c.xmin, c.xmax, list(c.passes)) for c in cuts])
+    return state
+
+
+def compute(bit, boards, sp, config, kernel):
+    '''
+    Computes the joint geometry with the given kernel, returning its state
+    or the message of the exception raised.
+    '''
+    router.set_geometry_kernel(kernel)
+    try:
+        template = router.Incra_Template(bit.units, boards)
+        margins = utils.Margins(8)
+        geom = router.Joint_Geometry(template, boards, bit, sp, margins, config).compute()
+        return joint_state(boards, geom)
+    except router.Router_Exception as e:
+        return e.msg
+    finally:
+        router.set_geometry_kernel('decimal')
+
+
+class Decimal_Test(unittest.TestCase):
+    '''
+    Base of the tests that compute in the Decimal context of
+    utils.decimal_context(), as the application does.
+    '''
+    def setUp(self):
+        self.context = getcontext()
+        setcontext(utils.decimal_context())
+
+    def tearDown(self):
+        setcontext(self.context)
+
+
+class Kernel_Test(Decimal_Test):
+    '''
+    Tests that the other kernels reproduce the Decimal kernel.
+    '''
+    def test_to_ticks(self):
+        for v in [0, 7, D('12.5'), D('-0.0125'), D('1.30000'), 2.75]:
+            self.assertEqual(fixed_point.from_ticks(fixed_point.to_ticks(v)), v)
+        self.assertRaises(fixed_point.Fixed_Point_Exception, fixed_point.to_ticks,
+                          D('0.00001'))
+        self.assertEqual(fixed_point.math_round(-25000), utils.math_round(D('-2.5')))
+        self.assertEqual(fixed_point.math_round(25000), utils.math_round(D('2.5')))
+
+    def test_corpus(self):
+        # plan every edge with the vectorized planner, however few its cuts
+        min_cuts = router.VECTOR_MIN_CUTS
+        router.VECTOR_MIN_CUTS = 1
+        self.addCleanup(setattr, router, 'VECTOR_MIN_CUTS', min_cuts)
+        njoints = 0
+        for case in cases:
+            (bit, boards, config) = make_joint(case)
+            config.show_caul = True
+            for sp in spacings(bit, boards, config):
+                expected = compute(bit, boards, sp, config, 'decimal')
+                for kernel in router.GEOMETRY_KERNELS[1:]:
+                    actual = compute(bit, boards, sp, config, kernel)
+                    self.assertEqual(expected, actual, '%s %s %s %s %s: %s' %
+                                     (kernel, case.width, case.depth, case.angle,
+                                      case.board_width, sp.description))
+                njoints += 1
+        self.assertTrue(njoints > 100)
+
+    @unittest.skipUnless(pass_planner.AVAILABLE, 'requires numpy')
+    def test_planner_sweep(self):
+        # plan a sweep of single cuts over boards of many widths in one call,
+        # and compare with planning each cut alone
+        (bit, _, _) = make_joint(cases[0])
+        bt = fixed_point.bit_ticks(bit)
+        xmin = []
+        xmax = []
+        widths = []
+        for w in range(40, 120):
+            for (a, b) in [(0, 8), (0, 11), (13, 21), (20, w), (w - 9, w), (3, 5)]:
+                xmin.append(a * fixed_point.SCALE)
+                xmax.append(b * fixed_point.SCALE)
+                widths.append(w * fixed_point.SCALE)
+        (offsets, values, valid) = pass_planner.plan_passes(xmin, xmax, widths, bt)
+        self.assertEqual(len(offsets), len(xmin) + 1)
+        for i in range(len(xmin)):
+            passes = fixed_point.router_passes(xmin[i], xmax[i], widths[i], bt)
+            if passes is None:
+                self.assertFalse(valid[i])
+            else:
+                self.assertTrue(valid[i])
+                self.assertEqual(passes, values[offsets[i]:offsets[i + 1]].tolist())
+
+
+class Bit_Geometry_Test(Decimal_Test):
+    '''
+    Tests the shared bit geometry records.
+    '''
+    def setUp(self):
+        Decimal_Test.setUp(self)
+        router.clear_bit_geometry_cache()
+
+    def test_shared(self):
+        units = utils.Units('-', False, 32)
+        bit = router.Router_Bit(units, 16, 24.0, 7)
+        self.assertEqual(router.bit_geometry_cache_info().misses, 1)
+        self.assertEqual((bit.midline, bit.gap), (D('13'), D('0.053170')))
+        # identical bits, and a bit changed back, share the record
+        bit2 = router.Router_Bit(units, 16, 24.0, 7)
+        self.assertTrue(bit2.geometry is bit.geometry)
+        bit2.set_depth_from_string('1/2')
+        self.assertTrue(bit2.geometry is not bit.geometry)
+        bit2.set_depth_from_string('3/4')
+        self.assertTrue(bit2.geometry is bit.geometry)
+        info = router.bit_geometry_cache_info()
+        self.assertEqual((info.hits, info.misses), (2, 2))
+        # the units are part of the key
+        metric = router.Router_Bit(utils.Units('-', True, 1), 16, 24.0, 7)
+        self.assertTrue(metric.geometry is not bit.geometry)
+        self.assertRaises(AttributeError, setattr, bit.geometry, 'midline', D('12'))
+        self.assertEqual(copy.deepcopy(bit).midline, bit.midline)
+
+
+class Lazy_Geometry_Test(Decimal_Test):
+    '''
+    Tests that Joint_Geometry computes only the products accessed.
+    '''
+    def test_lazy(self):
+        spec = engine.Joint_Spec(board_width=12, bit_width='1/2', bit_angle=7,
+                                 double_thicknesses=['1/8'], config={'show_caul': True})
+        (config, bit, boards, sp) = engine.make_joint(spec)
+        template = router.Incra_Template(bit.units, boards)
+        geom = router.Joint_Geometry(template, boards, bit, sp, utils.Margins(8), config)
+        caches = [c for b in boards for c in b.pass_caches.values()]
+        self.assertEqual(geom.max_gap, bit.gap)
+        self.assertEqual(geom.max_overlap, 0)
+        self.assertEqual(boards[0].bottom_cuts, None)
+        self.assertEqual(sum(c.misses for c in caches), 0)
+        # the cauls cut the boards, but do not lay them out
+        self.assertEqual(len(geom.caul_top), len(sp.cuts))
+        self.assertEqual(sorted(geom.products), ['board_cuts', 'cauls', 'fit'])
+        self.assertTrue(geom.board_cuts[0][0] is boards[0].bottom_cuts)
+        self.assertTrue(geom.rect_caul is not None)
+        self.assertEqual(geom.board_T.xL(), boards[0].xL())
+        # invalidating the cuts invalidates the cauls
+        caul_top = geom.caul_top
+        geom.invalidate('board_cuts')
+        self.assertEqual(sorted(geom.products), ['fit', 'layout'])
+        self.assertTrue(geom.caul_top is not caul_top)
+        geom.invalidate()
+        self.assertEqual(geom.products, {})
+        self.assertTrue(geom.compute() is geom)
+        self.assertEqual(sorted(geom.products), sorted(router.Joint_Geometry.PRODUCTS))
+
+
+class Triangulate_Test(Decimal_Test):
+    '''
+    Tests the triangulation of the boards and the 3DS export.
+    '''
+    def check(self, board, bit):
+        '''
+        Checks that the triangulation of board covers its perimeter with
+        counterclockwise triangles and no cracks.
+        '''
+        (v, t) = board.triangulate(bit)
+        n = len(v) // 2
+        self.assertEqual(len(t), 3 * (n - 2))
+        area = 0
+        for i in range(n):
+            j = (i + 1) % n
+            area += v[2 * j] * v[2 * i + 1] - v[2 * i] * v[2 * j + 1]
+        edges = Counter()
+        for k in range(0, len(t), 3):
+            (a, b, c) = t[k:k + 3]
+            ta = (v[2 * b] - v[2 * a]) * (v[2 * c + 1] - v[2 * a + 1]) - \
+                 (v[2 * c] - v[2 * a]) * (v[2 * b + 1] - v[2 * a + 1])
+            self.assertTrue(ta > 0)
+            area -= ta
+            for e in [(a, b), (b, c), (c, a)]:
+                edges[tuple(sorted(e))] += 1
+        self.assertAlmostEqual(area, 0)
+        boundary = set(tuple(sorted((i, (i + 1) % n))) for i in range(n))
+        for (e, count) in edges.items():
+            self.assertEqual(count, 1 if e in boundary else 2)
+        self.assertTrue(boundary <= set(edges))
+
+    def test_triangulate(self):
+        for (dt, sp) in [((), 'Equal'), (('1/8',), 'Equal'), (('1/8', '3/16'), 'Variable')]:
+            spec = engine.Joint_Spec(board_width='7 1/2', bit_width='1/2', spacing=sp,
+                                     double_thicknesses=dt)
+            r = engine.compute(spec)
+            for b in r.boards:
+                if b.active:
+                    self.check(b, r.bit)
+        spec = engine.Joint_Spec(board_width='7 1/2', bit_width='1/2', bit_angle=7)
+        r = engine.compute(spec)
+        self.assertFalse(threeDS.is_supported(r.bit, r.boards))
+        self.assertRaises(router.Router_Exception, r.boards[0].triangulate, r.bit)
+
+    def test_3ds(self):
+        spec = engine.Joint_Spec(board_width='7 1/2', bit_width='1/2',
+                                 double_thicknesses=['1/8', '3/16'])
+        r = engine.compute(spec)
+        self.assertTrue(threeDS.is_supported(r.bit, r.boards))
+        tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmpdir)
+        filename = os.path.join(tmpdir, 'joint.3ds')
+        threeDS.joint_to_3ds(filename, r.boards, r.bit, r.spacing)
+        with open(filename, 'rb') as f:
+            data = f.read()
+        self.assertEqual(struct.unpack('<HI', data[:6]), (0x4D4D, len(data)))
+        names = [b'bottom\0', b'double\0', b'double2\0', b'top\0']
+        self.assertEqual(sorted(names), sorted(n for n in names if n in data))
+
+
+class Pass_Order_Test(Decimal_Test):
+    '''
+    Tests the ordering of the router passes.
+    '''
+    def test_optimize(self):
+        spec = engine.Joint_Spec(board_width='7 1/2', bit_width='1/2', spacing='Variable',
+                                 double_thicknesses=['1/8', '3/16'])
+        r = engine.compute(spec)
+        (all_cuts, labels) = utils.cut_edges(r.boards)
+        self.assertFalse(r.geom.pass_order.optimized)
+        for cost in [0, 16, 64]:
+            order = pass_order.optimize(all_cuts, labels, cost)
+            # every pass once, with the passes of each cut from right to left
+            for (cuts, sequence) in zip(all_cuts, order.sequences):
+                self.assertEqual(sorted(sequence),
+                                 sorted((ic, ip) for (ic, c) in enumerate(cuts)
+                                        for ip in range(len(c.passes))))
+                for (s0, s1) in zip(sequence[:-1], sequence[1:]):
+                    if s0[0] == s1[0]:
+                        self.assertEqual(s0[1], s1[1] + 1)
+            # compare with trying every order
+            best = None
+            for edges in itertools.permutations(range(len(all_cuts))):
+                for dirs in itertools.product([False, True], repeat=len(edges)):
+                    o = pass_order.Pass_Order(all_cuts, labels, list(zip(edges, dirs)))
+                    c = o.travel + cost * o.reversals
+                    if best is None or c < best:
+                        best = c
+            self.assertEqual(order.travel + cost * order.reversals, best)
+            self.assertTrue(best < order.table_travel + cost * order.table_reversals)
+
+    def test_table(self):
+        spec = engine.Joint_Spec(board_width=24, bit_width='1/2',
+                                 config={'optimize_pass_order': True})
+        r = engine.compute(spec)
+        order = r.geom.pass_order
+        self.assertTrue(order.optimized)
+        self.assertTrue(order.travel < order.table_travel)
+        self.assertEqual(order.edges, [(1, True), (0, False)])
+        tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmpdir)
+        filename = os.path.join(tmpdir, 'table.txt')
+        r.write_table(filename)
+        with open(filename) as f:
+            lines = f.read().splitlines()
+        # B first, then A, numbered in the order routed
+        nb = sum(len(c.passes) for c in r.boards[1].top_cuts)
+        self.assertEqual(lines[5].split()[0], '1B')
+        self.assertTrue('%dA' % (nb + 1) in lines[5].split())
+        self.assertEqual(lines[-1], order.describe(r.bit.units))
+        self.assertEqual(order.pass_numbers('A', r.boards[0].bottom_cuts)[(0, 0)], nb + 25)
+        # the labels of the caul cuts do not follow the order
+        self.assertEqual(order.pass_numbers('A', r.geom.caul_top), None)
+
+    def test_empty_edge(self):
+        spec = engine.Joint_Spec(board_width=12, bit_width='1/2')
+        r = engine.compute(spec)
+        (all_cuts, labels) = utils.cut_edges(r.boards)
+        all_cuts = [[], all_cuts[0], [router.Cut(0, 0)], all_cuts[1]]
+        order = pass_order.optimize(all_cuts, ['X', 'A', 'Y', 'B'], 16)
+        self.assertEqual([ie for (ie, _) in order.edges[2:]], [0, 2])
+        self.assertEqual(order.sequences[0], [])
+        order = pass_order.optimize([[]], ['X'], 16)
+        self.assertEqual((order.edges, order.travel), ([(0, False)], 0))
+
+
+class Cut_Set_Test(Decimal_Test):
+    '''
+    Tests the compact copies of cuts.
+    '''
+    def values(self, cuts):
+        return [(c.xmin, c.xmax, list(c.passes)) for c in cuts]
+
+    def test_copy(self):
+        spec = engine.Joint_Spec(board_width=12, bit_width='1/2', bit_angle=7,
+                                 spacing='Edit')
+        r = engine.compute(spec)
+        cuts = r.boards[0].bottom_cuts
+        cs = router.Cut_Set(cuts)
+        self.assertTrue(cs.ticks)
+        self.assertEqual(len(cs), len(cuts))
+        self.assertEqual(self.values(cs), self.values(cuts))
+        self.assertEqual(self.values(cs[2:5]), self.values(cuts[2:5]))
+        self.assertEqual(self.values(cs[::2]), self.values(cuts[::2]))
+        self.assertEqual(self.values([cs[-1]]), self.values(cuts[-1:]))
+        self.assertEqual(cs[1:4], router.Cut_Set(cuts[1:4]))
+        self.assertNotEqual(cs[1:4], cs[2:5])
+        self.assertTrue(copy.deepcopy(cs) is cs)
+        self.assertEqual(pickle.loads(pickle.dumps(cs)), cs)
+        # the copy is independent of the cuts
+        cuts[0].xmin += 1
+        cs[0].passes.append(99)
+        self.assertNotEqual(self.values(cs), self.values(cuts))
+        # values not representable in ticks
+        odd = [router.Cut(D('0.12345'), 5), router.Cut(9, 12)]
+        cs = router.Cut_Set(odd)
+        self.assertFalse(cs.ticks)
+        self.assertEqual(self.values(cs), self.values(odd))
+        self.assertEqual(cs, router.Cut_Set(odd))
+
+    def test_pickle(self):
+        c = router.Cut(3, D('7.5'))
+        c.passes = [4, 6]
+        c2 = pickle.loads(pickle.dumps(c))
+        self.assertEqual(self.values([c2]), self.values([c]))
+        # the state of cuts pickled before Cut had __slots__
+        c2 = router.Cut.__new__(router.Cut)
+        c2.__setstate__({'xmin': D(3), 'xmax': D('7.5'), 'passes': [4, 6],
+                         'precision': D('0.01')})
+        self.assertEqual(self.values([c2]), self.values([c]))
+
+    def test_undo(self):
+        spec = engine.Joint_Spec(board_width=12, bit_width='1/2', spacing='Edit',
+                                 cuts=[(0, 20), (60, 90), (150, 180), (250, 270)])
+        (config, bit, boards, sp) = engine.make_joint(spec)
+        before = self.values(sp.cuts)
+        sp.active_cuts = [1, 2]
+        sp.cut_move_right()
+        sp.cut_widen_left()
+        self.assertNotEqual(self.values(sp.cuts), before)
+        sp.undo()
+        sp.undo()
+        self.assertEqual(self.values(sp.cuts), before)
+        self.assertFalse(sp.changes_made())
+
+
+class Edit_Spaced_Test(Decimal_Test):
+    '''
+    Tests the changes to the cuts in the Editor, and their undo and redo
+    history.
+    '''
+    def values(self, cuts):
+        return [(c.xmin, c.xmax) for c in cuts]
+
+    def make_spacing(self):
+        spec = engine.Joint_Spec(board_width=12, bit_width='1/2', spacing='Edit',
+                                 cuts=[(0, 20), (60, 90), (150, 180), (250, 270),
+                                       (330, 384)])
+        return engine.make_joint(spec)[3]
+
+    def test_undo_redo(self):
+        sp = self.make_spacing()
+        states = [self.values(sp.cuts)]
+        sp.active_cuts = [1, 2]
+        for op in [sp.cut_move_right, sp.cut_widen_left, sp.cut_trim_right,
+                   sp.cut_delete_active, sp.cut_add, sp.cut_move_right]:
+            (dummy_msg, warning) = op()
+            self.assertFalse(warning)
+            states.append(self.values(sp.cuts))
+        self.assertEqual(len(sp.log.undo_steps), 6)
+        for state in reversed(states[:-1]):
+            self.assertTrue(sp.undo())
+            self.assertEqual(self.values(sp.cuts), state)
+        self.assertFalse(sp.undo())
+        self.assertFalse(sp.changes_made())
+        for state in states[1:]:
+            self.assertTrue(sp.redo())
+            self.assertEqual(self.values(sp.cuts), state)
+        self.assertFalse(sp.redo())
+        # a new change clears the changes to redo
+        sp.undo()
+        sp.active_cuts = [3]
+        (dummy_msg, warning) = sp.cut_widen_left()
+        self.assertFalse(warning)
+        self.assertFalse(sp.redo())
+
+    def test_failed_change(self):
+        sp = self.make_spacing()
+        before = self.values(sp.cuts)
+        # the first cut cannot be widened past the left edge
+        sp.active_cuts = [0, 1]
+        (dummy_msg, warning) = sp.cut_widen_left()
+        self.assertTrue(warning)
+        self.assertEqual(self.values(sp.cuts), before)
+        self.assertEqual(sp.active_cuts, [0, 1])
+        self.assertFalse(sp.changes_made())
+
+    def test_repeat(self):
+        sp = self.make_spacing()
+        before = self.values(sp.cuts)
+        sp.active_cuts = [1, 3]
+        sp.cut_move_right()
+        sp.repeat = True
+        for _ in range(10):
+            sp.cut_move_right()
+        sp.repeat = False
+        after = self.values(sp.cuts)
+        self.assertEqual(after[1], (71, 101))
+        # one step, holding only the two cuts that moved
+        self.assertEqual(len(sp.log.undo_steps), 1)
+        self.assertEqual(len(sp.log.undo_steps[0].splices), 2)
+        # a repeat of another operation is a new step
+        sp.repeat = True
+        sp.cut_widen_left()
+        sp.repeat = False
+        self.assertEqual(len(sp.log.undo_steps), 2)
+        sp.undo()
+        self.assertEqual(self.values(sp.cuts), after)
+        sp.undo()
+        self.assertEqual(self.values(sp.cuts), before)
+        # repeats after an undo are not merged into the step before it
+        sp.redo()
+        sp.repeat = True
+        sp.cut_move_right()
+        self.assertEqual(len(sp.log.undo_steps), 2)
+        # a held key that deletes a cut part way through
+        spec = engine.Joint_Spec(board_width=8, bit_width='1/2')
+        (config, bit, boards, eq) = engine.make_joint(spec)
+        sp = spacing.Edit_Spaced(bit, boards, config)
+        sp.set_cuts(eq.cuts)
+        before = self.values(sp.cuts)
+        sp.cut_all_active()
+        sp.repeat = True
+        for _ in range(10):
+            sp.cut_move_left()
+        sp.repeat = False
+        after = self.values(sp.cuts)
+        self.assertEqual(len(after), len(before) - 1)
+        self.assertEqual(len(sp.log.undo_steps), 1)
+        self.assertTrue(sp.undo())
+        self.assertEqual(self.values(sp.cuts), before)
+        self.assertTrue(sp.redo())
+        self.assertEqual(self.values(sp.cuts), after)
+
+    def test_memory(self):
+        sp = self.make_spacing()
+        sp.log.max_bytes = 10 * spacing.Edit_Step.step_bytes
+        sp.active_cuts = [1]
+        for _ in range(40):
+            sp.cut_move_right()
+            sp.cut_move_left()
+        self.assertTrue(len(sp.log.undo_steps) < 10)
+        self.assertTrue(sp.log.nbytes <= sp.log.max_bytes)
+        self.assertEqual(sp.log.nbytes, sum(s.nbytes() for s in sp.log.undo_steps))
+        while sp.undo():
+            pass
+        # the forgotten steps are still changes
+        self.assertTrue(sp.log.forgotten)
+        self.assertTrue(sp.changes_made())
+
+    def test_move(self):
+        sp = self.make_spacing()
+        sp.active_cuts = [1, 2]
+        steps = self.make_spacing()
+        steps.active_cuts = [1, 2]
+        for _ in range(12):
+            steps.cut_move_right()
+        (dummy_msg, warning) = sp.cut_move(12)
+        self.assertFalse(warning)
+        self.assertEqual(self.values(sp.cuts), self.values(steps.cuts))
+        self.assertEqual(len(sp.log.undo_steps), 1)
+        (dummy_msg, warning) = sp.cut_move_to(60)
+        self.assertFalse(warning)
+        self.assertEqual(self.values(sp.cuts)[1:3], [(60, 90), (150, 180)])
+        # limited by the cut to the right
+        (dmin, dmax) = sp.move_range()
+        (dummy_msg, warning) = sp.cut_move(dmax + 20)
+        self.assertTrue(warning)
+        self.assertEqual(sp.cuts[2].xmax, 180 + dmax)
+        self.assertTrue(sp.check_limits(2))
+        (dummy_msg, warning) = sp.cut_move(1)
+        self.assertTrue(warning)
+        self.assertEqual(len(sp.log.undo_steps), 3)
+        sp.undo()
+        sp.undo()
+        sp.undo()
+        self.assertEqual(self.values(sp.cuts), self.values(self.make_spacing().cuts))
+
+    def test_move_end(self):
+        sp = self.make_spacing()
+        # the cut on the left end keeps it, and keeps a finger on its right
+        sp.active_cuts = [0]
+        sp.cut_move(-100)
+        self.assertEqual(sp.cuts[0].xmin, 0)
+        self.assertTrue(sp.cuts[0].xmax - sp.bit.overhang > 2)
+        sp.active_cuts = [4]
+        sp.cut_move(100)
+        self.assertEqual(sp.cuts[4].xmax, 384)
+        self.assertTrue(sp.cuts[4].xmin + sp.bit.overhang + 2 < 384)
+
+    def test_resize(self):
+        sp = self.make_spacing()
+        sp.active_cuts = [1, 2]
+        (dummy_msg, warning) = sp.cut_resize(True, 5)
+        self.assertFalse(warning)
+        (dummy_msg, warning) = sp.cut_resize(False, -3)
+        self.assertFalse(warning)
+        self.assertEqual(self.values(sp.cuts)[1:3], [(55, 87), (145, 177)])
+        # trimmed no narrower than the bit
+        (dummy_msg, warning) = sp.cut_resize_to(False, 0)
+        self.assertTrue(warning)
+        wmin = sp.bit.width_f + 2 * sp.dhtot
+        self.assertEqual(sp.cuts[1].xmax - sp.cuts[1].xmin, wmin)
+        # widened no further than the limits
+        (dummy_msg, warning) = sp.cut_resize_to(True, 0)
+        self.assertTrue(warning)
+        self.assertTrue(sp.check_limits(1))
+        self.assertEqual(sp.cuts[1].xmin, sp.get_limits(1)[0])
+        self.assertEqual(len(sp.log.undo_steps), 4)
+
+    def test_index(self):
+        sp = self.make_spacing()
+        rng = random.Random(1)
+        ops = [sp.cut_move_left, sp.cut_move_right, sp.cut_widen_left, sp.cut_widen_right,
+               sp.cut_trim_left, sp.cut_trim_right, sp.cut_add, sp.cut_delete_active,
+               sp.undo, sp.redo, lambda: sp.cut_move(rng.randint(-20, 20))]
+        for _ in range(300):
+            n = len(sp.cuts)
+            sp.cursor_cut = rng.randrange(n)
+            sp.active_cuts = sorted(set(rng.randrange(n) for _ in range(rng.randint(1, 2))))
+            rng.choice(ops)()
+            self.assertEqual(list(zip(sp.index.xmin, sp.index.xmax)), self.values(sp.cuts))
+            for x in range(0, 385, 7):
+                f = [i for (i, c) in enumerate(sp.cuts) if c.xmin <= x <= c.xmax]
+                self.assertEqual(sp.cut_at(x), f[-1] if f else None)
+            # the first place to add a cut, as searched linearly
+            (gap, width) = (40, 30)
+            expected = None
+            for i in range(1, len(sp.cuts)):
+                if sp.cuts[i].xmin - sp.cuts[i - 1].xmax >= gap:
+                    expected = (i, True)
+                    break
+                if sp.cuts[i].xmax - sp.cuts[i].xmin >= width:
+                    expected = (i, False)
+                    break
+            self.assertEqual(sp.index.first_space(gap, width), expected)
+
+
+class Incremental_Test(Decimal_Test):
+    '''
+    Tests that recomputing a joint after an edit recomputes only the passes,
+    adjoining cuts, caul cuts and perimeters of the cuts that the edit
+    touched.
+    '''
+    def geometry(self, boards, bit, sp, config):
+        template = router.Incra_Template(bit.units, boards)
+        geom = router.Joint_Geometry(template, boards, bit, sp, utils.Margins(8), config)
+        return geom.compute()
+
+    def test_edit(self):
+        spec = engine.Joint_Spec(board_width=24, bit_width='1/4', double_thicknesses=['1/8'],
+                                 spacing='Edit', config={'show_caul': True})
+        (config, bit, boards, sp) = engine.make_joint(spec)
+        geom = self.geometry(boards, bit, sp, config)
+        ncuts = len(sp.cuts)
+        self.assertTrue(ncuts > 20)
+        caches = [c for b in boards for c in b.pass_caches.values()]
+        spans = [c for b in boards for c in b.span_caches.values()]
+        joint_state(boards, geom)
+        for (f, move) in [(10, sp.cut_move_right), (10, sp.cut_move_left),
+                          (20, sp.cut_widen_left), (0, sp.cut_move_right),
+                          (ncuts - 1, sp.cut_trim_right)]:
+            sp.cursor_cut = f
+            sp.active_cuts = [f]
+            move()
+            misses = sum(c.misses for c in caches)
+            span_misses = sum(c.misses for c in spans)
+            geom = self.geometry(boards, bit, sp, config)
+            state = joint_state(boards, geom)
+            # each edge recomputes at most the passes of the two cuts adjoining
+            # the edited cut, including the cauls
+            self.assertTrue(sum(c.misses for c in caches) - misses <= 2 * 7)
+            # ...and a few of its adjoining cuts, caul cuts and perimeter
+            # points, however many cuts there are
+            self.assertTrue(sum(c.misses for c in spans) - span_misses <= 20)
+            # compare with the joint computed from scratch
+            fresh = copy.deepcopy(boards)
+            for b in fresh:
+                for c in list(b.pass_caches.values()) + list(b.span_caches.values()):
+                    c.clear()
+            geom0 = self.geometry(fresh, bit, sp, config)
+            self.assertEqual(joint_state(fresh, geom0), state)
+
+
+def linear_var_spacing(sp):
+    '''
+    Returns the Spacing vMax of the Variable_Spaced sp, found by the linear
+    search of the original calc_var_params.
+    '''
+    min_interior = sp.bit.midline + sp.dhtot * 2
+    s = math.floor(D(sp.boards[0].width) / 2)
+    n = int(sp.params['Fingers'].v)
+    d = 0
+    while True:
+        d += 1 if sp.params['Inverted'].v else -1
+        a1 = utils.math_round(((2 * s) - (n - 1) * n * d) / D(2 * n - 1))
+        an = a1 + D(n - 1) * d
+        if sp.params['Inverted'].v:
+            if a1 < min_interior:
+                return d - 1
+        elif (an - d) < min_interior or an < sp.min_finger_width:
+            return -(d + 1)
+
+
+class Variable_Spaced_Test(Decimal_Test):
+    '''
+    Tests the range of the Spacing of Variable_Spaced.
+    '''
+    def test_calc_var_params(self):
+        count = 0
+        for (bw, width, dt, num_increments) in itertools.product(
+                ['1/4', '1/2', '3/4'], ['4 1/4', '7 1/2', '11 3/4'],
+                [(), ('1/8',)], [16, 32, 128]):
+            spec = engine.Joint_Spec(board_width=width, bit_width=bw, double_thicknesses=dt,
+                                     spacing='Variable',
+                                     config={'num_increments': num_increments})
+            try:
+                (_, _, _, sp) = engine.make_joint(spec)
+            except spacing.Spacing_Exception:
+                continue
+            p = sp.params['Fingers']
+            for (n, inverted) in itertools.product(range(p.vMin, p.vMax + 1), [False, True]):
+                sp.params['Inverted'].v = inverted
+                sp.set_slider('Fingers', n)
+                self.assertEqual(sp.params['Spacing'].vMax, linear_var_spacing(sp))
+                count += 1
+        self.assertTrue(count > 100)
+
+    def test_first_true(self):
+        for k in range(1, 70):
+            calls = []
+            self.assertEqual(spacing.first_true(lambda i: calls.append(i) or i >= k), k)
+            self.assertTrue(len(calls) <= 2 * k.bit_length() + 1)
+
+
+def write_png(filename, text):
+    '''
+    Writes a 1x1 PNG file with the dictionary text of tEXt chunks.
+    '''
+    png = serialize.PNG_SIGNATURE + \
+        serialize.png_chunk(b'IHDR', struct.pack('>IIBBBBB', 1, 1, 8, 2, 0, 0, 0)) + \
+        serialize.png_chunk(b'IDAT', zlib.compress(b'\0\0\0\0')) + \
+        serialize.png_chunk(b'IEND', b'')
+    with open(filename, 'wb') as fd:
+        fd.write(serialize.add_png_text(png, text))
+
+
+class Serialize_Test(Decimal_Test):
+    '''
+    Tests the serialization of joints.
+    '''
+    def setUp(self):
+        Decimal_Test.setUp(self)
+        self.specs = [engine.Joint_Spec(board_width='7 1/2', bit_width='1/2', bit_angle=7,
+                                        double_thicknesses=['1/8']),
+                      engine.Joint_Spec(board_width=10, bit_width='3/8', spacing='Variable',
+                                        params={'Fingers': 5}, bit_gentle=50),
+                      engine.Joint_Spec(board_width=12, bit_width='1/2', spacing='Edit',
+                                        cuts=[(0, 20), (60, D('90.5')), (150, 180)]),
+                      engine.Joint_Spec(board_width=200, bit_width=12, metric=True,
+                                        double_thicknesses=[4, 3]),
+                      engine.Joint_Spec(board_width='200.5', bit_width='12.7', bit_angle=7.5,
+                                        metric=True)]
+
+    def state(self, bit, boards, sp):
+        return ((bit.units.metric, bit.units.num_increments, bit.width, bit.depth, bit.angle,
+                 bit.bit_gentle),
+                [(b.width, b.height, b.wood, b.active, b.dheight) for b in boards],
+                [(c.xmin, c.xmax) for c in sp.cuts],
+                type(sp), sp.labels, sp.description,
+                [(k, p.vMin, p.vMax, p.v) for (k, p) in sorted(sp.params.items())]
+                if isinstance(sp.params, dict) else sp.params)
+
+    def test_round_trip(self):
+        for spec in self.specs:
+            (config, bit, boards, sp) = engine.make_joint(spec)
+            boards[0].set_wood('Walnut')
+            s = serialize.serialize(bit, boards, sp, config)
+            self.assertTrue(s.startswith('{'))
+            # the cuts are read, not computed
+            if isinstance(sp, spacing.Edit_Spaced):
+                restored = serialize.unserialize(s, config)
+            else:
+                with mock.patch.object(type(sp), 'set_cuts', side_effect=AssertionError):
+                    restored = serialize.unserialize(s, config)
+            self.assertEqual(self.state(*restored[:3]), self.state(bit, boards, sp))
+            self.assertEqual(restored[3], serialize.SPACING_TYPES[type(sp)])
+            # canonical
+            self.assertEqual(serialize.serialize(*(restored[:3] + (config,))), s)
+            values = [json.loads(s)]
+            while values:
+                v = values.pop()
+                self.assertNotIsInstance(v, float)
+                if isinstance(v, dict):
+                    values.extend(v.values())
+                elif isinstance(v, list):
+                    values.extend(v)
+
+    def test_pickle_format(self):
+        for spec in self.specs:
+            (config, bit, boards, sp) = engine.make_joint(spec)
+            s = serialize.serialize_pickle(bit, boards, sp, config)
+            restored = serialize.unserialize(s, config, True)
+            # the pickle format does not hold the gentleness of the bit
+            restored[0].bit_gentle = bit.bit_gentle
+            self.assertEqual(self.state(*restored[:3]), self.state(bit, boards, sp))
+
+    def test_stream(self):
+        joints = [engine.make_joint(spec) for spec in self.specs]
+        config = joints[0][0]
+        fd = io.StringIO()
+        serialize.dump_joints(fd, [j[1:] for j in joints])
+        self.assertEqual(len(fd.getvalue().splitlines()), len(joints))
+        fd.seek(0)
+        restored = list(serialize.load_joints(fd, config))
+        self.assertEqual([self.state(*r[:3]) for r in restored],
+                         [self.state(*j[1:]) for j in joints])
+
+    def test_png_text(self):
+        # the joint follows the image data, which is not valid zlib data, so
+        # that any attempt to decompress it fails
+        png = serialize.PNG_SIGNATURE + \
+            serialize.png_chunk(b'IHDR', struct.pack('>IIBBBBB', 1, 1, 8, 2, 0, 0, 0)) + \
+            serialize.png_chunk(b'tEXt', b'Software\0other') + \
+            serialize.png_chunk(b'tEXt', b'pyRouterJig_v\0' + utils.VERSION.encode()) + \
+            serialize.png_chunk(b'IDAT', b'\xff' * 1000) + \
+            serialize.png_chunk(b'tEXt', b'pyRouterJig\0{"format":1}')
+        tmpdir = tempfile.mkdtemp()
+        try:
+            filename = os.path.join(tmpdir, 'joint.png')
+            with open(filename, 'wb') as fd:
+                fd.write(png + serialize.png_chunk(b'IEND', b''))
+            self.assertEqual(serialize.read_png_text(filename),
+                             {'pyRouterJig': '{"format":1}', 'pyRouterJig_v': utils.VERSION})
+            self.assertEqual(serialize.read_png_text(filename, ['Software']),
+                             {'Software': 'other'})
+            self.assertEqual(serialize.read_png_text(filename, ['Title']), {})
+            with open(filename, 'wb') as fd:
+                fd.write(png[:-10])
+            self.assertRaises(serialize.Serialize_Exception, serialize.read_png_text, filename)
+            with open(filename, 'wb') as fd:
+                fd.write(b'GIF89a' + png)
+            self.assertRaises(serialize.Serialize_Exception, serialize.read_png_text, filename)
+        finally:
+            shutil.rmtree(tmpdir)
+
+    def test_bad_format(self):
+        config = config_file.default_config(False)
+        with self.assertRaises(serialize.Serialize_Exception):
+            serialize.unserialize('{"format":99}', config)
+
+
+
+class Joint_Index_Test(Decimal_Test):
+    '''
+    Tests the index of saved joints.
+    '''
+    def setUp(self):
+        Decimal_Test.setUp(self)
+        self.tmpdir = tempfile.mkdtemp()
+        os.mkdir(os.path.join(self.tmpdir, 'old'))
+        self.index = joint_index.Joint_Index(':memory:')
+
+    def tearDown(self):
+        self.index.close()
+        shutil.rmtree(self.tmpdir)
+        Decimal_Test.tearDown(self)
+
+    def save(self, name, spec, indent=None):
+        (config, bit, boards, sp) = engine.make_joint(spec)
+        s = serialize.serialize(bit, boards, sp, config)
+        if indent is not None:
+            # as written by hand, or by an older version
+            s = json.dumps(json.loads(s), indent=indent)
+        write_png(os.path.join(self.tmpdir, name),
+                  {'pyRouterJig': s, 'pyRouterJig_v': utils.VERSION})
+        return config
+
+    def paths(self, entries):
+        return [os.path.relpath(e.path, self.tmpdir) for e in entries]
+
+    def test_index(self):
+        config = self.save('a.png', engine.Joint_Spec(board_width='7 1/2', bit_width='1/2'))
+        variable = engine.Joint_Spec(board_width='7 1/2', bit_width='1/2', spacing='Variable',
+                                     params={'Fingers': 5})
+        self.save('b.png', variable)
+        self.save('old/c.png', engine.Joint_Spec(board_width='7 1/2', bit_width='1/2'), 1)
+        self.save('d.png', engine.Joint_Spec(board_width=10, bit_width='3/8', bit_angle=14))
+        self.save('e.png', engine.Joint_Spec(board_width=254, bit_width=12, metric=True))
+        write_png(os.path.join(self.tmpdir, 'screenshot.png'), {})
+        with open(os.path.join(self.tmpdir, 'notes.png'), 'w') as fd:
+            fd.write('not a PNG')
+        with open(os.path.join(self.tmpdir, 'a.txt'), 'w') as fd:
+            fd.write('not indexed')
+
+        self.assertEqual(self.index.update(self.tmpdir, config), (7, 0))
+        q = self.index.query
+        self.assertEqual(self.paths(q()), ['a.png', 'b.png', 'd.png', 'e.png', 'old/c.png'])
+        self.assertEqual(self.paths(q(board_width=10)), ['d.png', 'e.png'])
+        self.assertEqual(self.paths(q(board_width=10, metric=True)), ['e.png'])
+        self.assertEqual(self.paths(q(bit_width=0.5, board_width=7.5)),
+                         ['a.png', 'b.png', 'old/c.png'])
+        self.assertEqual(self.paths(q(bit_width=0.5, metric=False, spacing='Equa')),
+                         ['a.png', 'old/c.png'])
+        self.assertEqual(self.paths(q(bit_angle=14)), ['d.png'])
+        self.assertEqual(q(board_width=12), [])
+        e = q(spacing='Vari')[0]
+        self.assertEqual(e.version, utils.VERSION)
+        self.assertEqual(e.params['Fingers'], 5)
+        self.assertEqual(e.num_cuts, len(engine.make_joint(variable)[3].cuts))
+        (a, c) = q(spacing='Equa', bit_width=0.5)
+        self.assertEqual(self.index.duplicates(a), [c.path])
+
+        # only the changed files are read again
+        self.assertEqual(self.index.update(self.tmpdir, config), (0, 0))
+        self.save('a.png', engine.Joint_Spec(board_width=12, bit_width='1/2'))
+        os.remove(os.path.join(self.tmpdir, 'old', 'c.png'))
+        self.assertEqual(self.index.update(self.tmpdir, config), (1, 1))
+        self.assertEqual(self.paths(q(board_width=12)), ['a.png'])
+        # updating a subdirectory leaves the others alone
+        self.assertEqual(self.index.update(os.path.join(self.tmpdir, 'old'), config), (0, 0))
+        self.assertEqual(len(q()), 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
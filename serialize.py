@@ -20,21 +20,196 @@
 
 '''
 Contains serialization capability
+
+A joint is serialized as canonical JSON: an object with sorted keys and no
+whitespace, holding lengths in increments.  Integral values are JSON
+integers, and any other Decimal or float is a string of its exact value.
+The object is versioned by its "format" key, and holds the cuts of the
+spacing, so that unserialize() does not compute them again.  Many joints
+may be streamed into one file, one per line, with dump_joints() and
+load_joints().
+
+Joints saved before the JSON format were pickled and encoded as
+quoted-printable text.  unserialize() still reads them.
+
+Saved joints are held in the tEXt chunks PNG_KEYS of PNG files, which
+read_png_text() reads and add_png_text() writes, without decoding the
+image.
 '''
 
 import binascii
+import json
 import pickle
+import struct
+import zlib
+from decimal import Decimal as D
 from io import BytesIO
 import router
 import utils
 import spacing
 
+# the version of the JSON format written by serialize()
+FORMAT_VERSION = 1
+
+# the type of each spacing, as written by the pickle format
+SPACING_TYPES = {spacing.Equally_Spaced: 'Equa',
+                 spacing.Variable_Spaced: 'Vari',
+                 spacing.Edit_Spaced: 'Edit'}
+
+# the keys of the PNG tEXt chunks that hold the joint and the version that
+# saved it
+PNG_KEYS = ('pyRouterJig', 'pyRouterJig_v')
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+
+
+class Serialize_Exception(Exception):
+    '''
+    Raised when a serialized joint cannot be read.
+    '''
+    def __init__(self, msg):
+        Exception.__init__(self, msg)
+        self.msg = msg
+
+    def __str__(self):
+        return self.msg
+
+
+def encode_value(v):
+    '''
+    Returns v as a JSON value: an integer if v is integral, the string of a
+    Decimal, or v itself for bools, strings and None.  A float is first
+    converted to the Decimal of its shortest repr, so that the same joint is
+    always written the same way.
+    '''
+    if isinstance(v, float):
+        v = D(repr(v))
+    if isinstance(v, D):
+        if v == v.to_integral_value():
+            return int(v)
+        return str(v)
+    return v
+
+
+def decode_value(v):
+    '''
+    Returns the value of the JSON value v, from encode_value()
+    '''
+    if isinstance(v, str):
+        return D(v)
+    return v
+
+
+def decode_float(v):
+    '''
+    Returns the value of the JSON value v, from encode_value(), for the
+    dimensions of the bit and boards, which are floats unless integral.
+    '''
+    if isinstance(v, str):
+        return float(v)
+    return v
+
+
+def joint_object(bit, boards, sp):
+    '''
+    Returns the joint as a dictionary of JSON values
+    '''
+    units = bit.units
+    sp_type = SPACING_TYPES[type(sp)]
+    obj = {'format': FORMAT_VERSION,
+           'version': utils.VERSION,
+           'units': [units.metric, units.num_increments],
+           'bit': [encode_value(v) for v in (bit.width, bit.depth, bit.angle, bit.bit_gentle)],
+           'boards': [[encode_value(b.width), encode_value(b.height), b.wood, b.active,
+                       encode_value(b.dheight)] for b in boards],
+           'spacing': sp_type,
+           'cuts': [encode_value(x) for c in sp.cuts for x in (c.xmin, c.xmax)]}
+    if sp_type != 'Edit':
+        obj['params'] = dict((k, [encode_value(v) for v in (p.vMin, p.vMax, p.v)])
+                             for (k, p) in sp.params.items())
+        obj['labels'] = sp.labels
+        obj['description'] = sp.description
+    return obj
+
 
 def serialize(bit, boards, sp, config):
     '''
     Serializes the arguments. Returns the serialized string, which can
     later be used to reconstruct the arguments using unserialize()
     '''
+    s = json.dumps(joint_object(bit, boards, sp), sort_keys=True, separators=(',', ':'))
+    if config.debug:
+        print('serialize', len(s))
+    return s
+
+
+def unserialize_object(obj, config, transl=None):
+    '''
+    Returns the tuple (bit, boards, spacing, spacing type) of the joint obj,
+    from joint_object()
+    '''
+    if obj.get('format') != FORMAT_VERSION:
+        raise Serialize_Exception('Unknown joint format: %s' % obj.get('format'))
+    (metric, num_increments) = obj['units']
+    units = utils.Units(config.english_separator, metric, num_increments, transl)
+    (width, depth, angle, bit_gentle) = obj['bit']
+    bit = router.Router_Bit(units, decode_float(width), decode_float(depth), decode_float(angle),
+                            decode_value(bit_gentle))
+    boards = []
+    for (width, height, wood, active, dheight) in obj['boards']:
+        b = router.Board(bit, decode_float(width))
+        b.height = decode_float(height)
+        b.wood = wood
+        b.active = active
+        b.dheight = decode_float(dheight)
+        boards.append(b)
+    x = [decode_value(v) for v in obj['cuts']]
+    cuts = [router.Cut(x[i], x[i + 1]) for i in range(0, len(x), 2)]
+    sp_type = obj['spacing']
+    if sp_type == 'Edit':
+        sp = spacing.Edit_Spaced(bit, boards, config)
+        sp.set_cuts(cuts)
+    else:
+        if sp_type == 'Equa':
+            sp = spacing.Equally_Spaced(bit, boards, config)
+        elif sp_type == 'Vari':
+            sp = spacing.Variable_Spaced(bit, boards, config)
+        else:
+            raise Serialize_Exception('Unknown spacing: %s' % sp_type)
+        for (k, (vMin, vMax, v)) in obj['params'].items():
+            sp.params[k] = spacing.Spacing_Param(decode_value(vMin), decode_value(vMax),
+                                                 decode_value(v))
+        sp.cuts = cuts
+        sp.labels = obj['labels']
+        sp.description = obj['description']
+    return (bit, boards, sp, sp_type)
+
+
+def dump_joints(fd, joints):
+    '''
+    Writes the joints, a sequence of (bit, boards, spacing), to the text
+    file fd, one line each
+    '''
+    for (bit, boards, sp) in joints:
+        json.dump(joint_object(bit, boards, sp), fd, sort_keys=True, separators=(',', ':'))
+        fd.write('\n')
+
+
+def load_joints(fd, config, transl=None):
+    '''
+    Reads the joints written by dump_joints() from the text file fd, and
+    yields the (bit, boards, spacing, spacing type) of each
+    '''
+    for line in fd:
+        if line.strip():
+            yield unserialize_object(json.loads(line), config, transl)
+
+
+def serialize_pickle(bit, boards, sp, config):
+    '''
+    Serializes the arguments in the format before the JSON format, which
+    unserialize() still reads.
+    '''
     out = BytesIO()
 
     p = pickle.Pickler(out)
@@ -76,8 +251,13 @@ def serialize(bit, boards, sp, config):
 
 def unserialize(s, config, newformat=False, transl=None):
     '''
-    Unserializes the string s, and returns the tuple (bit, boards, spacing)
+    Unserializes the string s, and returns the tuple (bit, boards, spacing,
+    spacing type).  newformat is True if s is in the pickle format saved with
+    the version number (from pyRouterJig_v), which is quoted-printable.
     '''
+    if s.startswith('{'):
+        return unserialize_object(json.loads(s), config, transl)
+
     # new format uue encoding support
     if newformat:
         s = binascii.a2b_qp(s)
@@ -130,3 +310,62 @@ def unserialize(s, config, newformat=False, transl=None):
             sp.upgrade()
         sp.set_cuts()
     return (bit, boards, sp, sp_type)
+
+
+def read_png_text(filename, keys=PNG_KEYS):
+    '''
+    Returns the dictionary {key: text} of the tEXt chunks of the PNG file
+    filename whose keys are in keys.  Only the chunk headers and the tEXt
+    chunks are read; all other chunks, including the image data, are
+    skipped, so the image is never decompressed.  Raises
+    Serialize_Exception if the file is not a valid PNG file.
+    '''
+    keys = set(k.encode('latin-1') for k in keys)
+    text = {}
+    with open(filename, 'rb') as fd:
+        if fd.read(8) != PNG_SIGNATURE:
+            raise Serialize_Exception('%s is not a PNG file' % filename)
+        while len(text) < len(keys):
+            header = fd.read(8)
+            if len(header) < 8:
+                raise Serialize_Exception('%s is truncated' % filename)
+            (length, ctype) = struct.unpack('>I4s', header)
+            if ctype == b'IEND':
+                break
+            if ctype != b'tEXt':
+                # skip the data and CRC.  tEXt may follow the image data.
+                fd.seek(length + 4, 1)
+                continue
+            data = fd.read(length)
+            crc = fd.read(4)
+            if len(crc) < 4:
+                raise Serialize_Exception('%s is truncated' % filename)
+            if struct.unpack('>I', crc)[0] != zlib.crc32(ctype + data) & 0xffffffff:
+                raise Serialize_Exception('%s has a corrupt tEXt chunk' % filename)
+            (key, _, value) = data.partition(b'\0')
+            if key in keys:
+                text[key.decode('latin-1')] = value.decode('latin-1')
+    return text
+
+
+def png_chunk(ctype, data):
+    '''
+    Returns the PNG chunk of type ctype, such as b'tEXt', holding data
+    '''
+    return struct.pack('>I4s', len(data), ctype) + data + \
+        struct.pack('>I', zlib.crc32(ctype + data) & 0xffffffff)
+
+
+def add_png_text(png, text):
+    '''
+    Returns the bytes of the PNG file png, with a tEXt chunk for each
+    (key, value) of the dictionary text inserted after the IHDR chunk.
+    Readers that stop at the image data, such as PIL, still find them.
+    Keys and values must be latin-1 text.
+    '''
+    if png[:8] != PNG_SIGNATURE or png[12:16] != b'IHDR':
+        raise Serialize_Exception('Not a PNG image')
+    end = 8 + 12 + struct.unpack('>I', png[8:12])[0]
+    chunks = [png_chunk(b'tEXt', k.encode('latin-1') + b'\0' + v.encode('latin-1'))
+              for (k, v) in sorted(text.items())]
+    return b''.join([png[:end]] + chunks + [png[end:]])
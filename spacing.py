@@ -22,8 +22,9 @@
 Contains the classes that define the finger width and spacing.
 '''
 
+import bisect
+import collections
 import math
-import copy
 from operator import attrgetter
 from decimal import Decimal as D
 
@@ -42,6 +43,27 @@ def dump_cuts(cuts):
         print('{:f}\t{:f}'.format(c.xmin, c.xmax))
 
 
+def first_true(predicate):
+    '''
+    Returns the smallest integer k >= 1 for which predicate(k) is True.  Once
+    True, the predicate must remain True for larger k.  Calls the predicate
+    O(log k) times, doubling k and then bisecting.
+    '''
+    lo = 0
+    hi = 1
+    while not predicate(hi):
+        lo = hi
+        hi *= 2
+    # predicate(lo) is False, or lo is 0, and predicate(hi) is True
+    while hi - lo > 1:
+        mid = (lo + hi) // 2
+        if predicate(mid):
+            hi = mid
+        else:
+            lo = mid
+    return hi
+
+
 class Spacing_Exception(Exception):
     '''
     Exception handler for spacings
@@ -86,10 +108,13 @@ class Base_Spacing(object):
                     female cuts in Board-A.
     labels: list of labels for the Spacing_Params
     id: Unique integer identifier for each concrete class
+    sliders: The keys of the Spacing_Params set with sliders, or similar
+             controls that step through all of their values
 
     cuts and labels are not set until set_cuts is called.
     '''
     labels = []
+    sliders = []
 
     def __init__(self, bit, boards, config):
         self.description = 'NONE'
@@ -114,6 +139,13 @@ class Base_Spacing(object):
            to keep saved files compatibility
         '''
 
+    def set_slider(self, key, value):
+        '''
+        Sets the value of the Spacing_Param key, and of any parameters that
+        depend upon it.  set_cuts must be called afterwards.
+        '''
+        self.params[key].v = value
+
     def write(self, fd):
         '''Writes the class to a file'''
 
@@ -134,6 +166,7 @@ class Equally_Spaced(Base_Spacing):
     true for dovetail bits.  Default is true.
     '''
     keys = ['Spacing', 'Width', 'Centered']
+    sliders = ['Spacing', 'Width']
     msg = 'Unable to compute a equally-spaced'\
           ' joint for the board and bit parameters'\
           ' specified.  This is likely because'\
@@ -261,6 +294,7 @@ class Variable_Spaced(Base_Spacing):
     Fingers: Roughly the number of full fingers on either the A or B board.
     '''
     keys = ['Fingers', 'Spacing', 'Inverted']
+    sliders = ['Fingers', 'Spacing']
     msg = \
         'Unable to compute a variable-spaced'\
         ' joint for the board and bit parameters'\
@@ -307,6 +341,14 @@ class Variable_Spaced(Base_Spacing):
         self.params[Variable_Spaced.keys[1]] = Spacing_Param(0, d, d)
         self.params[Variable_Spaced.keys[2]] = Spacing_Param(0, 0, False) # No inverse in previous version
 
+    def set_slider(self, key, value):
+        '''
+        Sets the value of the Spacing_Param key.  The range of the Spacing
+        depends upon the Fingers.
+        '''
+        Base_Spacing.set_slider(self, key, value)
+        if key == 'Fingers':
+            self.calc_var_params()
 
     def calc_var_params(self):
         '''
@@ -318,28 +360,29 @@ class Variable_Spaced(Base_Spacing):
 
         s = math.floor(D(self.boards[0].width) / 2)    # half board width
         n = int(self.params['Fingers'].v)  # number of cuts
-        d = 0  # d is the ideal decrease in finger width for each finger away from center finger
-        an = 0
 
-        # Iterate to get perfect d value
+        def widths(d):
+            '''Returns (a1, an) for the decrease d'''
+            a1 = utils.math_round(((2 * s) - (n - 1) * n * d) / D(2 * n - 1))
+            return (a1, a1 + D(n - 1) * d)
+
+        # d is the ideal decrease in finger width for each finger away from
+        # center finger.  Its magnitude is the largest before the fingers
+        # become too narrow: at the edge, or at the center if inverted.  Each
+        # step of d changes the rounded a1 by floor(b) or ceil(b), with
+        # b = n * (n - 1) / (2 * n - 1) < n - 1.  So as the magnitude grows,
+        # a1 never widens for d > 0, and for d < 0 neither does an, nor
+        # (an - d) for n > 3.  For n <= 3, (an - d) never narrows, so it can
+        # only be too narrow at the first step, which first_true tries first.
         if not self.params['Inverted'].v:
-            while True:
-                d += -1
-                a1 = utils.math_round(((2 * s) - (n - 1) * n * d) / D(2 * n - 1))
-                an = a1 + D(n - 1) * d
-                if (an - d) < min_interior or an < self.min_finger_width:
-                    d += 1
-                    break
+            def too_narrow(k):
+                (_, an) = widths(-k)
+                return (an + k) < min_interior or an < self.min_finger_width
         else:
-            while  True:
-                d += 1
-                a1 = utils.math_round(((2 * s) - (n - 1) * n * d) / D(2 * n - 1))
-                an = a1 + D(n - 1) * d
-                if a1 < min_interior:
-                    d -= 1
-                    break
+            def too_narrow(k):
+                return widths(k)[0] < min_interior
+        d = first_true(too_narrow) - 1
 
-        d = abs(d)
         self.params['Spacing'].vMax = d
         if self.params['Spacing'].v >= d:
             self.params['Spacing'].v = d
@@ -443,6 +486,252 @@ class Variable_Spaced(Base_Spacing):
             dump_cuts(self.cuts)
 
 
+class Max_Tree(object):
+    '''
+    A segment tree over a list of values, for finding the first value that is
+    at least a given amount, and for changing a value, in logarithmic time.
+    '''
+    empty = float('-inf')
+
+    def __init__(self, values):
+        self.size = 1
+        while self.size < len(values):
+            self.size *= 2
+        self.tree = [self.empty] * (2 * self.size)
+        self.tree[self.size:self.size + len(values)] = values
+        for i in range(self.size - 1, 0, -1):
+            self.tree[i] = max(self.tree[2 * i], self.tree[2 * i + 1])
+
+    def __setitem__(self, i, v):
+        i += self.size
+        self.tree[i] = v
+        i //= 2
+        while i > 0:
+            self.tree[i] = max(self.tree[2 * i], self.tree[2 * i + 1])
+            i //= 2
+
+    def first(self, v):
+        '''
+        Returns the index of the first value that is at least v, or None if
+        there is none.
+        '''
+        if self.tree[1] < v:
+            return None
+        i = 1
+        while i < self.size:
+            i *= 2
+            if self.tree[i] < v:
+                i += 1
+        return i - self.size
+
+
+class Cut_Index(object):
+    '''
+    A sorted index over the cuts of Edit_Spaced, which are sorted and do not
+    overlap.
+
+    Attributes:
+
+    xmin, xmax: the edges of the cuts, for finding the cut that contains x
+                by bisection
+    gaps: Max_Tree of the space between cut i-1 and cut i
+    widths: Max_Tree of the width of cut i, except the first cut
+
+    The gaps and widths find the first place to add a cut (see
+    Edit_Spaced.cut_add()).
+    '''
+    def __init__(self, cuts):
+        self.xmin = [c.xmin for c in cuts]
+        self.xmax = [c.xmax for c in cuts]
+        self._build()
+
+    def __len__(self):
+        return len(self.xmin)
+
+    def _build(self):
+        '''
+        Builds the trees from xmin and xmax
+        '''
+        n = len(self.xmin)
+        empty = [Max_Tree.empty] if n > 0 else []
+        self.gaps = Max_Tree(empty + [self.xmin[i] - self.xmax[i - 1] for i in range(1, n)])
+        self.widths = Max_Tree(empty + [self.xmax[i] - self.xmin[i] for i in range(1, n)])
+
+    def update(self, i, xmin, xmax):
+        '''
+        Changes the edges of cut index i
+        '''
+        self.xmin[i] = xmin
+        self.xmax[i] = xmax
+        if i > 0:
+            self.gaps[i] = xmin - self.xmax[i - 1]
+            self.widths[i] = xmax - xmin
+        if i + 1 < len(self.xmin):
+            self.gaps[i + 1] = self.xmin[i + 1] - xmax
+
+    def splice(self, lo, hi, edges):
+        '''
+        Replaces the cuts of indices lo to hi-1 by the cuts with edges, a list
+        of (xmin, xmax)
+        '''
+        self.xmin[lo:hi] = [xmin for (xmin, dummy_xmax) in edges]
+        self.xmax[lo:hi] = [xmax for (dummy_xmin, xmax) in edges]
+        self._build()
+
+    def find(self, x):
+        '''
+        Returns the index of the cut that contains x, or None if x is not in
+        a cut.  If x is the edge of two cuts, returns the cut on the right.
+        '''
+        i = bisect.bisect_right(self.xmin, x) - 1
+        if i >= 0 and x <= self.xmax[i]:
+            return i
+        return None
+
+    def first_space(self, gap, width):
+        '''
+        Returns (i, in_gap) for the first cut index i > 0 for which either
+        the space before the cut is at least gap (in_gap is True), or else
+        the cut is at least width wide (in_gap is False).  Returns None if
+        there is no such cut.
+        '''
+        i = self.gaps.first(gap)
+        j = self.widths.first(width)
+        if i is not None and (j is None or i <= j):
+            return (i, True)
+        if j is not None:
+            return (j, False)
+        return None
+
+
+class Edit_Step(object):
+    '''
+    One undoable change to the cuts of Edit_Spaced.
+
+    Attributes:
+
+    name: the operation that made the change, so that repeats of it can be
+          merged into one step
+    splices: list of (index, old, new), where old and new are tuples of the
+             (xmin, xmax) of cuts.  Each splice replaces the len(old) cuts
+             starting at index with the cuts new.  Redo applies the splices in
+             order, and undo reverses them in the opposite order.
+    before, after: the (cursor_cut, active_cuts) before and after the change
+    '''
+    __slots__ = ('name', 'splices', 'before', 'after')
+
+    # estimated memory, in bytes, of a step and of each (xmin, xmax) it holds
+    step_bytes = 400
+    cut_bytes = 200
+
+    def __init__(self, name, splices, before, after):
+        self.name = name
+        self.splices = []
+        self.before = before
+        self.after = after
+        self.extend(splices)
+
+    def nbytes(self):
+        '''
+        Returns the estimated memory of the step, in bytes
+        '''
+        n = sum(len(old) + len(new) for (dummy_index, old, new) in self.splices)
+        return self.step_bytes + n * self.cut_bytes
+
+    def extend(self, splices):
+        '''
+        Appends splices to the step.  A splice that changes the same cuts as
+        an earlier splice is combined with it, so that a held key adds no
+        memory for each repeat.  A splice that adds or deletes cuts is
+        combined only with the last splice, since moving it ahead of later
+        splices would shift the indices of their cuts.
+        '''
+        for (index, old, new) in splices:
+            j = len(self.splices) - 1
+            while j >= 0:
+                (i, o, n) = self.splices[j]
+                if i == index and len(n) == len(old):
+                    break
+                if len(o) != len(n) or (i < index + len(old) and index < i + len(n)):
+                    j = -1
+                    break
+                j -= 1
+            if len(new) != len(old) and j < len(self.splices) - 1:
+                j = -1
+            if j < 0:
+                self.splices.append((index, old, new))
+            elif o == new:
+                del self.splices[j]
+            else:
+                self.splices[j] = (index, o, new)
+
+
+class Edit_Log(object):
+    '''
+    The undo and redo history of Edit_Spaced, as lists of Edit_Steps.
+
+    The oldest steps are forgotten when the estimated memory of the history
+    exceeds max_bytes, although the last step is always kept.
+    '''
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.undo_steps = collections.deque()
+        self.redo_steps = []
+        self.nbytes = 0
+        self.forgotten = False  # True if steps were dropped to limit memory
+        self.mergeable = False  # True if the last step may take repeats
+
+    def push(self, step, repeat=False):
+        '''
+        Adds step to the history, and clears the steps to redo.  If repeat is
+        True and the last step is the same operation, step is merged into it.
+        '''
+        self.redo_steps = []
+        last = self.undo_steps[-1] if self.undo_steps else None
+        if repeat and self.mergeable and last.name == step.name:
+            self.nbytes -= last.nbytes()
+            last.extend(step.splices)
+            last.after = step.after
+            step = last
+        else:
+            self.undo_steps.append(step)
+        self.nbytes += step.nbytes()
+        self.mergeable = True
+        while self.nbytes > self.max_bytes and len(self.undo_steps) > 1:
+            self.nbytes -= self.undo_steps.popleft().nbytes()
+            self.forgotten = True
+
+    def close(self):
+        '''
+        Ends the last step, so that no later change is merged into it
+        '''
+        self.mergeable = False
+
+    def undo(self):
+        '''
+        Returns the step to undo, or None if there is none
+        '''
+        self.mergeable = False
+        if not self.undo_steps:
+            return None
+        step = self.undo_steps.pop()
+        self.nbytes -= step.nbytes()
+        self.redo_steps.append(step)
+        return step
+
+    def redo(self):
+        '''
+        Returns the step to redo, or None if there is none
+        '''
+        self.mergeable = False
+        if not self.redo_steps:
+            return None
+        step = self.redo_steps.pop()
+        self.undo_steps.append(step)
+        self.nbytes += step.nbytes()
+        return step
+
+
 class Edit_Spaced(Base_Spacing):
     '''
     Allows for user to interactively edit the cuts.
@@ -451,9 +740,20 @@ class Edit_Spaced(Base_Spacing):
 
     def __init__(self, bit, boards, config):
         Base_Spacing.__init__(self, bit, boards, config)
-        self.undo_cuts = []  # list of cuts to undo
+        self.log = Edit_Log(self.max_undo_bytes())
+        self.repeat = False  # True if the next change repeats a held key
+        self.splices = []  # changes made by the current operation
+        self.touched = {}  # (xmin, xmax) of cuts before the current operation
+        self.selection = None
+        self.index = Cut_Index(self.cuts)
         self.params = []
 
+    def max_undo_bytes(self):
+        '''
+        Returns the memory limit of the undo history, in bytes
+        '''
+        return int(self.config.max_undo_memory * 1024 * 1024)
+
     def set_cuts(self, cuts):
         '''
         Sets cuts to the input cuts
@@ -463,13 +763,100 @@ class Edit_Spaced(Base_Spacing):
         self.description = self.transl.tr('Edit spacing')
         self.cursor_cut = 0
         self.active_cuts = [self.cursor_cut]
-        self.undo_cuts = []
+        self.log = Edit_Log(self.max_undo_bytes())
+        self.index = Cut_Index(cuts)
 
     def changes_made(self):
         '''
         Returns true if editing changes have been made
         '''
-        return len(self.undo_cuts) > 0
+        return len(self.log.undo_steps) > 0 or self.log.forgotten
+
+    def cut_at(self, x):
+        '''
+        Returns the index of the cut that contains x, in increments, or None
+        if x is not in a cut.
+        '''
+        return self.index.find(x)
+
+    def _begin(self):
+        '''
+        Starts recording the changes of an operation
+        '''
+        self.splices = []
+        self.touched = {}
+        self.selection = (self.cursor_cut, list(self.active_cuts))
+
+    def _touch(self, f):
+        '''
+        Records cut index f before the current operation changes it in place
+        '''
+        if f not in self.touched:
+            c = self.cuts[f]
+            self.touched[f] = (c.xmin, c.xmax)
+
+    def _flush(self):
+        '''
+        Converts the cuts changed in place into splices
+        '''
+        for f in sorted(self.touched):
+            c = self.cuts[f]
+            if self.touched[f] != (c.xmin, c.xmax):
+                self.splices.append((f, (self.touched[f],), ((c.xmin, c.xmax),)))
+                self.index.update(f, c.xmin, c.xmax)
+        self.touched = {}
+
+    def _splice(self, lo, hi, cuts):
+        '''
+        Replaces the cuts of indices lo to hi-1 with cuts, recording the change
+        '''
+        self._flush()
+        old = tuple((c.xmin, c.xmax) for c in self.cuts[lo:hi])
+        new = tuple((c.xmin, c.xmax) for c in cuts)
+        self.splices.append((lo, old, new))
+        self.index.splice(lo, hi, new)
+        c = self.cuts[0:lo]
+        c.extend(cuts)
+        c.extend(self.cuts[hi:])
+        self.cuts = c
+
+    def _apply(self, splices, undo):
+        '''
+        Applies splices to the cuts, or reverses them if undo is True
+        '''
+        if undo:
+            splices = [(index, new, old) for (index, old, new) in reversed(splices)]
+        for (index, old, new) in splices:
+            if len(old) == len(new):
+                for (i, (xmin, xmax)) in enumerate(new, index):
+                    self.cuts[i].xmin = xmin
+                    self.cuts[i].xmax = xmax
+                    self.index.update(i, xmin, xmax)
+            else:
+                self.index.splice(index, index + len(old), new)
+                c = self.cuts[0:index]
+                c.extend([router.Cut(xmin, xmax) for (xmin, xmax) in new])
+                c.extend(self.cuts[index + len(old):])
+                self.cuts = c
+
+    def _commit(self, name):
+        '''
+        Adds the changes of the current operation to the undo history
+        '''
+        self._flush()
+        if self.splices:
+            after = (self.cursor_cut, list(self.active_cuts))
+            self.log.push(Edit_Step(name, self.splices, self.selection, after), self.repeat)
+        self.splices = []
+
+    def _rollback(self):
+        '''
+        Reverses the changes of the current operation
+        '''
+        self._flush()
+        self._apply(self.splices, True)
+        self.splices = []
+        (self.cursor_cut, self.active_cuts) = self.selection
 
     def get_limits(self, f):
         '''
@@ -494,22 +881,42 @@ class Edit_Spaced(Base_Spacing):
 
     def undo(self):
         '''
-        Undoes the last change to cuts
+        Undoes the last change to cuts.  Returns True if there was a change
+        to undo.
         '''
-        if self.undo_cuts:
-            self.cuts = self.undo_cuts.pop()
+        step = self.log.undo()
+        if step is None:
+            return False
+        self._apply(step.splices, True)
+        self.cursor_cut = step.before[0]
+        self.active_cuts = list(step.before[1])
+        return True
+
+    def redo(self):
+        '''
+        Redoes the last undone change to cuts.  Returns True if there was a
+        change to redo.
+        '''
+        step = self.log.redo()
+        if step is None:
+            return False
+        self._apply(step.splices, False)
+        self.cursor_cut = step.after[0]
+        self.active_cuts = list(step.after[1])
+        return True
 
     def cut_move_left(self):
         '''
         Moves the active cuts 1 increment to the left
         with min finger with respect
         '''
-        cuts_save = copy.deepcopy(self.cuts)
+        self._begin()
         op = []
         noop = []
         min_finger_width = self.bit.units.abstract_to_increments(self.config.min_finger_width)
         delete_cut = False
         for f in self.active_cuts:
+            self._touch(f)
             c = self.cuts[f]
             c.xmin -= 1
             if c.xmin <= min_finger_width:
@@ -537,11 +944,10 @@ class Edit_Spaced(Base_Spacing):
             else:
                 noop.append(f + incr)
         if noop:
-            self.cuts = cuts_save
+            self._rollback()
             return (self.transl.tr('No cuts moved: unable to move indices %s') % str(noop),
                     True)
-        if op or delete_cut:
-            self.undo_cuts.append(cuts_save)
+        self._commit('move_left')
         if op:
             msg += self.transl.tr('Moved cut indices %s to left 1 increment') % str(op)
         return (msg, False)
@@ -551,13 +957,14 @@ class Edit_Spaced(Base_Spacing):
         Moves the active cuts 1 increment to the right
         with min finger with respect
         '''
-        cuts_save = copy.deepcopy(self.cuts)
+        self._begin()
         op = []
         noop = []
         delete_cut = False
         min_finger_width = self.bit.units.abstract_to_increments(self.config.min_finger_width)
 
         for f in self.active_cuts:
+            self._touch(f)
             c = self.cuts[f]
             c.xmax += 1
             if self.boards[0].width - c.xmax < min_finger_width:
@@ -584,11 +991,10 @@ class Edit_Spaced(Base_Spacing):
             else:
                 noop.append(f)
         if noop:
-            self.cuts = cuts_save
+            self._rollback()
             return (self.transl.tr('No cuts moved: unable to move indices %s') % str(noop),
                     True)
-        if op or delete_cut:
-            self.undo_cuts.append(cuts_save)
+        self._commit('move_right')
         if op:
             msg += self.transl.tr('Moved cut indices %s to right 1 increment') % str(op)
         return (msg, False)
@@ -598,10 +1004,11 @@ class Edit_Spaced(Base_Spacing):
         Increases the active cuts width on the left side by 1 increment
         '''
         min_finger_width = self.bit.units.abstract_to_increments(self.config.min_finger_width)
-        cuts_save = copy.deepcopy(self.cuts)
+        self._begin()
         op = []
         noop = []
         for f in self.active_cuts:
+            self._touch(f)
             c = self.cuts[f]
             (xmin, dummy_xmax) = self.get_limits(f)
             if c.xmin > xmin:
@@ -613,11 +1020,11 @@ class Edit_Spaced(Base_Spacing):
             else:
                 noop.append(f)
         if noop:
-            self.cuts = cuts_save
+            self._rollback()
             return (self.transl.tr('No cuts widened: unable to widen indices %s') % str(noop),
                     True)
         if op:
-            self.undo_cuts.append(cuts_save)
+            self._commit('widen_left')
             msg = (self.transl.tr('Widened cut indices %s on left 1 increment') % str(op),
                    False)
         else:
@@ -629,10 +1036,11 @@ class Edit_Spaced(Base_Spacing):
         Increases the active cuts width on the right side by 1 increment
         '''
         min_finger_width = self.bit.units.abstract_to_increments(self.config.min_finger_width)
-        cuts_save = copy.deepcopy(self.cuts)
+        self._begin()
         op = []
         noop = []
         for f in self.active_cuts:
+            self._touch(f)
             c = self.cuts[f]
             (dummy_xmin, xmax) = self.get_limits(f)
             if c.xmax < xmax:
@@ -644,11 +1052,11 @@ class Edit_Spaced(Base_Spacing):
             else:
                 noop.append(f)
         if noop:
-            self.cuts = cuts_save
+            self._rollback()
             return (self.transl.tr('No cuts widened: unable to widen indices %s') % str(noop),
                     True)
         if op:
-            self.undo_cuts.append(cuts_save)
+            self._commit('widen_right')
             msg = (self.transl.tr('Widened cut indices %s on right 1 increment') % str(op),
                    False)
         else:
@@ -659,12 +1067,13 @@ class Edit_Spaced(Base_Spacing):
         '''
         Decreases the active cuts width on the left side by 1 increment
         '''
-        cuts_save = copy.deepcopy(self.cuts)
+        self._begin()
         op = []
         noop = []
         min_finger_width = self.bit.units.abstract_to_increments(self.config.min_finger_width)
 
         for f in self.active_cuts:
+            self._touch(f)
             c = self.cuts[f]
             wmin = self.bit.width_f + 2 * self.dhtot
             if c.xmin == 0:
@@ -680,11 +1089,11 @@ class Edit_Spaced(Base_Spacing):
                 self.cuts[f] = c
                 op.append(f)
         if noop:
-            self.cuts = cuts_save
+            self._rollback()
             return (self.transl.tr('No cuts trimmed: unable to trim indices %s') % str(noop),
                     True)
         if op:
-            self.undo_cuts.append(cuts_save)
+            self._commit('trim_left')
             msg = (self.transl.tr('Trimmed cut indices %s on left 1 increment') % str(op),
                    False)
         else:
@@ -695,12 +1104,13 @@ class Edit_Spaced(Base_Spacing):
         '''
         Decreases the active cuts width on the right side by 1 increment
         '''
-        cuts_save = copy.deepcopy(self.cuts)
+        self._begin()
         op = []
         noop = []
         min_finger_width = self.bit.units.abstract_to_increments(self.config.min_finger_width)
 
         for f in self.active_cuts:
+            self._touch(f)
             c = self.cuts[f]
             wmin = self.bit.width_f + 2 * self.dhtot
             if c.xmax == self.boards[0].width:
@@ -715,17 +1125,186 @@ class Edit_Spaced(Base_Spacing):
                 self.cuts[f] = c
                 op.append(f)
         if noop:
-            self.cuts = cuts_save
+            self._rollback()
             return (self.transl.tr('No cuts trimmed: unable to trim indices %s') % str(noop),
                     True)
         if op:
-            self.undo_cuts.append(cuts_save)
+            self._commit('trim_right')
             msg = (self.transl.tr('Trimmed cut indices %s on right 1 increment') % str(op),
                    False)
         else:
             msg = (self.transl.tr('Trimmed no cuts'), True)
         return msg
 
+    def move_range(self):
+        '''
+        Returns the (min, max) distance, in increments, that the active cuts
+        can be moved together, from the limits of each cut.  The end of a cut
+        on an end of the board stays there, and the cut must keep a finger
+        wider than min_finger_width on its other side.
+        '''
+        width = self.boards[0].width
+        min_finger_width = self.bit.units.abstract_to_increments(self.config.min_finger_width)
+        overhang = self.bit.overhang
+        (dmin, dmax) = (-width, width)
+        for f in self.active_cuts:
+            c = self.cuts[f]
+            (xmin, xmax) = self.get_limits(f)
+            # an active neighbor moves too, so it does not limit the cut
+            if c.xmin > 0 and f - 1 not in self.active_cuts:
+                dmin = max(dmin, xmin - c.xmin)
+            if c.xmax < width and f + 1 not in self.active_cuts:
+                dmax = min(dmax, xmax - c.xmax)
+            if c.xmin == 0 and c.xmax < width:
+                dmin = max(dmin, math.floor(min_finger_width + overhang - c.xmax) + 1)
+            if c.xmax == width and c.xmin > 0:
+                dmax = min(dmax, math.ceil(width - overhang - min_finger_width - c.xmin) - 1)
+        return (dmin, dmax)
+
+    def resize_range(self, left):
+        '''
+        Returns the (min, max) distance, in increments, that the left edges
+        (if left is True) or the right edges of the active cuts can be moved
+        outward, from the limits of each cut.  A positive distance widens the
+        cuts, and a negative distance trims them.
+        '''
+        width = self.boards[0].width
+        min_finger_width = self.bit.units.abstract_to_increments(self.config.min_finger_width)
+        overhang = self.bit.overhang
+        wmin = self.bit.width_f + 2 * self.dhtot
+        (dmin, dmax) = (-width, width)
+        for f in self.active_cuts:
+            c = self.cuts[f]
+            (xmin, xmax) = self.get_limits(f)
+            if left:
+                dmax = min(dmax, c.xmin - xmin)
+                if c.xmax < width:
+                    dmin = max(dmin, c.xmin + wmin - c.xmax)
+                else:
+                    dmin = max(dmin, math.floor(c.xmin + overhang + min_finger_width - width) + 1)
+            else:
+                dmax = min(dmax, xmax - c.xmax)
+                if c.xmin > 0:
+                    dmin = max(dmin, c.xmin + wmin - c.xmax)
+                else:
+                    dmin = max(dmin, math.floor(min_finger_width + overhang - c.xmax) + 1)
+        return (dmin, dmax)
+
+    def _clamp(self, distance, limits):
+        '''
+        Returns (requested, allowed), the distance rounded to increments and
+        then limited to limits.  allowed is zero if the limits do not allow
+        any change in the direction of distance.
+        '''
+        d = utils.math_round(D(distance))
+        (dmin, dmax) = limits
+        allowed = max(dmin, min(dmax, d))
+        if dmin > dmax or allowed * d <= 0:
+            allowed = 0
+        return (d, allowed)
+
+    def cut_move(self, distance):
+        '''
+        Moves the active cuts by distance increments, to the right if
+        positive and to the left if negative.  The distance is reduced as
+        needed to keep the cuts within the limits of move_range().
+        '''
+        (d, allowed) = self._clamp(distance, self.move_range())
+        active = sorted(self.active_cuts)
+        if allowed == 0:
+            return (self.transl.tr('No cuts moved: unable to move indices %s') % str(active),
+                    True)
+        width = self.boards[0].width
+        min_finger_width = self.bit.units.abstract_to_increments(self.config.min_finger_width)
+        self._begin()
+        for f in active:
+            self._touch(f)
+            c = self.cuts[f]
+            if c.xmin > 0:
+                c.xmin += allowed
+                if c.xmin < min_finger_width:
+                    c.xmin = 0
+            if c.xmax < width:
+                c.xmax += allowed
+                if width - c.xmax < min_finger_width:
+                    c.xmax = width
+        self._commit('move')
+        msg = self.transl.tr('Moved cut indices %s by %d increments') % (str(active), allowed)
+        if allowed != d:
+            msg += self.transl.tr(', limited from %d') % d
+        return (msg, allowed != d)
+
+    def cut_move_to(self, x):
+        '''
+        Moves the active cuts together, so that the first active cut is at x.
+        The position of a cut is its left edge, or its right edge if it is on
+        the left end of the board.
+        '''
+        if not self.active_cuts:
+            return (self.transl.tr('No cuts moved: no active cuts'), True)
+        c = self.cuts[min(self.active_cuts)]
+        if c.xmin > 0:
+            return self.cut_move(D(x) - c.xmin)
+        return self.cut_move(D(x) - c.xmax)
+
+    def cut_resize(self, left, distance):
+        '''
+        Moves the left edges (if left is True) or the right edges of the
+        active cuts outward by distance increments, which widens the cuts if
+        positive and trims them if negative.  The distance is reduced as
+        needed to keep the cuts within the limits of resize_range().
+        '''
+        (d, allowed) = self._clamp(distance, self.resize_range(left))
+        active = sorted(self.active_cuts)
+        if allowed == 0:
+            if d > 0:
+                msg = self.transl.tr('No cuts widened: unable to widen indices %s')
+            else:
+                msg = self.transl.tr('No cuts trimmed: unable to trim indices %s')
+            return (msg % str(active), True)
+        width = self.boards[0].width
+        min_finger_width = self.bit.units.abstract_to_increments(self.config.min_finger_width)
+        self._begin()
+        for f in active:
+            self._touch(f)
+            c = self.cuts[f]
+            if left:
+                c.xmin -= allowed
+                if c.xmin < min_finger_width:
+                    c.xmin = 0
+            else:
+                c.xmax += allowed
+                if width - c.xmax < min_finger_width:
+                    c.xmax = width
+        if left:
+            self._commit('resize_left')
+            side = self.transl.tr('left')
+        else:
+            self._commit('resize_right')
+            side = self.transl.tr('right')
+        if allowed > 0:
+            msg = self.transl.tr('Widened cut indices %s on %s %d increments') % \
+                (str(active), side, allowed)
+        else:
+            msg = self.transl.tr('Trimmed cut indices %s on %s %d increments') % \
+                (str(active), side, -allowed)
+        if allowed != d:
+            msg += self.transl.tr(', limited from %d') % abs(d)
+        return (msg, allowed != d)
+
+    def cut_resize_to(self, left, x):
+        '''
+        Moves the left edges (if left is True) or the right edges of the
+        active cuts together, so that the edge of the first active cut is at
+        x, as in cut_resize().
+        '''
+        if not self.active_cuts:
+            return (self.transl.tr('No cuts widened: no active cuts'), True)
+        c = self.cuts[min(self.active_cuts)]
+        if left:
+            return self.cut_resize(left, c.xmin - D(x))
+        return self.cut_resize(left, D(x) - c.xmax)
+
     def cut_increment_cursor(self, inc):
         '''
         Increments the cursor cut, cyclicly.  Increment can be positive or negative.
@@ -767,40 +1346,40 @@ class Edit_Spaced(Base_Spacing):
         if len(self.cuts) < 2:  # don't delete the last cut
             return False
         # delete from the cuts list
-        c = self.cuts[0:f]
-        c.extend(self.cuts[f + 1:])
-        self.cuts = c
+        self._splice(f, f + 1, [])
         # adjust the cursor appropriately
         if self.cursor_cut >= f and self.cursor_cut > 0:
             self.cursor_cut -= 1
         # adjust the active cuts list
-        idc = self.active_cuts.index(f)
-        c = self.active_cuts[0:idc]
-        c.extend(self.active_cuts[idc + 1:])
-        self.active_cuts = c
-        for i in range(len(self.active_cuts)):
-            if self.active_cuts[i] > f:
-                self.active_cuts[i] -= 1
+        self.active_cuts = [i - 1 if i > f else i for i in self.active_cuts if i != f]
         return True
 
     def cut_delete_active(self):
         '''
         Deletes the active cuts.
         '''
-        cuts_save = copy.deepcopy(self.cuts)
-        deleted = []
-        failed = False
-        # delete in reverse order, so that modifications to cuts don't affect index values
+        self._begin()
+        # delete in reverse order, so that modifications to cuts don't affect
+        # index values, and don't delete the last cut
         rev = sorted(self.active_cuts, reverse=True)
-        for f in rev:
-            if not self.cut_delete(f):
-                failed = True
-                break
-            deleted.append(f)
+        deleted = rev[:len(self.cuts) - 1]
+        failed = len(deleted) < len(rev)
+        # delete each run of consecutive indices at once
+        runs = []
+        for f in deleted:
+            if runs and runs[-1][0] == f + 1:
+                runs[-1][0] = f
+            else:
+                runs.append([f, f + 1])
+        for (lo, hi) in runs:
+            self._splice(lo, hi, [])
+        # the cursor moves left with the cuts deleted at or left of it
+        n = len([f for f in deleted if f <= self.cursor_cut])
+        self.cursor_cut = max(0, self.cursor_cut - n)
         self.active_cuts = [self.cursor_cut]
+        self._commit('delete')
         if deleted:
             msg = 'Deleted cut indices ' + str(deleted)
-            self.undo_cuts.append(cuts_save)
         else:
             msg = 'Deleted no cuts'
         if failed:
@@ -815,7 +1394,7 @@ class Edit_Spaced(Base_Spacing):
         overhang = self.bit.overhang
         midline = self.bit.midline
         index = None
-        cuts_save = copy.deepcopy(self.cuts)
+        self._begin()
         min_finger_width = math.floor(
             self.bit.units.abstract_to_increments(self.config.min_finger_width)) + 1
         wadd = min_finger_width + self.dhtot
@@ -831,26 +1410,27 @@ class Edit_Spaced(Base_Spacing):
         wadd = 2 * (self.bit.midline + self.dhtot)
         wdelta = overhang * 2
 
-        for i in range(1, len(self.cuts)):
-            if self.cuts[i].xmin - self.cuts[i - 1].xmax + wdelta >= wadd + self.bit.midline:
+        space = self.index.first_space(wadd + self.bit.midline - wdelta,
+                                       wadd + self.bit.midline + wdelta)
+        if space is not None:
+            (i, in_gap) = space
+            if in_gap:
                 if self.config.debug:
                     print('add in cut')
                 index = i
                 xmin = self.cuts[i - 1].xmax - overhang + midline
                 xmax = xmin + self.bit.midline + overhang + 2 * self.dhtot
                 xmin -= overhang
-                break
-
-            elif (self.cuts[i].xmax - self.cuts[i].xmin - wdelta) >= wadd + self.bit.midline:
+            else:
                 if self.config.debug:
                     print('add in cut')
                 index = i + 1
                 xmax = self.cuts[i].xmin + self.bit.midline + (overhang + self.dhtot) * 2
                 xmin = xmax + self.bit.midline - 2 * overhang
                 t = self.cuts[i].xmax
+                self._touch(i)
                 self.cuts[i].xmax = xmax
                 xmax = t
-                break
         if index is None and \
            self.cuts[-1].xmax < self.boards[0].width - overhang:
             if self.config.debug:
@@ -860,11 +1440,8 @@ class Edit_Spaced(Base_Spacing):
             xmin = self.cuts[-1].xmax - overhang
         if index is None:
             return (self.transl.tr('Unable to add cut'), True)
-        self.undo_cuts.append(cuts_save)
-        c = self.cuts[0:index]
-        c.append(router.Cut(xmin, xmax))
-        c.extend(self.cuts[index:])
-        self.cuts = c
+        self._splice(index, index, [router.Cut(xmin, xmax)])
         self.cursor_cut = index
         self.active_cuts = [index]
+        self._commit('add')
         return (self.transl.tr('Added cut'), False)
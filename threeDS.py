@@ -24,30 +24,43 @@ Contains functionality for writing Autodesk 3DS files.
 from __future__ import division
 from __future__ import print_function
 from future.utils import lrange
-from io import StringIO
+from io import BytesIO
+from array import array
 
-import struct, copy
+import struct, copy, sys
 import router
 
 
-class BinaryIO(StringIO):
+class BinaryIO(BytesIO):
     def writepack(self, fmt, *values):
         '''Writes data with little-endian, packed with struct'''
         self.write(struct.pack('<' + fmt, *values))
 
+    def writearray(self, a):
+        '''Writes the array a, little-endian'''
+        if sys.byteorder != 'little':
+            a = array(a.typecode, a)
+            a.byteswap()
+        self.write(a.tobytes())
+
 
 class Object_Geometry(object):
-    '''Geometry information for a single 3DS object'''
+    '''
+    Geometry information for a single 3DS object.
+
+    vertices: array of the x, y, z coordinates of each vertex
+    triangles: array of the three vertex indices of each triangle
+    '''
     def __init__(self, name, vertices, triangles):
         self.name = name
         self.vertices = vertices
         self.triangles = triangles
 
     def num_vertices(self):
-        return len(self.vertices)
+        return len(self.vertices) // 3
 
     def num_triangles(self):
-        return len(self.triangles)
+        return len(self.triangles) // 3
 
 
 def write_3ds(filename, objects):
@@ -152,16 +165,18 @@ def write_3ds(filename, objects):
     bio.writepack('HI', key3ds['EDIT3DS'], edit3ds_size)
     for i in lrange(n):
         bio.writepack('HI', key3ds['EDIT_OBJECT'], edit_object_size[i])
-        bio.write(name[i])
+        bio.write(name[i].encode('ascii'))
         bio.writepack('HI', key3ds['OBJ_TRIMESH'], obj_trimesh_size[i])
         bio.writepack('HI', key3ds['TRI_VERTEXL'], tri_vertexl_size[i])
         bio.writepack('H', objects[i].num_vertices())
-        for v in objects[i].vertices:
-            bio.writepack('fff', v[0], v[1], v[2])
+        bio.writearray(array('f', objects[i].vertices))
         bio.writepack('HI', key3ds['TRI_FACEL1'], tri_facel1_size[i])
         bio.writepack('H', objects[i].num_triangles())
-        for t in objects[i].triangles:
-            bio.writepack('HHHH', t[0], t[1], t[2], 0x0006)
+        # each face is its three vertex indices and its flags
+        faces = array('H', [0x0006]) * (4 * objects[i].num_triangles())
+        for k in range(3):
+            faces[k::4] = array('H', objects[i].triangles[k::3])
+        bio.writearray(faces)
     s = bio.getvalue()
     # print len(s), main3ds_size
     # Write the buffer to the file
@@ -171,63 +186,77 @@ def write_3ds(filename, objects):
 
 
 def extrude(v2d, tri2d, order, z1, z2, units):
+    '''
+    Extrudes the triangulation (v2d, tri2d) from Board.triangulate() from z1
+    to z2, where order permutes the (x, y, z) of each vertex.  Returns the
+    (vertices, triangles) of an Object_Geometry, in inches or mm.
+    '''
     if units.metric:
         scale = 1.0
     else:
         scale = 1.0 / units.increments_per_inch
-    nv2d = len(v2d)
-    ntri2d = len(tri2d)
-    v3d = [[0, 0, 0]] * (nv2d * 2)
-    i = 0
-    i2 = nv2d
-    for v in v2d:
-        v1 = [v[0] * scale, v[1] * scale, z1 * scale]
-        v2 = [v[0] * scale, v[1] * scale, z2 * scale]
-        v3d[i] = [v1[order[0]], v1[order[1]], v1[order[2]]]
-        v3d[i2] = [v2[order[0]], v2[order[1]], v2[order[2]]]
-        i += 1
-        i2 += 1
-    tri3d = [[0, 0, 0]] * (2 * ntri2d)
-    i = 0
-    i2 = ntri2d
-    for t in tri2d:
-        tri3d[i] = [t[0], t[1], t[2]]
-        tri3d[i2] = [t[0] + nv2d, t[1] + nv2d, t[2] + nv2d]
-        i += 1
-        i2 += 1
-    for i in lrange(nv2d):
-        ip = i + 1
-        ie = i + nv2d
-        iep = ie + 1
-        if ip == nv2d:
-            ip = 0
-            iep = nv2d
-        tri3d.append([i, ip, iep])
-        tri3d.append([i, iep, ie])
+    nv2d = len(v2d) // 2
+    xyz = [array('d', v2d[0::2]), array('d', v2d[1::2]), None]
+    v3d = array('d', [0.0]) * (6 * nv2d)
+    for (i, z) in enumerate([z1, z2]):
+        xyz[2] = array('d', [float(z)]) * nv2d
+        for k in range(3):
+            v3d[3 * i * nv2d + k:3 * (i + 1) * nv2d:3] = xyz[order[k]]
+    for k in range(len(v3d)):
+        v3d[k] *= scale
+    # the faces at z1 and z2, and the sides, which connect each edge of the
+    # perimeter at z1 to the same edge at z2
+    tri3d = array('l', tri2d)
+    tri3d.extend(t + nv2d for t in tri2d)
+    for i in range(nv2d):
+        ip = (i + 1) % nv2d
+        tri3d.extend([i, ip, ip + nv2d, i, ip + nv2d, i + nv2d])
     return (v3d, tri3d)
 
 
+def is_supported(bit, boards):
+    '''
+    Returns True if the joint may be exported.  Dovetail bits are not yet
+    supported.
+    '''
+    return bit.angle == 0
+
+
+def copy_boards(boards):
+    '''
+    Returns a deep copy of the boards, which share their units and
+    translator with the originals, since a Qt translator cannot be copied.
+    '''
+    memo = dict((id(x), x) for b in boards for x in (b.units, b.transl))
+    return copy.deepcopy(boards, memo)
+
+
 def joint_to_3ds(filename, boards, bit, spacing):
-    bc = copy.deepcopy(boards)
+    '''
+    Exports the joint to filename.  The top board, and any double boards,
+    are in the x-y plane, stacked so that the cuts of adjoining boards
+    interlock.  The bottom board is in the x-z plane.
+    '''
+    bc = copy_boards(boards)
     router.cut_boards(bc, bit, spacing)
     for b in bc:
         b.set_origin(0, 0)
     objects = []
     bc[1].set_origin(0, -(bc[1].yT() - bit.depth))
-    (v2d, tri2d) = bc[0].triangulate(bit)
-    (v3dtop, tri3dtop) = extrude(v2d, tri2d, (0, 1, 2), 0, bit.depth, bit.units)
-    objects.append(Object_Geometry('top', v3dtop, tri3dtop))
     (v2d, tri2d) = bc[1].triangulate(bit)
-    (v3dbot, tri3dbot) = extrude(v2d, tri2d, (0, 2, 1), 0, bit.depth, bit.units)
-    objects.append(Object_Geometry('top', v3dbot, tri3dbot))
-#
-#    v3d = []
-#    for v in v2d:
-#        v3d.append([v[0], v[1], 0])
-#    objects = [Object_Geometry('top', v3d, tri2d)]
-#
+    (v3d, tri3d) = extrude(v2d, tri2d, (0, 2, 1), 0, bit.depth, bit.units)
+    objects.append(Object_Geometry('bottom', v3d, tri3d))
+    y = 0
+    for (b, name) in [(bc[2], 'double'), (bc[3], 'double2'), (bc[0], 'top')]:
+        if not b.active:
+            continue
+        b.set_origin(0, y)
+        y = b.yT() - bit.depth
+        (v2d, tri2d) = b.triangulate(bit)
+        (v3d, tri3d) = extrude(v2d, tri2d, (0, 1, 2), 0, bit.depth, bit.units)
+        objects.append(Object_Geometry(name, v3d, tri3d))
     write_3ds(filename, objects)
-    
+
 
 if __name__ == '__main__':
     v1 = [[0, 0, 0],
@@ -259,7 +288,11 @@ if __name__ == '__main__':
     t2 = [[0, 1, 3],
           [0, 3, 2]]
 
-    objects = [Object_Geometry('dog', v1, t1a), Object_Geometry('catss', v2, t2)]
+    def flat(a, typecode):
+        return array(typecode, [x for row in a for x in row])
+
+    objects = [Object_Geometry('dog', flat(v1, 'd'), flat(t1a, 'l')),
+               Object_Geometry('catss', flat(v2, 'd'), flat(t2, 'l'))]
 
     write_3ds('dog.3ds', objects)
 
@@ -23,11 +23,14 @@ This module contains base utilities for pyRouterJig
 '''
 
 from decimal import Decimal as D
+from decimal import Context
 import math
 import os
 import glob
 import platform
 
+import pass_order
+
 VERSION = '0.9.4'
 
 
@@ -49,6 +52,25 @@ def isMac():
     return platform.system() == 'Darwin'
 
 
+def decimal_context():
+    '''
+    Returns the Decimal context that all of the joint computations assume.
+    '''
+    return Context(prec=4 + 4,  # working in f8.4
+                   Emin=-99999999,
+                   Emax=99999999)
+
+
+class Null_Translator(object):
+    '''
+    Stands in for the QTranslator when computing without Qt, such as in
+    batch jobs.  Messages are returned untranslated, so that the UI layer
+    may translate them later.
+    '''
+    def tr(self, s):
+        return s
+
+
 class My_Fraction(object):
     '''
     Represents a number as whole + numerator / denominator, all of which must be
@@ -162,6 +184,7 @@ class Units(object):
     english_separator: For English units, string english_separator between whole and fraction
     metric: If true, then use metric (mm).  Otherwise, english (inches)
     num_increments: Number of increments per unit length (1 inch for english, 1 mm for metric)
+    transl: The translator for messages.  If None, a Null_Translator.
 
     Attributes:
     increments_per_inch: Number of increments per inch.
@@ -172,6 +195,8 @@ class Units(object):
     def __init__(self, english_separator, metric=False, num_increments=None, transl=None):
         self.english_separator = english_separator
         self.metric = metric
+        if transl is None:
+            transl = Null_Translator()
         self.transl = transl
         if num_increments is None:
             if metric:
@@ -372,12 +397,11 @@ def set_slider_tick_interval(slider):
         slider.setTickInterval(1)
 
 
-def print_table(filename, boards, title):
+def cut_edges(boards):
     '''
-    Prints a table of router pass locations, referenced to the right size of the board.
+    Returns (all_cuts, label_cuts), the cuts of each cut edge of the boards
+    and its label, in the order of the columns of print_table().
     '''
-    # Load up the cuts and labels to be printed
-    transl = boards[0].units.transl
     all_cuts = [boards[0].bottom_cuts]
     label_cuts = ['A']
     labels = ['B', 'C', 'D', 'E', 'F']
@@ -396,6 +420,33 @@ def print_table(filename, boards, title):
         i += 2
     all_cuts.append(boards[1].top_cuts)
     label_cuts.append(labels[i])
+    return (all_cuts, label_cuts)
+
+
+def print_table(filename, boards, title, order=None):
+    '''
+    Prints a table of router pass locations, referenced to the right size of
+    the board, to filename.  The arguments are as in format_table().
+    '''
+    with open(filename, 'w') as fd:
+        fd.write(format_table(boards, title, order))
+
+
+def format_table(boards, title, order=None):
+    '''
+    Returns the table of router pass locations, referenced to the right size
+    of the board, as a string.
+
+    order: The pass_order.Pass_Order of the passes.  If None, the edges are in
+           order, and each from right to left.
+    '''
+    # Load up the cuts and labels to be printed
+    transl = boards[0].units.transl
+    (all_cuts, label_cuts) = cut_edges(boards)
+    if order is None:
+        edges = [(icol, False) for icol in range(len(all_cuts))]
+    else:
+        edges = order.edges
     # TODO: add cauls
     # Format for each pass, location pair
     form = ' %4s %9s '
@@ -409,45 +460,34 @@ def print_table(filename, boards, title):
     lenh = len(line)
     divider = '-' * lenh + '\n'
     line = divider + line + '\n' + divider
-    fd = open(filename, 'w')
-    fd.write(title + '\n')
-    fd.write(line)
-    # Initialize for the print loop
-    ncol = len(all_cuts)
+    lines = [title + '\n', line]
+    # Load the (label, location) of each pass of each edge, in the order routed
     width = boards[0].width
     units = boards[0].units
-    pass_index = [0] * ncol
-    cut_index = [0] * ncol
-    for icol in range(ncol):
-        cut_index[icol] = len(all_cuts[icol]) - 1
-    total_passes = [0] * ncol
-    # Print until all of the edges are out of passes.  We go through the cuts,
-    # and each pass in the cut, in reverse order (from right to left).
-    printing = True
-    while printing:
+    columns = []
+    for (icol, left_to_right) in edges:
+        if order is None:
+            sequence = pass_order.edge_sequence(all_cuts[icol], left_to_right)
+            numbers = dict((s, i + 1) for (i, s) in enumerate(sequence))
+        else:
+            sequence = order.sequences[icol]
+            numbers = order.pass_numbers(label_cuts[icol], all_cuts[icol])
+        column = []
+        for (ic, ip) in sequence:
+            c = all_cuts[icol][ic]
+            column.append(('%d%s' % (numbers[(ic, ip)], label_cuts[icol]),
+                           units.increments_to_string(width - c.passes[ip])))
+        columns.append(column)
+    # Print until all of the edges are out of passes
+    for i in range(max(len(column) for column in columns)):
         line = ''
-        printing = False
-        # Loop through the edges
-        for icol in range(ncol):
-            label = '**'
-            dim = '**'
-            # check if there are any more passes for this edge
-            icut = cut_index[icol]
-            if icut >= 0:
-                # Still have a pass, so load it
-                c = all_cuts[icol][icut]
-                np = len(c.passes)
-                pi = pass_index[icol]
-                total_passes[icol] += 1
-                label = '%d%s' % (total_passes[icol], label_cuts[icol])
-                dim = units.increments_to_string(width - c.passes[np - pi - 1])
-                pass_index[icol] += 1
-                printing = True
-                # if we are done with this cut, go on to the next cut
-                if pass_index[icol] == np:
-                    cut_index[icol] -= 1
-                    pass_index[icol] = 0
-            line += form % (label, dim)
-        if printing:
-            fd.write(line + '\n')
-    fd.close()
+        for column in columns:
+            if i < len(column):
+                line += form % column[i]
+            else:
+                line += form % ('**', '**')
+        lines.append(line + '\n')
+    if order is not None and order.optimized:
+        lines.append(divider)
+        lines.append(order.describe(units) + '\n')
+    return ''.join(lines)